@@ -0,0 +1,275 @@
+"""Contains a class titled AccountIndex, a sidecar index mapping each
+account number to the byte offsets of its rows in a csv input file,
+so that one account's transactions can be read without scanning the
+whole file."""
+
+import os
+import sqlite3
+import tempfile
+from os import path
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+class AccountIndex:
+    """Maps account numbers to the byte offsets of their rows.
+
+    The index remembers the size and modification time of the source
+    file it was built from, so a stale index can be detected before it
+    is used to seek into a file that has changed since.
+
+    Saved indexes are SQLite files with one row per offset, clustered
+    by account number, so a loaded index answers a lookup by reading
+    only that account's rows instead of parsing the whole index first.
+    """
+
+    INDEX_SUFFIX = ".idx.db"
+    """Suffix appended to the source file path to name the sidecar file."""
+
+    INDEX_VERSION = 2
+    """Format version stored in every saved index."""
+
+    SCHEMA = """
+        CREATE TABLE header (
+            key TEXT PRIMARY KEY,
+            value
+        );
+        CREATE TABLE offsets (
+            account_number TEXT NOT NULL,
+            offset INTEGER NOT NULL,
+            date TEXT,
+            PRIMARY KEY (account_number, offset)
+        ) WITHOUT ROWID;
+        CREATE TABLE accounts (
+            account_number TEXT PRIMARY KEY
+        );
+    """
+    """Tables of a saved index, accounts lists the account numbers in
+    order of first appearance."""
+
+    def __init__(self, source_path: str, include_dates: bool = False):
+        """Creates an empty index for a source file.
+
+        Args:
+            source_path (str): csv file the offsets point into.
+            include_dates (bool, optional): Also record the date of each
+             row so lookups can be narrowed to one date. Defaults to False.
+        """
+
+        self.__source_path = source_path
+        self.__include_dates = include_dates
+        self.__offsets = {}
+        self.__dates = {}
+        self.__source_size = None
+        self.__source_mtime = None
+        self.__connection = None
+
+    @property
+    def source_path(self) -> str:
+        """Accessor for the path of the indexed source file."""
+
+        return self.__source_path
+
+    @property
+    def include_dates(self) -> bool:
+        """Accessor for whether row dates are recorded."""
+
+        return self.__include_dates
+
+    @property
+    def account_numbers(self) -> list:
+        """Returns the indexed account numbers in order of first appearance."""
+
+        if self.__connection is not None:
+            return [row[0] for row in self.__connection.execute(
+                "SELECT account_number FROM accounts ORDER BY rowid")]
+
+        return list(self.__offsets)
+
+    @classmethod
+    def sidecar_path(cls, source_path: str) -> str:
+        """Returns the default index file path for a source file.
+
+        Args:
+            source_path (str): csv file being indexed.
+
+        Returns:
+            str: source_path with INDEX_SUFFIX appended.
+        """
+
+        return source_path + cls.INDEX_SUFFIX
+
+    def add(self, account_number: str, offset: int, date: str = None) -> None:
+        """Records the byte offset of one row.
+
+        Args:
+            account_number (str): Account the row belongs to.
+            offset (int): Byte offset of the start of the row.
+            date (str, optional): Date of the row, kept when the index
+             includes dates.
+        """
+
+        self.__offsets.setdefault(account_number, []).append(offset)
+
+        if self.__include_dates:
+            self.__dates.setdefault(account_number, []).append(date)
+
+    def mark_complete(self) -> None:
+        """Records the current size and modification time of the source
+        file, once every row has been added."""
+
+        status = os.stat(self.__source_path)
+        self.__source_size = status.st_size
+        self.__source_mtime = status.st_mtime_ns
+
+    def is_stale(self) -> bool:
+        """Checks whether the source file changed after the index was built.
+
+        Returns:
+            bool: True when the file is missing, was modified or the
+             index was never completed.
+        """
+
+        if self.__source_size is None or not path.isfile(self.__source_path):
+            return True
+
+        status = os.stat(self.__source_path)
+
+        return (status.st_size != self.__source_size
+                or status.st_mtime_ns != self.__source_mtime)
+
+    def get_offsets(self, account_number: str, date: str = None) -> list:
+        """Returns the byte offsets of an account's rows.
+
+        Args:
+            account_number (str): Account to look up.
+            date (str, optional): Only return rows with this date.
+
+        Raises:
+            ValueError: When a date is given but the index has no dates.
+
+        Returns:
+            list: Offsets in file order, empty for unknown accounts.
+        """
+
+        if date is not None and not self.__include_dates:
+            raise ValueError("The index was built without dates.")
+
+        if self.__connection is not None:
+            if date is None:
+                rows = self.__connection.execute(
+                    "SELECT offset FROM offsets WHERE account_number = ? ORDER BY offset",
+                    (account_number,))
+            else:
+                rows = self.__connection.execute(
+                    "SELECT offset FROM offsets WHERE account_number = ? AND date = ? "
+                    "ORDER BY offset", (account_number, date))
+
+            return [row[0] for row in rows]
+
+        offsets = self.__offsets.get(account_number, [])
+
+        if date is None:
+            return list(offsets)
+
+        return [offset for offset, row_date
+                in zip(offsets, self.__dates[account_number]) if row_date == date]
+
+    def save(self, index_path: str = None) -> None:
+        """Writes the index to a SQLite file next to the source file.
+        It is written to a temporary file and renamed into place, so a
+        crash never leaves a partly written index behind.
+
+        Args:
+            index_path (str, optional): Destination of the index.
+             Defaults to the sidecar_path of the source file.
+        """
+
+        index_path = index_path or self.sidecar_path(self.__source_path)
+        directory, filename = path.split(path.abspath(index_path))
+        file_descriptor, temp_path = tempfile.mkstemp(prefix=f".{filename}.",
+                                                      suffix=".tmp",
+                                                      dir=directory)
+        os.close(file_descriptor)
+
+        try:
+            connection = sqlite3.connect(temp_path)
+
+            try:
+                with connection:
+                    connection.executescript(self.SCHEMA)
+                    connection.executemany("INSERT INTO header VALUES (?, ?)",
+                                           [("version", self.INDEX_VERSION),
+                                            ("source_path", self.__source_path),
+                                            ("source_size", self.__source_size),
+                                            ("source_mtime", self.__source_mtime),
+                                            ("include_dates", int(self.__include_dates))])
+                    connection.executemany("INSERT INTO accounts VALUES (?)",
+                                           ((account_number,) for account_number
+                                            in self.account_numbers))
+                    connection.executemany("INSERT INTO offsets VALUES (?, ?, ?)",
+                                           self.__offset_rows())
+            finally:
+                connection.close()
+
+            os.replace(temp_path, index_path)
+        except BaseException:
+            if path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def __offset_rows(self):
+        """Yields the account number, offset and date of every row."""
+
+        for account_number, offsets in self.__offsets.items():
+            dates = self.__dates.get(account_number) if self.__include_dates else None
+
+            for position, offset in enumerate(offsets):
+                yield account_number, offset, dates[position] if dates else None
+
+    @classmethod
+    def load(cls, index_path: str) -> "AccountIndex":
+        """Opens an index written by save. Only the header is read, the
+        offsets are looked up in the file by get_offsets.
+
+        Args:
+            index_path (str): Path of the index file.
+
+        Raises:
+            FileNotFoundError: Raised when the index file does not exist.
+            ValueError: When the file is not an index of this version.
+
+        Returns:
+            AccountIndex: The loaded index.
+        """
+
+        if not path.isfile(index_path):
+            raise FileNotFoundError(f"File: {index_path} does not exist.")
+
+        connection = sqlite3.connect(f"file:{path.abspath(index_path)}?mode=ro", uri=True)
+
+        try:
+            header = dict(connection.execute("SELECT key, value FROM header"))
+        except sqlite3.DatabaseError as error:
+            connection.close()
+            raise ValueError(f"Index {index_path} cannot be read: {error}") from error
+
+        if header.get("version") != cls.INDEX_VERSION:
+            connection.close()
+            raise ValueError(f"Index {index_path} has unsupported "
+                             f"version {header.get('version')}.")
+
+        index = cls(header["source_path"], bool(header["include_dates"]))
+        index.__source_size = header["source_size"]
+        index.__source_mtime = header["source_mtime"]
+        index.__connection = connection
+
+        return index
+
+    def close(self) -> None:
+        """Closes the index file of a loaded index."""
+
+        if self.__connection is not None:
+            self.__connection.close()
+            self.__connection = None
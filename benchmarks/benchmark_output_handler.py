@@ -0,0 +1,108 @@
+"""Measures how fast OutputHandler writes large account summary files,
+comparing write buffer sizes and sequential against parallel writing
+of all output files.
+
+Run from the repository root:
+    python -m benchmarks.benchmark_output_handler --accounts 10000000
+"""
+
+import argparse
+import os
+import time
+from tempfile import TemporaryDirectory
+from output_handler.output_handler import OutputHandler
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+def build_results(account_count: int) -> tuple:
+    """Builds synthetic results in the shape DataProcessor returns.
+
+    Args:
+        account_count (int): Number of account summaries to create.
+
+    Returns:
+        tuple: account summaries, suspicious transactions and
+         transaction statistics.
+    """
+
+    account_summaries = {}
+
+    for number in range(account_count):
+        account_number = str(1000 + number)
+        deposits = float(number % 9973)
+        withdrawals = float(number % 7919)
+        account_summaries[account_number] = {"account_number": account_number,
+                                             "balance": deposits - withdrawals,
+                                             "total_deposits": deposits,
+                                             "total_withdrawals": withdrawals}
+
+    suspicious_transactions = [{"Transaction ID": str(number),
+                                "Account number": str(1000 + number),
+                                "Date": "2023-03-14",
+                                "Transaction type": "deposit",
+                                "Amount": "12000",
+                                "Currency": "CAD",
+                                "Description": "Car Sale"}
+                               for number in range(account_count // 100)]
+
+    transaction_statistics = {"deposit": {"total_amount": 1.0e9, "transaction_count": account_count},
+                              "withdrawal": {"total_amount": 5.0e8, "transaction_count": account_count}}
+
+    return account_summaries, suspicious_transactions, transaction_statistics
+
+def time_call(function, *arguments) -> float:
+    """Returns the wall time in seconds taken by one call."""
+
+    start = time.perf_counter()
+    function(*arguments)
+    return time.perf_counter() - start
+
+def main(arguments: list = None) -> None:
+    """Runs the benchmark and prints rows per second for each setup.
+
+    Args:
+        arguments (list, optional): Command line arguments.
+    """
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=10000000,
+                        help="number of account summaries to write")
+    parser.add_argument("--buffer-sizes", type=int, nargs="+",
+                        default=[8192, 1 << 16, OutputHandler.WRITE_BUFFER_SIZE, 1 << 24],
+                        help="write buffer sizes in bytes to compare")
+    options = parser.parse_args(arguments)
+
+    print(f"Building {options.accounts:,} account summaries...")
+    results = build_results(options.accounts)
+
+    with TemporaryDirectory() as directory:
+        summaries_path = os.path.join(directory, "account_summaries.csv")
+
+        for buffer_size in options.buffer_sizes:
+            output_handler = OutputHandler(*results, buffer_size=buffer_size)
+            seconds = time_call(output_handler.write_account_summaries_to_csv, summaries_path)
+            megabytes = os.path.getsize(summaries_path) / 1e6
+            print(f"account summaries, buffer {buffer_size:>10,} B: "
+                  f"{options.accounts / seconds:>12,.0f} rows/s, {megabytes / seconds:8.1f} MB/s")
+
+        output_handler = OutputHandler(*results)
+        file_paths = {name: os.path.join(directory, f"{name}.csv")
+                      for name in ["account_summaries",
+                                   "suspicious_transactions",
+                                   "transaction_statistics"]}
+
+        def write_sequentially():
+            output_handler.write_account_summaries_to_csv(file_paths["account_summaries"])
+            output_handler.write_suspicious_transactions_to_csv(file_paths["suspicious_transactions"])
+            output_handler.write_transaction_statistics_to_csv(file_paths["transaction_statistics"])
+
+        sequential = time_call(write_sequentially)
+        parallel = time_call(output_handler.write_all_to_csv, file_paths)
+
+        print(f"all files, sequential: {sequential:8.2f} s")
+        print(f"all files, parallel:   {parallel:8.2f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""Times reading, processing and writing synthetic transaction files
+of several sizes, saves the results to a json file and reports
+regressions against a saved baseline.
+
+Run from the repository root:
+    python -m benchmarks.benchmark_suite --rows 10000 1000000 10000000
+    python -m benchmarks.benchmark_suite --baseline benchmarks/baseline.json
+
+The exit status is 1 when a benchmark regressed beyond the threshold.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from tempfile import TemporaryDirectory
+from benchmarks.generator import write_transactions_csv
+from data_processor.data_processor import DataProcessor
+from input_handler.input_handler import InputHandler
+from output_handler.output_handler import OutputHandler
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+ROW_COUNTS = [10000, 1000000, 10000000]
+"""Default input sizes in rows."""
+
+REGRESSION_THRESHOLD = 0.1
+"""Default share a benchmark may slow down or grow before it is reported."""
+
+RESULT_NAMES = ["account_summaries", "suspicious_transactions", "transaction_statistics"]
+"""Results each output writer is timed on."""
+
+def measure(function, rows: int, repeat: int = 1, trace_memory: bool = True) -> tuple:
+    """Times a function and measures its peak memory.
+
+    The timed calls run without tracing, since tracemalloc slows
+    allocation down, and peak memory is measured by one extra traced
+    call.
+
+    Args:
+        function (callable): Function to call without arguments.
+        rows (int): Number of rows the function handles.
+        repeat (int, optional): Number of timed calls, the fastest is
+         kept. Defaults to 1.
+        trace_memory (bool, optional): Measure peak memory. Defaults
+         to True.
+
+    Returns:
+        tuple: The measurement as a dictionary, and the value returned
+         by the last call.
+    """
+
+    best = None
+
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        value = function()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+
+    measurement = {"rows": rows,
+                   "seconds": best,
+                   "rows_per_second": rows / best if best else None,
+                   "peak_memory_bytes": None}
+
+    if trace_memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            value = function()
+            measurement["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return measurement, value
+
+def run_suite(row_counts: list, directory: str, repeat: int = 1,
+              trace_memory: bool = True, **generator_options) -> dict:
+    """Runs every benchmark for each input size.
+
+    Args:
+        row_counts (list): Input sizes in rows.
+        directory (str): Folder the input and output files are written to.
+        repeat (int, optional): Timed calls per benchmark. Defaults to 1.
+        trace_memory (bool, optional): Measure peak memory. Defaults
+         to True.
+        **generator_options: Passed on to generate_transactions.
+
+    Returns:
+        dict: Measurements keyed by "<benchmark>@<rows>".
+    """
+
+    results = {}
+
+    for rows in row_counts:
+        input_path = os.path.join(directory, f"transactions_{rows}.csv")
+        print(f"Generating {rows:,} transactions...", file=sys.stderr)
+        write_transactions_csv(input_path, rows, **generator_options)
+
+        def report(name: str, measurement: dict) -> None:
+            results[f"{name}@{rows}"] = measurement
+            print(f"{name + '@' + str(rows):<40} {measurement['seconds']:10.3f} s "
+                  f"{measurement['rows_per_second'] or 0:>14,.0f} rows/s", file=sys.stderr)
+
+        input_handler = InputHandler(input_path)
+        measurement, transactions = measure(input_handler.read_input_data, rows,
+                                            repeat, trace_memory)
+        report("read_input_data", measurement)
+
+        # Warnings for every suspicious transaction would time the
+        # logging handler rather than the processing.
+        def process_data():
+            return DataProcessor(transactions, logging_level="ERROR").process_data()
+
+        measurement, processed_data = measure(process_data, len(transactions),
+                                              repeat, trace_memory)
+        report("process_data", measurement)
+
+        output_handler = OutputHandler(processed_data["account_summaries"],
+                                       processed_data["suspicious_transactions"],
+                                       processed_data["transaction_statistics"])
+        output_rows = (len(processed_data["account_summaries"])
+                       + len(processed_data["suspicious_transactions"])
+                       + len(processed_data["transaction_statistics"]))
+
+        for file_format in OutputHandler.OUTPUT_FORMATS:
+            file_paths = {name: os.path.join(directory, f"{name}_{rows}.{file_format}")
+                          for name in RESULT_NAMES}
+
+            def write_output():
+                for name, file_path in file_paths.items():
+                    output_handler.write_output(name, file_path)
+
+            measurement, _ = measure(write_output, output_rows, repeat, trace_memory)
+            report(f"write_output_{file_format}", measurement)
+
+        del transactions, processed_data, output_handler
+        os.remove(input_path)
+
+    return results
+
+def find_regressions(results: dict, baseline: dict, threshold: float) -> list:
+    """Compares results with a baseline.
+
+    Args:
+        results (dict): Measurements keyed by benchmark, as returned
+         by run_suite.
+        baseline (dict): Measurements of an earlier run.
+        threshold (float): Share a benchmark may slow down or its
+         peak memory may grow before it is reported.
+
+    Returns:
+        list: A message for each regression, benchmarks missing from
+         the baseline are skipped.
+    """
+
+    regressions = []
+
+    for name, measurement in results.items():
+        previous = baseline.get(name)
+
+        if previous is None:
+            continue
+
+        if (measurement["rows_per_second"] and previous["rows_per_second"]
+                and measurement["rows_per_second"] < previous["rows_per_second"] * (1 - threshold)):
+            change = 1 - measurement["rows_per_second"] / previous["rows_per_second"]
+            regressions.append(f"{name}: {measurement['rows_per_second']:,.0f} rows/s, "
+                               f"{change:.0%} slower than {previous['rows_per_second']:,.0f}")
+
+        if (measurement["peak_memory_bytes"] and previous["peak_memory_bytes"]
+                and measurement["peak_memory_bytes"] > previous["peak_memory_bytes"] * (1 + threshold)):
+            change = measurement["peak_memory_bytes"] / previous["peak_memory_bytes"] - 1
+            regressions.append(f"{name}: peak memory {measurement['peak_memory_bytes']:,} B, "
+                               f"{change:.0%} above {previous['peak_memory_bytes']:,}")
+
+    return regressions
+
+def main(arguments: list = None) -> int:
+    """Runs the suite, saves the results and compares them with the
+    baseline.
+
+    Args:
+        arguments (list, optional): Command line arguments.
+
+    Returns:
+        int: 1 when a regression was found, otherwise 0.
+    """
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=ROW_COUNTS,
+                        help="input sizes in rows")
+    parser.add_argument("--accounts", type=int, default=100000,
+                        help="number of distinct accounts")
+    parser.add_argument("--skew", type=float, default=1.1,
+                        help="Zipf exponent of account activity")
+    parser.add_argument("--suspicious-rate", type=float, default=0.01,
+                        help="share of suspicious transactions")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="timed calls per benchmark, the fastest is kept")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the traced call measuring peak memory")
+    parser.add_argument("--output", default="benchmarks/results.json",
+                        help="json file the results are saved to")
+    parser.add_argument("--baseline",
+                        help="json results of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="share a benchmark may regress before it is reported")
+    options = parser.parse_args(arguments)
+
+    with TemporaryDirectory() as directory:
+        results = run_suite(options.rows, directory, options.repeat,
+                            not options.no_memory,
+                            accounts=options.accounts,
+                            skew=options.skew,
+                            suspicious_rate=options.suspicious_rate)
+
+    with open(options.output, "w") as output_file:
+        json.dump({"created": datetime.now(timezone.utc).isoformat(),
+                   "python": platform.python_version(),
+                   "platform": platform.platform(),
+                   "results": results}, output_file, indent=2)
+
+    print(f"Results written to: {options.output}")
+
+    if not options.baseline:
+        return 0
+
+    with open(options.baseline) as baseline_file:
+        baseline = json.load(baseline_file)["results"]
+
+    regressions = find_regressions(results, baseline, options.threshold)
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+
+    if not regressions:
+        print(f"No regressions beyond {options.threshold:.0%} of {options.baseline}")
+
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
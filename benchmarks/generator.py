@@ -0,0 +1,165 @@
+"""Generates synthetic transaction files in the input_data.csv layout,
+with a configurable number of rows and accounts, Zipf skewed account
+activity, currency mix and share of suspicious transactions.
+
+Run from the repository root:
+    python -m benchmarks.generator input/synthetic.csv --rows 1000000
+"""
+
+import argparse
+import csv
+import random
+from datetime import date, timedelta
+from itertools import accumulate
+from data_processor.data_processor import DataProcessor
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+FIELDS = ["Transaction ID",
+          "Account number",
+          "Date",
+          "Transaction type",
+          "Amount",
+          "Currency",
+          "Description"]
+"""Column headers of the generated files, the same as the input files."""
+
+CURRENCY_MIX = {"CAD": 0.8, "USD": 0.15, "EUR": 0.05}
+"""Default share of each currency among ordinary transactions."""
+
+TRANSACTION_TYPES = {"deposit": ["Salary", "Refund", "Cash Deposit"],
+                     "withdrawal": ["Groceries", "Rent", "Shopping"],
+                     "transfer": ["Transfer to Savings", "Transfer to Checking"]}
+"""Transaction types and the descriptions used for each."""
+
+CHUNK_SIZE = 100000
+"""Number of accounts drawn from the Zipf distribution at a time."""
+
+def generate_transactions(rows: int,
+                          accounts: int = 10000,
+                          skew: float = 1.1,
+                          currency_mix: dict = None,
+                          suspicious_rate: float = 0.01,
+                          days: int = 31,
+                          seed: int = 0):
+    """Yields synthetic transactions as dictionaries of strings.
+
+    Account numbers are drawn from a Zipf distribution, so a few
+    accounts have many transactions and most have few. Suspicious
+    transactions are made either large, above the DataProcessor
+    threshold, or in one of its uncommon currencies; every other
+    transaction is small and in a currency of currency_mix.
+
+    Args:
+        rows (int): Number of transactions.
+        accounts (int, optional): Number of distinct accounts.
+         Defaults to 10000.
+        skew (float, optional): Zipf exponent, 0 gives every account
+         the same activity. Defaults to 1.1.
+        currency_mix (dict, optional): Weight of each currency among
+         ordinary transactions. Defaults to CURRENCY_MIX.
+        suspicious_rate (float, optional): Share of suspicious
+         transactions, from 0 to 1. Defaults to 0.01.
+        days (int, optional): Number of days the dates are spread
+         over, starting on 2023-03-01. Defaults to 31.
+        seed (int, optional): Random seed, the same seed gives the
+         same transactions. Defaults to 0.
+
+    Yields:
+        dict: One transaction keyed by FIELDS.
+    """
+
+    generator = random.Random(seed)
+    currency_mix = currency_mix or CURRENCY_MIX
+    currencies = list(currency_mix)
+    currency_weights = list(currency_mix.values())
+    account_weights = list(accumulate(1 / rank ** skew for rank in range(1, accounts + 1)))
+    transaction_types = list(TRANSACTION_TYPES)
+    dates = [(date(2023, 3, 1) + timedelta(days=day)).isoformat() for day in range(days)]
+    threshold = DataProcessor.LARGE_TRANSACTION_THRESHOLD
+
+    transaction_id = 0
+
+    while transaction_id < rows:
+        ranks = generator.choices(range(accounts), cum_weights=account_weights,
+                                  k=min(CHUNK_SIZE, rows - transaction_id))
+
+        for rank in ranks:
+            transaction_id += 1
+            transaction_type = generator.choice(transaction_types)
+            amount = generator.randint(1, threshold // 10)
+            currency = generator.choices(currencies, currency_weights)[0]
+
+            if generator.random() < suspicious_rate:
+                if generator.random() < 0.5:
+                    amount = generator.randint(threshold + 1, threshold * 5)
+                else:
+                    currency = generator.choice(DataProcessor.UNCOMMON_CURRENCIES)
+
+            yield {"Transaction ID": str(transaction_id),
+                   "Account number": str(1001 + rank),
+                   "Date": generator.choice(dates),
+                   "Transaction type": transaction_type,
+                   "Amount": str(amount),
+                   "Currency": currency,
+                   "Description": generator.choice(TRANSACTION_TYPES[transaction_type])}
+
+def write_transactions_csv(file_path: str, rows: int, **options) -> None:
+    """Writes synthetic transactions to a csv input file.
+
+    Args:
+        file_path (str): Destination of the csv file.
+        rows (int): Number of transactions.
+        **options: Passed on to generate_transactions.
+
+    Output:
+        file (csv): Created the csv file.
+    """
+
+    with open(file_path, "w", newline="") as output_file:
+        writer = csv.writer(output_file)
+        writer.writerow(FIELDS)
+        writer.writerows([transaction[field] for field in FIELDS]
+                         for transaction in generate_transactions(rows, **options))
+
+def main(arguments: list = None) -> None:
+    """Writes a synthetic csv input file.
+
+    Args:
+        arguments (list, optional): Command line arguments.
+    """
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file_path", help="destination csv file")
+    parser.add_argument("--rows", type=int, default=10000,
+                        help="number of transactions")
+    parser.add_argument("--accounts", type=int, default=10000,
+                        help="number of distinct accounts")
+    parser.add_argument("--skew", type=float, default=1.1,
+                        help="Zipf exponent of account activity, 0 for uniform")
+    parser.add_argument("--currency", nargs=2, action="append",
+                        metavar=("CODE", "WEIGHT"),
+                        help="currency and its weight among ordinary "
+                        "transactions, may be repeated")
+    parser.add_argument("--suspicious-rate", type=float, default=0.01,
+                        help="share of suspicious transactions")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="random seed")
+    options = parser.parse_args(arguments)
+
+    currency_mix = None
+
+    if options.currency:
+        currency_mix = {code: float(weight) for code, weight in options.currency}
+
+    write_transactions_csv(options.file_path, options.rows,
+                           accounts=options.accounts,
+                           skew=options.skew,
+                           currency_mix=currency_mix,
+                           suspicious_rate=options.suspicious_rate,
+                           seed=options.seed)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""Contains a class titled CheckpointManager, which periodically saves
+the input position and DataProcessor state of a run so that a crashed
+run can be resumed instead of starting over."""
+
+import os
+import pickle
+import tempfile
+from os import path
+from input_handler.input_handler import InputHandler
+from data_processor.data_processor import DataProcessor
+from output_handler.transaction_stream import TransactionStream
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+class CheckpointManager:
+    """Saves and loads checkpoints of a data processing run.
+
+    A checkpoint is a journal. It starts with a snapshot of the
+    DataProcessor aggregate state, and each later checkpoint appends
+    a record of the input position after the last processed
+    transaction and only the state changed since the previous record,
+    so saving costs about the same at every interval however many
+    accounts were processed before. The journal is compacted into a
+    new snapshot, written to a temporary file and renamed over the old
+    journal, once its records outgrow the snapshot.
+    Records are flushed before the next batch is processed, and a
+    record cut short by a crash is ignored when the journal is loaded.
+
+    The size and modification time of the input file are saved with
+    the snapshot, a run is not resumed when the input has changed.
+
+    Checkpoints are pickled, only load checkpoints this program wrote.
+    """
+
+    CHECKPOINT_INTERVAL = 100000
+    """Number of input rows processed between two checkpoints."""
+
+    CHECKPOINT_VERSION = 3
+    """Format version stored in every checkpoint."""
+
+    def __init__(self, checkpoint_path: str,
+                       interval: int = CHECKPOINT_INTERVAL,
+                       fsync: bool = True):
+        """Initializes the manager.
+
+        Args:
+            checkpoint_path (str): File the checkpoint is saved to.
+            interval (int, optional): Input rows processed between
+             checkpoints. Defaults to CHECKPOINT_INTERVAL.
+            fsync (bool, optional): Flush each checkpoint to disk before
+             it replaces the previous one, so it also survives a power
+             loss. Defaults to True.
+
+        Raises:
+            ValueError: When interval is not a positive number.
+        """
+
+        if interval <= 0:
+            raise ValueError(f"Checkpoint interval must be positive, got {interval}.")
+
+        self.__checkpoint_path = checkpoint_path
+        self.__interval = interval
+        self.__fsync = fsync
+        self.__snapshot_size = 0
+        self.__journal_size = 0
+
+    @property
+    def checkpoint_path(self) -> str:
+        """Accessor for the path of the checkpoint file."""
+
+        return self.__checkpoint_path
+
+    @property
+    def interval(self) -> int:
+        """Accessor for the number of rows between checkpoints."""
+
+        return self.__interval
+
+    @staticmethod
+    def input_signature(input_path: str) -> tuple:
+        """Returns the size and modification time of the input file, or
+        None when it does not exist."""
+
+        if not path.isfile(input_path):
+            return None
+
+        status = os.stat(input_path)
+
+        return status.st_size, status.st_mtime_ns
+
+    def save(self, input_path: str, position: int, rows_read: int, state: dict,
+             rejects_position: int = None) -> None:
+        """Atomically replaces the checkpoint file with a snapshot.
+
+        Args:
+            input_path (str): Input file being processed.
+            position (int): Input position after the last processed row,
+             as yielded by InputHandler.read_input_records.
+            rows_read (int): Number of input rows read so far.
+            state (dict): DataProcessor.export_state result.
+            rejects_position (int, optional): Size of the rejects file
+             at this point, see TransactionStream.position.
+        """
+
+        checkpoint = {"version": self.CHECKPOINT_VERSION,
+                      "input_path": path.abspath(input_path),
+                      "input_signature": self.input_signature(input_path),
+                      "position": position,
+                      "rows_read": rows_read,
+                      "rejects_position": rejects_position,
+                      "state": state}
+
+        directory, filename = path.split(path.abspath(self.__checkpoint_path))
+        file_descriptor, temp_path = tempfile.mkstemp(prefix=f".{filename}.",
+                                                      suffix=".tmp",
+                                                      dir=directory)
+
+        try:
+            with os.fdopen(file_descriptor, "wb") as checkpoint_file:
+                pickle.dump(checkpoint, checkpoint_file, protocol=pickle.HIGHEST_PROTOCOL)
+                self.__snapshot_size = checkpoint_file.tell()
+                if self.__fsync:
+                    checkpoint_file.flush()
+                    os.fsync(checkpoint_file.fileno())
+
+            os.replace(temp_path, self.__checkpoint_path)
+        except BaseException:
+            if path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        self.__journal_size = 0
+
+    def append(self, position: int, rows_read: int, changes: dict,
+               rejects_position: int = None) -> None:
+        """Appends a record of the changes since the last checkpoint to
+        the journal started by save.
+
+        Args:
+            position (int): Input position after the last processed row.
+            rows_read (int): Number of input rows read so far.
+            changes (dict): DataProcessor.export_changes result.
+            rejects_position (int, optional): Size of the rejects file
+             at this point.
+        """
+
+        record = {"position": position,
+                  "rows_read": rows_read,
+                  "rejects_position": rejects_position,
+                  "changes": changes}
+
+        with open(self.__checkpoint_path, "ab") as checkpoint_file:
+            start = checkpoint_file.tell()
+            pickle.dump(record, checkpoint_file, protocol=pickle.HIGHEST_PROTOCOL)
+            self.__journal_size += checkpoint_file.tell() - start
+            if self.__fsync:
+                checkpoint_file.flush()
+                os.fsync(checkpoint_file.fileno())
+
+    def load(self) -> dict:
+        """Loads the last saved checkpoint.
+
+        Raises:
+            ValueError: When the checkpoint was written by an
+             incompatible version.
+
+        Returns:
+            dict: The snapshot, with the position, rows read and rejects
+             position of the last complete record and the changes of
+             every record under "changes", or None when no checkpoint
+             exists.
+        """
+
+        if not path.isfile(self.__checkpoint_path):
+            return None
+
+        with open(self.__checkpoint_path, "rb") as checkpoint_file:
+            checkpoint = pickle.load(checkpoint_file)
+
+            if not isinstance(checkpoint, dict) or checkpoint.get("version") != self.CHECKPOINT_VERSION:
+                version = checkpoint.get("version") if isinstance(checkpoint, dict) else None
+                raise ValueError(f"Checkpoint {self.__checkpoint_path} has "
+                                 f"unsupported version {version}.")
+
+            checkpoint["changes"] = []
+
+            while True:
+                try:
+                    record = pickle.load(checkpoint_file)
+                except (EOFError, pickle.UnpicklingError):
+                    # a record cut short by a crash ends the journal.
+                    break
+
+                checkpoint["changes"].append(record["changes"])
+                checkpoint["position"] = record["position"]
+                checkpoint["rows_read"] = record["rows_read"]
+                checkpoint["rejects_position"] = record["rejects_position"]
+
+        return checkpoint
+
+    def clear(self) -> None:
+        """Removes the checkpoint file once a run has finished."""
+
+        if path.exists(self.__checkpoint_path):
+            os.remove(self.__checkpoint_path)
+
+    def run(self, input_handler: InputHandler,
+                  data_processor: DataProcessor,
+                  resume: bool = False,
+                  rejects_stream: TransactionStream = None) -> dict:
+        """Processes the input file, saving a checkpoint every interval
+        rows, and removes the checkpoint when the run completes.
+
+        Args:
+            input_handler (InputHandler): Reads the input file.
+            data_processor (DataProcessor): Receives each validated
+             batch, normally created with an empty transaction list.
+            resume (bool, optional): Continue from the saved checkpoint
+             when there is one. Defaults to False.
+            rejects_stream (TransactionStream, optional): The rejects
+             sink of input_handler, opened in append mode when resuming.
+             Rows it received after the checkpoint are dropped, since
+             they are read again.
+
+        Raises:
+            ValueError: When the checkpoint belongs to another input
+             file, or the input file changed since it was saved.
+
+        Returns:
+            dict: The DataProcessor results, as returned by
+             DataProcessor.process_data.
+        """
+
+        input_path = input_handler.file_path
+        position = 0
+        rows_read = 0
+
+        checkpoint = self.load() if resume else None
+
+        if checkpoint is not None:
+            if checkpoint["input_path"] != path.abspath(input_path):
+                raise ValueError(f"Checkpoint {self.__checkpoint_path} belongs to "
+                                 f"{checkpoint['input_path']}, not {input_path}.")
+
+            if checkpoint["input_signature"] != self.input_signature(input_path):
+                raise ValueError(f"Input {input_path} changed since checkpoint "
+                                 f"{self.__checkpoint_path} was saved.")
+
+            data_processor.restore_state(checkpoint["state"])
+
+            for changes in checkpoint["changes"]:
+                data_processor.restore_changes(changes)
+
+            position = checkpoint["position"]
+            rows_read = checkpoint["rows_read"]
+
+            if rejects_stream is not None and checkpoint["rejects_position"] is not None:
+                rejects_stream.truncate(checkpoint["rejects_position"])
+
+            data_processor.logger.info(f"Resuming from row {rows_read}")
+
+        # the journal starts from a snapshot, which also drops a record
+        # cut short by the crash.
+        changed_accounts = set(data_processor.changed_accounts)
+        suspicious_saved = len(data_processor.suspicious_transactions)
+        self.save(input_path, position, rows_read, data_processor.export_state(),
+                  rejects_stream.position if rejects_stream is not None else None)
+        data_processor.clear_changed_accounts()
+        batch = []
+
+        for _, position, transaction in input_handler.read_input_records(position):
+            batch.append(transaction)
+
+            if len(batch) == self.__interval:
+                data_processor.process_batch(input_handler.validate_batch(batch))
+                rows_read += len(batch)
+                batch = []
+                rejects_position = rejects_stream.position if rejects_stream is not None else None
+
+                if self.__journal_size > self.__snapshot_size:
+                    self.save(input_path, position, rows_read, data_processor.export_state(),
+                              rejects_position)
+                else:
+                    self.append(position, rows_read,
+                                data_processor.export_changes(data_processor.changed_accounts,
+                                                              suspicious_saved),
+                                rejects_position)
+
+                suspicious_saved = len(data_processor.suspicious_transactions)
+                changed_accounts.update(data_processor.changed_accounts)
+                data_processor.clear_changed_accounts()
+
+        data_processor.process_batch(input_handler.validate_batch(batch))
+        data_processor.changed_accounts.update(changed_accounts)
+        self.clear()
+
+        return data_processor.export_state()
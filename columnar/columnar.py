@@ -0,0 +1,362 @@
+"""Contains a class titled ColumnarFile, which writes and reads a typed,
+self-describing columnar binary format that can be memory-mapped and
+used without parsing."""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+class ColumnarFile:
+    """Reads a columnar file through a memory map.
+
+    Layout, all integers little-endian:
+        8 bytes   magic, b"FDPCOL02"
+        groups    row groups of up to ROW_GROUP_SIZE rows, each holding
+                  one block per column, every block starting on a
+                  COLUMN_ALIGNMENT boundary
+        footer    json with the row count, the name and type of each
+                  column and, for each row group, its row count and
+                  the byte offsets of its column blocks
+        8 bytes   length of the json footer
+        8 bytes   magic again
+
+    The footer comes last so rows can be written one group at a time
+    without holding the whole result in memory. Numeric blocks ("<f8"
+    64 bit floats, "<i8" 64 bit integers) are contiguous arrays, so
+    column() returns a zero-copy memoryview over the mapped file for
+    one row group. The type strings are NumPy dtype strings, so NumPy
+    users can also call numpy.frombuffer on the mapped bytes. String
+    blocks ("str") are rows + 1 "<i8" end offsets followed by the utf-8
+    encoded values.
+    """
+
+    MAGIC = b"FDPCOL02"
+    """First and last bytes of every columnar file."""
+
+    COLUMN_ALIGNMENT = 64
+    """Byte boundary every column block starts on."""
+
+    ROW_GROUP_SIZE = 65536
+    """Default number of rows in a row group."""
+
+    NUMERIC_TYPES = {"<f8": "d", "<i8": "q"}
+    """Numeric column types mapped to their array module type codes."""
+
+    STRING_TYPE = "str"
+    """Type of columns holding text."""
+
+    FILE_EXTENSION = "fcol"
+    """File extension of columnar files."""
+
+    @classmethod
+    def write(cls, output_file, header: list, rows, column_types: dict,
+              row_group_size: int = ROW_GROUP_SIZE) -> None:
+        """Writes rows to a binary file in columnar layout, one row
+        group at a time.
+
+        Args:
+            output_file: File object opened for binary writing, it
+             does not need to be seekable.
+            header (list): Column names, in row order.
+            rows (iterable): Rows of values, one value per column.
+            column_types (dict): Type of each numeric column keyed by
+             name, columns not listed are stored as strings.
+            row_group_size (int, optional): Rows held in memory and
+             written together. Defaults to ROW_GROUP_SIZE.
+
+        Raises:
+            ValueError: When a numeric column holds a non numeric value
+             or row_group_size is not positive.
+        """
+
+        if row_group_size < 1:
+            raise ValueError(f"Row group size must be positive: {row_group_size}")
+
+        types = [column_types.get(name, cls.STRING_TYPE) for name in header]
+        row_groups = []
+        row_count = 0
+        group_rows = 0
+        values = cls.__empty_columns(types)
+
+        output_file.write(cls.MAGIC)
+        written = len(cls.MAGIC)
+
+        for row in rows:
+            for index, value in enumerate(row):
+                if types[index] == "<f8":
+                    values[index].append(float(value))
+                elif types[index] == "<i8":
+                    values[index].append(int(value))
+                else:
+                    values[index].append(b"" if value is None else str(value).encode())
+
+            row_count += 1
+            group_rows += 1
+
+            if group_rows == row_group_size:
+                written = cls.__write_row_group(output_file, written, types, values,
+                                                group_rows, row_groups)
+                values = cls.__empty_columns(types)
+                group_rows = 0
+
+        if group_rows:
+            cls.__write_row_group(output_file, written, types, values,
+                                  group_rows, row_groups)
+
+        metadata = json.dumps({"rows": row_count,
+                               "columns": [{"name": name, "type": column_type}
+                                           for name, column_type in zip(header, types)],
+                               "row_groups": row_groups}).encode()
+
+        output_file.write(metadata)
+        output_file.write(struct.pack("<Q", len(metadata)))
+        output_file.write(cls.MAGIC)
+
+    @classmethod
+    def __empty_columns(cls, types: list) -> list:
+        """Returns one empty value container per column."""
+
+        return [array(cls.NUMERIC_TYPES[column_type]) if column_type != cls.STRING_TYPE
+                else [] for column_type in types]
+
+    @classmethod
+    def __write_row_group(cls, output_file, written: int, types: list, values: list,
+                          group_rows: int, row_groups: list) -> int:
+        """Writes the column blocks of one row group, records their
+        offsets in row_groups and returns the bytes written so far."""
+
+        columns = []
+
+        for column_type, column_values in zip(types, values):
+            offsets, lengths = [], []
+
+            for buffer in cls.__column_buffers(column_type, column_values):
+                offset = cls.__align(written)
+                output_file.write(b"\0" * (offset - written))
+                output_file.write(buffer)
+                offsets.append(offset)
+                lengths.append(len(buffer))
+                written = offset + len(buffer)
+
+            columns.append({"offsets": offsets, "lengths": lengths})
+
+        row_groups.append({"rows": group_rows, "columns": columns})
+
+        return written
+
+    @classmethod
+    def __column_buffers(cls, column_type: str, values) -> list:
+        """Returns the little-endian byte buffers of one column."""
+
+        if column_type != cls.STRING_TYPE:
+            return [cls.__little_endian(values)]
+
+        ends = array("q")
+        total = 0
+        ends.append(0)
+        for value in values:
+            total += len(value)
+            ends.append(total)
+
+        return [cls.__little_endian(ends), b"".join(values)]
+
+    @staticmethod
+    def __little_endian(values: array) -> bytes:
+        """Returns the bytes of an array in little-endian order."""
+
+        if sys.byteorder == "big":
+            values = array(values.typecode, values)
+            values.byteswap()
+
+        return values.tobytes()
+
+    @classmethod
+    def __align(cls, position: int) -> int:
+        """Rounds a position up to the next column boundary."""
+
+        return -(-position // cls.COLUMN_ALIGNMENT) * cls.COLUMN_ALIGNMENT
+
+    def __init__(self, file_path: str):
+        """Memory-maps a columnar file and reads its footer.
+
+        Args:
+            file_path (str): Path of a file written by ColumnarFile.write.
+
+        Raises:
+            ValueError: When the file is not a columnar file.
+        """
+
+        self.__file = open(file_path, "rb")
+
+        try:
+            self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.__file.close()
+            raise ValueError(f"{file_path} is not a columnar file.")
+
+        magic_length = len(self.MAGIC)
+
+        if (len(self.__map) < 2 * magic_length + 8
+                or self.__map[:magic_length] != self.MAGIC
+                or self.__map[-magic_length:] != self.MAGIC):
+            self.close()
+            raise ValueError(f"{file_path} is not a columnar file.")
+
+        end = len(self.__map) - magic_length - 8
+        footer_length = struct.unpack("<Q", self.__map[end:end + 8])[0]
+        metadata = json.loads(self.__map[end - footer_length:end])
+
+        self.__rows = metadata["rows"]
+        self.__columns = {column["name"]: dict(column, index=index)
+                          for index, column in enumerate(metadata["columns"])}
+        self.__row_groups = metadata["row_groups"]
+
+    @property
+    def rows(self) -> int:
+        """Returns the number of rows in the file."""
+
+        return self.__rows
+
+    @property
+    def row_group_count(self) -> int:
+        """Returns the number of row groups in the file."""
+
+        return len(self.__row_groups)
+
+    @property
+    def column_names(self) -> list:
+        """Returns the column names in file order."""
+
+        return list(self.__columns)
+
+    def column_type(self, name: str) -> str:
+        """Returns the type of a column, "<f8", "<i8" or "str"."""
+
+        return self.__columns[name]["type"]
+
+    def column(self, name: str, row_group: int = None):
+        """Returns the values of one column without parsing the file.
+
+        Args:
+            name (str): Column name.
+            row_group (int, optional): Index of the row group to read.
+             Defaults to None, every row group.
+
+        Raises:
+            KeyError: When the column does not exist.
+            IndexError: When the row group does not exist.
+
+        Returns:
+            memoryview, array or list: for numeric columns, a memoryview
+             over the mapped file when one row group is read (a copied
+             array on big-endian hosts) and a copied array when the
+             values of several row groups are joined. A list of decoded
+             values for string columns.
+        """
+
+        column = self.__columns[name]
+
+        if row_group is not None:
+            return self.__group_column(column, self.__row_groups[row_group])
+
+        if len(self.__row_groups) == 1:
+            return self.__group_column(column, self.__row_groups[0])
+
+        if column["type"] == self.STRING_TYPE:
+            values = []
+            for group in self.__row_groups:
+                values.extend(self.__group_column(column, group))
+            return values
+
+        values = array(self.NUMERIC_TYPES[column["type"]])
+        for group in self.__row_groups:
+            block = self.__group_column(column, group)
+
+            if isinstance(block, memoryview):
+                with block.cast("B") as raw:
+                    values.frombytes(raw)
+                block.release()
+            else:
+                values.extend(block)
+
+        return values
+
+    def iter_row_groups(self):
+        """Yields the columns of each row group in turn, as dictionaries
+        keyed by column name, so a large file is read one group at a
+        time. Numeric values are views that must be released before
+        closing."""
+
+        for group in self.__row_groups:
+            yield {name: self.__group_column(column, group)
+                   for name, column in self.__columns.items()}
+
+    def __group_column(self, column: dict, group: dict):
+        """Returns the values of one column in one row group."""
+
+        block = group["columns"][column["index"]]
+        offsets, lengths = block["offsets"], block["lengths"]
+
+        if column["type"] != self.STRING_TYPE:
+            return self.__numeric(column["type"], offsets[0], lengths[0])
+
+        ends = self.__numeric("<i8", offsets[0], lengths[0])
+        data = memoryview(self.__map)[offsets[1]:offsets[1] + lengths[1]]
+        values = [str(data[ends[index]:ends[index + 1]], "utf-8")
+                  for index in range(group["rows"])]
+
+        data.release()
+        if isinstance(ends, memoryview):
+            ends.release()
+
+        return values
+
+    def __numeric(self, column_type: str, offset: int, length: int):
+        """Returns a numeric buffer of the mapped file as typed values."""
+
+        view = memoryview(self.__map)[offset:offset + length]
+
+        if sys.byteorder == "big":
+            values = array(self.NUMERIC_TYPES[column_type], view.tobytes())
+            values.byteswap()
+            return values
+
+        return view.cast(self.NUMERIC_TYPES[column_type])
+
+    def iter_records(self):
+        """Yields every row as a dictionary keyed by column name, going
+        through the file one row group at a time."""
+
+        for columns in self.iter_row_groups():
+            group_rows = len(next(iter(columns.values()))) if columns else 0
+
+            for index in range(group_rows):
+                yield {name: values[index] for name, values in columns.items()}
+
+            for values in columns.values():
+                if isinstance(values, memoryview):
+                    values.release()
+
+    def to_records(self) -> list:
+        """Returns every row as a dictionary keyed by column name."""
+
+        return list(self.iter_records())
+
+    def close(self) -> None:
+        """Closes the memory map and the file. Views returned by column
+        must be released before closing."""
+
+        self.__map.close()
+        self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
@@ -0,0 +1,173 @@
+"""
+Contains a class named ConcurrentDataProcessor, it lets several threads process transaction batches at the same time by giving each thread its own DataProcessor,
+and merges their results into one DataProcessor at the end.
+"""
+
+__author__ = "Khushpreet Kaur"
+__version__ = "2.49.0.windows.1"
+__credits__ = "COMP-1327 Faculty"
+
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from data_processor.data_processor import DataProcessor
+from partial_result.partial_result import PartialResult
+
+class ConcurrentDataProcessor:
+    """
+    This class processes transaction batches pushed by several threads at once.
+    DataProcessor updates its dictionaries without locks, so each thread gets a DataProcessor of its own and no state is shared while batches are processed.
+    merge combines them once every thread is done, so the threads never wait for each other and run in parallel on free-threaded Python builds.
+    Sums are added up in any order, so the merged results match a single DataProcessor up to float rounding, with accounts and suspicious transactions in the sorted order of PartialResult.merge.
+    """
+
+    IN_FLIGHT_BATCHES_PER_WORKER = 2
+    """Batches process_batches hands to each worker ahead of time, which bounds memory use."""
+
+    def __init__(self, **processor_options):
+        """
+        Initialize the concurrent processor with the options of its DataProcessors.
+
+        Args:
+            **processor_options: Keyword arguments of DataProcessor, apart from transactions. A suspicious_sink is called under a lock, so it does not have to be thread-safe.
+        Raises:
+            ValueError: When anomaly scoring is turned on, since scores depend on the order of each account's transactions, or when transfers are matched, since the two transfers of a pair may go to different threads.
+        Attributes:
+            __processor_options (dict): Saves the options every DataProcessor is created with.
+            __local (threading.local): Stores the DataProcessor of the current thread.
+            __processors (list): Stores the DataProcessor of every thread that processed a batch.
+            __lock (threading.Lock): Guards __processors and the suspicious sink.
+        """
+
+        if processor_options.get("anomaly_z_score"):
+            raise ValueError("Anomaly scoring depends on the order of each account's "
+                             "transactions and cannot be split between threads.")
+
+        if processor_options.get("match_transfers"):
+            raise ValueError("Transfers are matched against those processed before them "
+                             "and cannot be split between threads.")
+
+        self.__lock = threading.Lock()
+        self.__processor_options = dict(processor_options)
+        self.__local = threading.local()
+        self.__processors = []
+
+        suspicious_sink = processor_options.get("suspicious_sink")
+
+        if suspicious_sink is not None:
+            def locked_sink(transaction: dict) -> None:
+                with self.__lock:
+                    suspicious_sink(transaction)
+
+            self.__processor_options["suspicious_sink"] = locked_sink
+
+    @property
+    def processors(self) -> list:
+        """Returns the DataProcessor of each thread that processed a batch."""
+
+        with self.__lock:
+            return list(self.__processors)
+
+    def process_batch(self, transactions: list) -> None:
+        """
+        It processes a batch of validated transactions into the DataProcessor of the calling thread. It can be called from any number of threads at once.
+
+        Args:
+            transactions (list): List of validated transactions to add to the results.
+        Returns:
+            None
+        """
+
+        data_processor = getattr(self.__local, "data_processor", None)
+
+        if data_processor is None:
+            data_processor = DataProcessor([], **self.__processor_options)
+            self.__local.data_processor = data_processor
+
+            with self.__lock:
+                self.__processors.append(data_processor)
+
+        data_processor.process_batch(transactions)
+
+    def process_batches(self, batches, max_workers: int = None) -> None:
+        """
+        It processes batches on a pool of worker threads. Batches are pulled from the iterable only as workers become free, so a file can be read while it is processed.
+
+        Args:
+            batches (iterable): Lists of validated transactions.
+            max_workers (int, optional): Number of worker threads. Defaults to the number of CPUs.
+        Raises:
+            Exception: The first error raised by a worker, after the batches already handed out are finished.
+        Returns:
+            None
+        """
+
+        max_workers = max_workers or os.cpu_count() or 1
+        pending = set()
+
+        with ThreadPoolExecutor(max_workers) as executor:
+            try:
+                for batch in batches:
+                    if len(pending) >= max_workers * self.IN_FLIGHT_BATCHES_PER_WORKER:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                        # result() raises the error of a failed batch.
+                        for future in done:
+                            future.result()
+
+                    pending.add(executor.submit(self.process_batch, batch))
+            finally:
+                done, pending = wait(pending)
+
+            for future in done:
+                future.result()
+
+    def merge(self) -> DataProcessor:
+        """
+        It combines the results of every thread into a new DataProcessor. It must only be called once no thread is processing a batch.
+
+        Returns:
+            DataProcessor: Returns a DataProcessor holding the merged account summaries, suspicious transactions, transaction statistics, distinct account sketches, changed accounts, daily balance changes, account transaction counts and currency statistics.
+        """
+
+        processors = self.processors
+        state = PartialResult.merge_all([PartialResult.from_state(data_processor.export_state())
+                                         for data_processor in processors]).to_state()
+
+        changed_accounts = set()
+        daily_balance_changes = {}
+        account_transaction_counts = {}
+        currency_statistics = {}
+
+        for data_processor in processors:
+            changed_accounts.update(data_processor.changed_accounts)
+
+            for account_number, changes in data_processor.daily_balance_changes.items():
+                merged_changes = daily_balance_changes.setdefault(account_number, {})
+
+                for date, change in changes.items():
+                    merged_changes[date] = merged_changes.get(date, 0) + change
+
+            for account_number, counts in data_processor.account_transaction_counts.items():
+                merged_counts = account_transaction_counts.setdefault(account_number, {})
+
+                for transaction_type, count in counts.items():
+                    merged_counts[transaction_type] = merged_counts.get(transaction_type, 0) + count
+
+            for currency, statistics in data_processor.currency_statistics.items():
+                merged_statistics = currency_statistics.setdefault(currency, {"total_amount": 0,
+                                                                              "transaction_count": 0})
+                merged_statistics["total_amount"] += statistics["total_amount"]
+                merged_statistics["transaction_count"] += statistics["transaction_count"]
+
+        state["changed_accounts"] = changed_accounts
+        state["daily_balance_changes"] = daily_balance_changes
+        state["account_transaction_counts"] = account_transaction_counts
+        state["currency_statistics"] = currency_statistics
+        state["suspicious_count"] = sum(data_processor.suspicious_transaction_count
+                                        for data_processor in processors)
+
+        merged = DataProcessor([], **self.__processor_options)
+        merged.restore_state(state)
+
+        return merged
@@ -8,6 +8,13 @@ __version__ = "2.49.0.windows.1"
 __credits__ = "COMP-1327 Faculty"
 
 import logging
+import math
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+from hyperloglog.hyperloglog import HyperLogLog
+from metrics.metrics import MetricsRegistry
+from data_processor.transfer_matcher import TransferMatcher
 
 class DataProcessor:
     """
@@ -21,12 +28,29 @@ class DataProcessor:
     UNCOMMON_CURRENCIES = ["XRP", "LTC"]
     """This list stores currencies that are not common."""
 
+    ANOMALY_MIN_HISTORY = 5
+    """Transactions an account needs before its next ones are scored against its history."""
+
+    DISTINCT_COUNT_DIMENSIONS = {"currency": "Currency",
+                                 "transaction_type": "Transaction type",
+                                 "date": "Date"}
+    """Dimensions that distinct accounts are counted for, mapped to the transaction field holding the dimension value."""
+
     def __init__(
             self,
             transactions: list,
             logging_level: str = "WARNING",
             logging_format: str = "%(asctime)s - %(levelname)s - %(message)s",
-            log_file: str = ""
+            log_file: str = "",
+            distinct_count_precision: int = 0,
+            suspicious_sink = None,
+            metrics: MetricsRegistry = None,
+            track_daily_balances: bool = False,
+            anomaly_z_score: float = 0,
+            anomaly_min_history: int = ANOMALY_MIN_HISTORY,
+            match_transfers: bool = False,
+            transfer_window_days: int = TransferMatcher.WINDOW_DAYS,
+            track_result_metrics: bool = False
         ):
         """
         Initialize the DataProcessor with transaction data and optional logging configuration.
@@ -44,11 +68,53 @@ class DataProcessor:
                 
             log_file (str, optional):
                 The file path to write log messages. If left blank (""), messages will only show on the screen.
+
+            distinct_count_precision (int, optional):
+                Precision of the HyperLogLog sketches counting distinct accounts per currency, transaction type and date.
+                Each sketch uses 2 ** precision bytes. Defaults to 0, which turns distinct counting off.
+
+            suspicious_sink (callable, optional):
+                Called with each suspicious transaction as soon as it is found, instead of keeping it in suspicious_transactions.
+                This keeps memory bounded on days with many flags. Defaults to None, which keeps every suspicious transaction in the list.
+
+            metrics (MetricsRegistry, optional):
+                Registry the processing time and the rows processed and flagged are reported to, once per batch. Defaults to None, which reports nothing.
+
+            track_daily_balances (bool, optional):
+                Keeps the net change of each account on each date, so that get_daily_balances and get_balance_at can answer without replaying transactions. Defaults to False.
+
+            anomaly_z_score (float, optional):
+                Also flags transactions whose amount is more than this many standard deviations away from the mean amount of the account's earlier transactions. Defaults to 0, which turns anomaly scoring off.
+
+            anomaly_min_history (int, optional):
+                Transactions an account needs before its next ones are scored. Defaults to ANOMALY_MIN_HISTORY.
+
+            match_transfers (bool, optional):
+                Pairs each outgoing transfer with an incoming transfer of another account, see TransferMatcher, and moves the amount between the two balances. Defaults to False, which leaves balances unchanged by transfers.
+
+            transfer_window_days (int, optional):
+                Days a transfer may be booked before or after its counterpart. Defaults to TransferMatcher.WINDOW_DAYS.
+
+            track_result_metrics (bool, optional):
+                Keeps the transaction counts of each account and the totals of each currency, which a ResultQuery derives its account metrics and currency totals from. Defaults to False, which leaves both tables empty and saves their updates on every row.
         Attributes:
             __transactions : Saves the input data of transactions.
             __account_summaries (dict): It stores total for each account.
-            __suspicious_transactions (list): Stores all suspicious transactions.
+            __suspicious_transactions (list): Stores all suspicious transactions, unless they are passed to a sink.
+            __suspicious_count (int): Counts every suspicious transaction found, including those passed to a sink.
             __transaction_statistics (dict): Stores statistics related to total transactions and amount. 
+            __distinct_accounts (dict): Stores a HyperLogLog sketch of account numbers for each value of each dimension.
+            __changed_accounts (set): Stores the account numbers whose summaries changed since the last snapshot.
+            __changed_sketches (set): Stores the dimension and value of each distinct account sketch changed since the last snapshot.
+            __daily_balance_changes (dict): Stores the net balance change of each account keyed by date, when daily balances are tracked.
+            __daily_balances (dict): Caches the daily balance series of each account until its next transaction.
+            __amount_positions (dict): Stores the position of each account in the amount moment arrays.
+            __amount_counts, __amount_means, __amount_squares (array): Store the count, mean and sum of squared deviations of the amounts of each account, updated with Welford's method.
+            __anomaly_count (int): Counts the transactions flagged by anomaly scoring.
+            __account_transaction_counts (dict): Stores the number of transactions of each account keyed by transaction type, when result metrics are tracked.
+            __currency_statistics (dict): Stores the total amount and number of transactions of each currency, when result metrics are tracked.
+            __transfer_matcher (TransferMatcher): Holds the transfers waiting for a counterpart, when transfers are matched.
+            __version (int): Counts the batches processed and states restored, so that derived results can tell when they are stale.
         Citations:
             Real Python. (2018, September 12). Logging in Python. Realpython.com; Real Python. https://realpython.com/python-logging/
 
@@ -58,7 +124,29 @@ class DataProcessor:
         self.__transactions = transactions
         self.__account_summaries = {}
         self.__suspicious_transactions = []
+        self.__suspicious_sink = suspicious_sink
+        self.__suspicious_count = 0
         self.__transaction_statistics = {}
+        self.__distinct_count_precision = distinct_count_precision
+        self.__distinct_accounts = {dimension: {} for dimension in self.DISTINCT_COUNT_DIMENSIONS}
+        self.__changed_accounts = set()
+        self.__changed_sketches = set()
+        self.__track_daily_balances = track_daily_balances
+        self.__daily_balance_changes = {}
+        self.__daily_balances = {}
+        self.__anomaly_z_score = anomaly_z_score
+        self.__anomaly_min_history = anomaly_min_history
+        self.__amount_positions = {}
+        self.__amount_counts = array("q")
+        self.__amount_means = array("d")
+        self.__amount_squares = array("d")
+        self.__anomaly_count = 0
+        self.__track_result_metrics = track_result_metrics
+        self.__account_transaction_counts = {}
+        self.__currency_statistics = {}
+        self.__transfer_matcher = TransferMatcher(transfer_window_days) if match_transfers else None
+        self.__version = 0
+        self.__metrics = metrics if metrics is not None else MetricsRegistry(enabled=False)
 
         # convert string level to logging module level
         level = getattr(logging, logging_level.upper(), logging.WARNING)
@@ -96,12 +184,93 @@ class DataProcessor:
 
         return self.__suspicious_transactions
     
+    @property
+    def suspicious_transaction_count(self) -> int:
+        """Returns the number of suspicious transactions found so far, including those passed to a sink."""
+
+        return self.__suspicious_count
+
     @property
     def transaction_statistics(self) -> dict:
         """Returns statistics of transaction data. It may include currency, amount that has been transferred, and currency. """
 
         return self.__transaction_statistics
 
+    @property
+    def distinct_accounts(self) -> dict:
+        """Returns HyperLogLog sketches of the accounts seen for each currency, transaction type and date, keyed by dimension and then by value."""
+
+        return self.__distinct_accounts
+
+    @property
+    def changed_accounts(self) -> set:
+        """Returns the account numbers whose summaries changed since the last snapshot."""
+
+        return self.__changed_accounts
+
+    @property
+    def daily_balance_changes(self) -> dict:
+        """Returns the net balance change of each account on each date it has transactions, keyed by account number and then by date."""
+
+        return self.__daily_balance_changes
+
+    @property
+    def anomaly_count(self) -> int:
+        """Returns the number of transactions flagged by anomaly scoring, including those also flagged by the fixed checks."""
+
+        return self.__anomaly_count
+
+    @property
+    def account_transaction_counts(self) -> dict:
+        """Returns the number of transactions of each account, keyed by account number and then by transaction type, empty when result metrics are not tracked."""
+
+        return self.__account_transaction_counts
+
+    @property
+    def currency_statistics(self) -> dict:
+        """Returns the total amount and number of transactions of each currency, empty when result metrics are not tracked."""
+
+        return self.__currency_statistics
+
+    @property
+    def unmatched_transfers(self) -> list:
+        """Returns the transfers still waiting for a counterpart, in the order they were processed, empty when transfers are not matched."""
+
+        return self.__transfer_matcher.pending_transfers if self.__transfer_matcher is not None else []
+
+    @property
+    def matched_transfer_count(self) -> int:
+        """Returns the number of transfer pairs matched and applied to balances."""
+
+        return self.__transfer_matcher.matched_count if self.__transfer_matcher is not None else 0
+
+    @property
+    def track_result_metrics(self) -> bool:
+        """Returns whether the account transaction counts and currency statistics are kept."""
+
+        return self.__track_result_metrics
+
+    @property
+    def version(self) -> int:
+        """Returns a number that grows each time a batch is processed or a state is restored, so results derived from an older version are stale."""
+
+        return self.__version
+
+    def clear_changed_accounts(self) -> None:
+        """
+        It marks a snapshot of the account summaries, so that changed_accounts only holds accounts updated after this call.
+        The distinct account sketches and waiting transfers are marked too, so that export_changes only returns what changed after this call.
+
+        Returns:
+            None
+        """
+
+        self.__changed_accounts.clear()
+        self.__changed_sketches.clear()
+
+        if self.__transfer_matcher is not None:
+            self.__transfer_matcher.mark_saved()
+
     def process_data(self) -> dict:
         """
         It process transaction data and return account summaries, suspicious transactions, and transaction statistics.
@@ -109,27 +278,241 @@ class DataProcessor:
         Returns:
             dict: Returns a dictionary containing summaries of accounts,
                   transactions that are suspicious,
-                  statistics of transactions made.
+                  statistics of transactions made,
+                  sketches of distinct accounts.
         """
 
-        for transaction in self.__transactions:
-            self.update_account_summary(transaction)
-            self.check_suspicious_transactions(transaction)
-            self.update_transaction_statistics(transaction)
+        self.process_batch(self.__transactions)
 
         # ensures the log entry appears only after processing is done.
         self.logger.info("Data Processing Complete")
 
+        return self.export_state()
+
+    def process_batch(self, transactions: list) -> None:
+        """
+        It processes a batch of transactions into the running account summaries, suspicious transactions and transaction statistics.
+        It can be called repeatedly to feed transactions in as they are read.
+
+        Args:
+            transactions (list): List of validated transactions to add to the results.
+        Returns:
+            None
+        """
+
+        flagged_before = self.__suspicious_count
+        # bumped first, so results derived before a batch that fails part way are stale too.
+        self.__version += 1
+
+        with self.__metrics.stage("process"):
+            for transaction in transactions:
+                # the amount is parsed once and shared by every update of the row.
+                amount = float(transaction["Amount"])
+                self.update_account_summary(transaction, amount)
+                self.check_suspicious_transactions(transaction, amount)
+                self.update_transaction_statistics(transaction, amount)
+
+                if self.__track_result_metrics:
+                    self.update_currency_statistics(transaction, amount)
+
+                if self.__distinct_count_precision:
+                    self.update_distinct_accounts(transaction)
+
+        self.__metrics.increment("rows_processed", len(transactions))
+        self.__metrics.increment("transactions_flagged", self.__suspicious_count - flagged_before)
+
+    def export_state(self) -> dict:
+        """
+        It returns the aggregate state built so far, so that it can be saved and restored later with restore_state.
+
+        Returns:
+            dict: Returns a dictionary containing summaries of accounts,
+                  transactions that are suspicious,
+                  statistics of transactions made,
+                  sketches of distinct accounts,
+                  accounts changed since the last snapshot,
+                  daily balance changes of each account,
+                  running amount moments of each account,
+                  transaction counts of each account,
+                  statistics of each currency,
+                  transfers waiting for a counterpart, their arrival numbers and the number of pairs matched.
+        """
+
         return {"account_summaries": self.__account_summaries,
                 "suspicious_transactions": self.__suspicious_transactions,
-                "transaction_statistics": self.__transaction_statistics}
+                "transaction_statistics": self.__transaction_statistics,
+                "distinct_accounts": self.__distinct_accounts,
+                "changed_accounts": self.__changed_accounts,
+                "daily_balance_changes": self.__daily_balance_changes,
+                "amount_moments": {"account_numbers": list(self.__amount_positions),
+                                   "counts": self.__amount_counts,
+                                   "means": self.__amount_means,
+                                   "squares": self.__amount_squares},
+                "account_transaction_counts": self.__account_transaction_counts,
+                "currency_statistics": self.__currency_statistics,
+                "pending_transfers": self.unmatched_transfers,
+                "pending_transfer_arrivals": (self.__transfer_matcher.pending_arrivals
+                                              if self.__transfer_matcher is not None else []),
+                "matched_transfer_count": self.matched_transfer_count}
+
+    def restore_state(self, state: dict) -> None:
+        """
+        It replaces the aggregate state with one returned by export_state, so that processing can continue from a saved point.
+        The existing dictionaries and list are updated in place, so references returned by the properties stay valid.
+
+        Args:
+            state (dict): A dictionary returned by export_state.
+        Logs:
+            INFO - after the state is restored.
+        Returns:
+            None
+        """
 
-    def update_account_summary(self, transaction: dict) -> None:
+        self.__account_summaries.clear()
+        self.__account_summaries.update(state["account_summaries"])
+        self.__suspicious_transactions[:] = state["suspicious_transactions"]
+        # the count also covers transactions passed to a sink, when saved.
+        self.__suspicious_count = state.get("suspicious_count", len(self.__suspicious_transactions))
+        self.__transaction_statistics.clear()
+        self.__transaction_statistics.update(state["transaction_statistics"])
+
+        # checkpoints saved without distinct counting have no sketches.
+        for dimension, sketches in state.get("distinct_accounts", {}).items():
+            self.__distinct_accounts[dimension] = dict(sketches)
+
+        self.__changed_accounts.clear()
+        self.__changed_accounts.update(state.get("changed_accounts", ()))
+        self.__changed_sketches.clear()
+
+        self.__daily_balance_changes.clear()
+        self.__daily_balance_changes.update({account_number: dict(changes) for account_number, changes
+                                             in state.get("daily_balance_changes", {}).items()})
+        self.__daily_balances.clear()
+
+        amount_moments = state.get("amount_moments", {})
+        self.__amount_positions = {account_number: position for position, account_number
+                                   in enumerate(amount_moments.get("account_numbers", ()))}
+        self.__amount_counts = array("q", amount_moments.get("counts", ()))
+        self.__amount_means = array("d", amount_moments.get("means", ()))
+        self.__amount_squares = array("d", amount_moments.get("squares", ()))
+
+        self.__account_transaction_counts.clear()
+        self.__account_transaction_counts.update({account_number: dict(counts) for account_number, counts
+                                                  in state.get("account_transaction_counts", {}).items()})
+        self.__currency_statistics.clear()
+        self.__currency_statistics.update({currency: dict(statistics) for currency, statistics
+                                           in state.get("currency_statistics", {}).items()})
+
+        if self.__transfer_matcher is not None:
+            self.__transfer_matcher.restore(state.get("pending_transfers", []),
+                                            state.get("matched_transfer_count", 0),
+                                            state.get("pending_transfer_arrivals"))
+
+        self.__version += 1
+
+        self.logger.info(f"State restored for {len(self.__account_summaries)} accounts")
+
+    def export_changes(self, account_numbers, suspicious_start: int = 0) -> dict:
+        """
+        It returns the part of the aggregate state that changed for the given accounts, so that a checkpoint can save only what changed since the last one.
+        Of the results that are not kept per account, the distinct account sketches and waiting transfers changed since clear_changed_accounts and the suspicious transactions found from suspicious_start on are returned, the other ones are small and are returned whole.
+
+        Args:
+            account_numbers (iterable): The accounts changed since the state was last saved, usually changed_accounts.
+            suspicious_start (int, optional): Number of suspicious transactions already saved. Defaults to 0.
+        Returns:
+            dict: Returns a dictionary to pass to restore_changes after the saved state is restored.
+        """
+
+        account_numbers = list(account_numbers)
+        amount_moments = {}
+
+        for account_number in account_numbers:
+            position = self.__amount_positions.get(account_number)
+
+            if position is not None:
+                amount_moments[account_number] = (self.__amount_counts[position],
+                                                  self.__amount_means[position],
+                                                  self.__amount_squares[position])
+
+        return {"account_summaries": {account_number: self.__account_summaries[account_number]
+                                      for account_number in account_numbers
+                                      if account_number in self.__account_summaries},
+                "suspicious_transactions": self.__suspicious_transactions[suspicious_start:],
+                "suspicious_count": self.__suspicious_count,
+                "transaction_statistics": self.__transaction_statistics,
+                "distinct_accounts": {dimension: {value: self.__distinct_accounts[dimension][value]
+                                                  for changed_dimension, value in self.__changed_sketches
+                                                  if changed_dimension == dimension}
+                                      for dimension in self.__distinct_accounts},
+                "daily_balance_changes": {account_number: self.__daily_balance_changes[account_number]
+                                          for account_number in account_numbers
+                                          if account_number in self.__daily_balance_changes},
+                "amount_moments": amount_moments,
+                "account_transaction_counts": {account_number: self.__account_transaction_counts[account_number]
+                                               for account_number in account_numbers
+                                               if account_number in self.__account_transaction_counts},
+                "currency_statistics": self.__currency_statistics,
+                "pending_transfers": (self.__transfer_matcher.export_changes()
+                                      if self.__transfer_matcher is not None else None)}
+
+    def restore_changes(self, changes: dict) -> None:
+        """
+        It applies changes returned by export_changes on top of the restored state, in the order they were exported.
+
+        Args:
+            changes (dict): A dictionary returned by export_changes.
+        Returns:
+            None
+        """
+
+        self.__account_summaries.update({account_number: dict(summary) for account_number, summary
+                                         in changes["account_summaries"].items()})
+        self.__suspicious_transactions.extend(changes["suspicious_transactions"])
+        self.__suspicious_count = changes["suspicious_count"]
+        self.__transaction_statistics.clear()
+        self.__transaction_statistics.update({transaction_type: dict(statistics) for transaction_type, statistics
+                                              in changes["transaction_statistics"].items()})
+
+        for dimension, sketches in changes["distinct_accounts"].items():
+            self.__distinct_accounts[dimension].update(sketches)
+
+        for account_number, account_changes in changes["daily_balance_changes"].items():
+            self.__daily_balance_changes[account_number] = dict(account_changes)
+            self.__daily_balances.pop(account_number, None)
+
+        for account_number, (count, mean, squares) in changes["amount_moments"].items():
+            position = self.__amount_positions.get(account_number)
+
+            if position is None:
+                position = self.__amount_positions[account_number] = len(self.__amount_counts)
+                self.__amount_counts.append(count)
+                self.__amount_means.append(mean)
+                self.__amount_squares.append(squares)
+            else:
+                self.__amount_counts[position] = count
+                self.__amount_means[position] = mean
+                self.__amount_squares[position] = squares
+
+        self.__account_transaction_counts.update({account_number: dict(counts) for account_number, counts
+                                                  in changes["account_transaction_counts"].items()})
+        self.__currency_statistics.clear()
+        self.__currency_statistics.update({currency: dict(statistics) for currency, statistics
+                                           in changes["currency_statistics"].items()})
+
+        if self.__transfer_matcher is not None:
+            self.__transfer_matcher.restore_changes(changes["pending_transfers"])
+
+        self.__changed_accounts.update(changes["account_summaries"])
+        self.__version += 1
+
+    def update_account_summary(self, transaction: dict, amount: float = None) -> None:
         """
         It updates the account summaries on specified transactions.
         
         Args:
             transactions (dict): It is a dictionary that contains data of transactions like Account Number, Transaction type, Amount.
+            amount (float, optional): The Amount of the transaction already parsed, it is parsed from the transaction when not given.
         Logs:
             INFO - after account summary is updated.
         Returns:
@@ -138,7 +521,7 @@ class DataProcessor:
 
         account_number = transaction["Account number"]
         transaction_type = transaction["Transaction type"]
-        amount = float(transaction["Amount"])
+        amount = float(transaction["Amount"]) if amount is None else amount
 
         if account_number not in self.__account_summaries:
             self.__account_summaries[account_number] = {
@@ -154,37 +537,164 @@ class DataProcessor:
         elif transaction_type == "withdrawal":
             self.__account_summaries[account_number]["balance"] -= amount
             self.__account_summaries[account_number]["total_withdrawals"] += amount
+        elif transaction_type == "transfer" and self.__transfer_matcher is not None:
+            self.match_transfer(transaction)
+
+        if self.__track_result_metrics:
+            counts = self.__account_transaction_counts.setdefault(account_number, {})
+            counts[transaction_type] = counts.get(transaction_type, 0) + 1
+
+        self.__changed_accounts.add(account_number)
+
+        if self.__track_daily_balances and transaction_type in ("deposit", "withdrawal"):
+            self.update_daily_balance_changes(transaction, amount)
 
         # log account update
         self.logger.info(f"Account summary updated: {account_number}")
 
-    def check_suspicious_transactions(self, transaction: dict) -> None:
+    def match_transfer(self, transaction: dict) -> None:
+        """
+        It looks for the counterpart of a transfer among the transfers waiting for one. When it is found, the amount is taken from the balance of the outgoing account and added to that of the incoming account, otherwise the transfer waits for its counterpart.
+        Deposit and withdrawal totals are left unchanged, transfers only move balances.
+
+        Args:
+            transaction (dict): A dictionary containing transaction details about Account number, Date, Amount, Currency and Description.
+        Logs:
+            INFO - when a pair is matched.
+        Returns:
+            None
+        """
+
+        counterpart = self.__transfer_matcher.match(transaction)
+
+        if counterpart is None:
+            return
+
+        if TransferMatcher.get_direction(transaction) == "out":
+            outgoing, incoming = transaction, counterpart
+        else:
+            outgoing, incoming = counterpart, transaction
+
+        amount = float(outgoing["Amount"])
+
+        for transfer, change in ((outgoing, -amount), (incoming, amount)):
+            account_number = transfer["Account number"]
+            self.__account_summaries[account_number]["balance"] += change
+            self.__changed_accounts.add(account_number)
+
+            if self.__track_daily_balances:
+                self.__add_daily_balance_change(account_number, transfer.get("Date") or "", change)
+
+        self.logger.info(f"Transfer matched: {outgoing['Account number']} to {incoming['Account number']}")
+
+    def check_suspicious_transactions(self, transaction: dict, amount: float = None) -> None:
         """
         It checks whether a transaction that has been made is suspicious by checking amount and currency. The transaction will be suspicious if transaction amount is greater than 10000 or currency is uncommon.
+        When anomaly scoring is on, it is also suspicious if its amount is more than anomaly_z_score standard deviations away from the account's earlier amounts.
+        Suspicious transactions are passed to the suspicious sink when there is one, otherwise they are added to suspicious_transactions.
         
         Args: 
             transaction (dict): It is a dictionary that contains data of transactions like 'Amount' and 'Currency'.
+            amount (float, optional): The Amount of the transaction already parsed, it is parsed from the transaction when not given.
         Logs:
             WARNING - used when a suspicious transaction is detected.
         Returns:
             None
         """
 
-        amount = float(transaction["Amount"])
+        amount = float(transaction["Amount"]) if amount is None else amount
         currency = transaction["Currency"]
+        anomalous = False
+
+        if self.__anomaly_z_score:
+            anomalous = self.score_transaction(transaction, amount) > self.__anomaly_z_score
+            self.__anomaly_count += anomalous
 
         if amount > self.LARGE_TRANSACTION_THRESHOLD \
-            or currency in self.UNCOMMON_CURRENCIES:
-            self.__suspicious_transactions.append(transaction)
+            or currency in self.UNCOMMON_CURRENCIES or anomalous:
+            self.__suspicious_count += 1
+
+            if self.__suspicious_sink is None:
+                self.__suspicious_transactions.append(transaction)
+            else:
+                self.__suspicious_sink(transaction)
 
             self.logger.warning(f"Suspicious transaction: {transaction}")
 
-    def update_transaction_statistics(self, transaction: dict) -> None:
+    def score_transaction(self, transaction: dict, amount: float = None) -> float:
+        """
+        It scores a transaction by how many standard deviations its amount is from the mean amount of the account's earlier transactions, then adds the amount to the account's running moments with Welford's method.
+        Each account takes one slot in three compact arrays, so scoring costs O(1) per transaction and O(accounts) memory.
+
+        Args:
+            transaction (dict): A dictionary containing transaction details about Account number and Amount.
+            amount (float, optional): The Amount of the transaction already parsed, it is parsed from the transaction when not given.
+        Returns:
+            float: Returns the absolute z-score, 0 while the account has fewer than anomaly_min_history earlier transactions, and infinity when its earlier amounts were all equal and this one differs.
+        Citations:
+            Welford, B. P. (1962). Note on a method for calculating corrected sums of squares and products. Technometrics, 4(3), 419-420.
+        """
+
+        account_number = transaction["Account number"]
+        amount = float(transaction["Amount"]) if amount is None else amount
+        position = self.__amount_positions.get(account_number)
+
+        if position is None:
+            position = self.__amount_positions[account_number] = len(self.__amount_counts)
+            self.__amount_counts.append(0)
+            self.__amount_means.append(0.0)
+            self.__amount_squares.append(0.0)
+
+        count = self.__amount_counts[position]
+        mean = self.__amount_means[position]
+        z_score = 0.0
+
+        if count >= self.__anomaly_min_history and count > 1:
+            deviation = abs(amount - mean)
+            standard_deviation = math.sqrt(self.__amount_squares[position] / (count - 1))
+
+            if standard_deviation:
+                z_score = deviation / standard_deviation
+            elif deviation:
+                z_score = math.inf
+
+        count += 1
+        delta = amount - mean
+        mean += delta / count
+
+        self.__amount_counts[position] = count
+        self.__amount_means[position] = mean
+        self.__amount_squares[position] += delta * (amount - mean)
+
+        return z_score
+
+    def get_amount_statistics(self, account_number) -> tuple:
+        """
+        It returns the running moments of an account's transaction amounts, kept while anomaly scoring is on.
+
+        Args:
+            account_number: The account to look up.
+        Returns:
+            tuple: Returns the number of transactions, the mean amount and the sample standard deviation, which is 0 below two transactions.
+        """
+
+        position = self.__amount_positions.get(account_number)
+
+        if position is None:
+            return 0, 0.0, 0.0
+
+        count = self.__amount_counts[position]
+        variance = self.__amount_squares[position] / (count - 1) if count > 1 else 0.0
+
+        return count, self.__amount_means[position], math.sqrt(variance)
+
+    def update_transaction_statistics(self, transaction: dict, amount: float = None) -> None:
         """
         It updates the transaction statistics as per transaction type and amount.
         
         Args: 
             transaction (dict): A dictionary containing transaction details about Transaction type and Amount.
+            amount (float, optional): The Amount of the transaction already parsed, it is parsed from the transaction when not given.
         Logs:
             INFO - when statistics are updated for transaction type
         Returns:
@@ -192,7 +702,7 @@ class DataProcessor:
         """
 
         transaction_type = transaction["Transaction type"]
-        amount = float(transaction["Amount"])
+        amount = float(transaction["Amount"]) if amount is None else amount
 
         if transaction_type not in self.__transaction_statistics:
             self.__transaction_statistics[transaction_type] = {
@@ -206,19 +716,144 @@ class DataProcessor:
         # log update
         self.logger.info(f"Updated transaction statistics for: {transaction_type}")
 
+    def update_currency_statistics(self, transaction: dict, amount: float = None) -> None:
+        """
+        It adds the amount of a transaction to the total amount and number of transactions of its currency.
+
+        Args:
+            transaction (dict): A dictionary containing transaction details about Currency and Amount.
+            amount (float, optional): The Amount of the transaction already parsed, it is parsed from the transaction when not given.
+        Returns:
+            None
+        """
+
+        currency = transaction["Currency"]
+        statistics = self.__currency_statistics.get(currency)
+
+        if statistics is None:
+            statistics = self.__currency_statistics[currency] = {"total_amount": 0,
+                                                                 "transaction_count": 0}
+
+        statistics["total_amount"] += float(transaction["Amount"]) if amount is None else amount
+        statistics["transaction_count"] += 1
+
+    def update_daily_balance_changes(self, transaction: dict, amount: float = None) -> None:
+        """
+        It adds the amount of a deposit or withdrawal to the net change of its account on its date, and drops the cached balance series of the account.
+        Transactions without a date count as changes before every dated one.
+
+        Args:
+            transaction (dict): A dictionary containing transaction details about Account number, Date, Transaction type and Amount.
+            amount (float, optional): The Amount of the transaction already parsed, it is parsed from the transaction when not given.
+        Returns:
+            None
+        """
+
+        amount = float(transaction["Amount"]) if amount is None else amount
+
+        if transaction["Transaction type"] == "withdrawal":
+            amount = -amount
+
+        self.__add_daily_balance_change(transaction["Account number"], transaction.get("Date") or "", amount)
+
+    def __add_daily_balance_change(self, account_number, date: str, amount: float) -> None:
+        """
+        It adds a signed amount to the net change of an account on a date and drops the cached balance series of the account.
+        """
+
+        changes = self.__daily_balance_changes.setdefault(account_number, {})
+        changes[date] = changes.get(date, 0) + amount
+
+        self.__daily_balances.pop(account_number, None)
+
+    def get_daily_balances(self) -> dict:
+        """
+        It returns the balance of each account at the end of each date it has transactions, as a running sum of its daily changes in date order.
+        Balances on dates without transactions are those of the latest earlier date. Series are cached until the account's next transaction.
+
+        Returns:
+            dict: Returns a tuple of the sorted dates and the balances at the end of them, keyed by account number.
+        """
+
+        for account_number in self.__daily_balance_changes:
+            if account_number not in self.__daily_balances:
+                self.__daily_balances[account_number] = self.__build_daily_balances(account_number)
+
+        return self.__daily_balances
+
+    def __build_daily_balances(self, account_number) -> tuple:
+        """
+        It sorts the daily changes of one account by date and sums them up.
+
+        Returns:
+            tuple: Returns the sorted dates and the balance at the end of each of them.
+        """
+
+        changes = self.__daily_balance_changes[account_number]
+        dates = sorted(changes)
+
+        return dates, list(accumulate(changes[date] for date in dates))
+
+    def get_balance_at(self, account_number, date: str) -> float:
+        """
+        It finds the balance of an account at the end of a date by binary search in its daily balance series.
+
+        Args:
+            account_number: The account to look up.
+            date (str): The date in the YYYY-MM-DD form of the input.
+        Returns:
+            float: Returns the balance at the end of the date, 0 before the account's first transaction or for an unknown account.
+        """
+
+        if account_number not in self.__daily_balance_changes:
+            return 0
+
+        if account_number not in self.__daily_balances:
+            self.__daily_balances[account_number] = self.__build_daily_balances(account_number)
+
+        dates, balances = self.__daily_balances[account_number]
+        position = bisect_right(dates, date)
+
+        return balances[position - 1] if position else 0
+
+    def update_distinct_accounts(self, transaction: dict) -> None:
+        """
+        It adds the account number of a transaction to the distinct account sketches of its currency, transaction type and date.
+        The account number is hashed once and the hash is added to each sketch.
+
+        Args:
+            transaction (dict): A dictionary containing transaction details about Account number, Currency, Transaction type and Date.
+        Returns:
+            None
+        """
+
+        account_hash = HyperLogLog.hash(transaction["Account number"])
+
+        for dimension, field in self.DISTINCT_COUNT_DIMENSIONS.items():
+            sketches = self.__distinct_accounts[dimension]
+            value = transaction.get(field)
+
+            if value not in sketches:
+                sketches[value] = HyperLogLog(self.__distinct_count_precision)
+
+            if sketches[value].add_hash(account_hash):
+                self.__changed_sketches.add((dimension, value))
+
     def get_average_transaction_amount(self, transaction_type: str) -> float:
         """
         It analyze the transaction amount for specific transaction. It calculates total amount and number of transactions for different transaction types and returns average amount.
-        It returns 0 if there are no transactions of any transaction type.
+        It returns 0 if there are no transactions of the transaction type, including types never seen.
 
         Args:
             transaction_type (str): Calculates the average amount for specific transaction type.
         
         Returns:
-            float: Returns average transaction amount of specific transaction type, if there is no transaction for any type it returns 0.
+            float: Returns average transaction amount of specific transaction type, if there is no transaction of the type it returns 0.
         """
-        
-        total_amount = self.__transaction_statistics[transaction_type]["total_amount"]
-        transaction_count = self.__transaction_statistics[transaction_type]["transaction_count"]
-    
-        return 0 if transaction_count == 0 else total_amount / transaction_count
+
+        statistics = self.__transaction_statistics.get(transaction_type)
+
+        if not statistics or statistics["transaction_count"] == 0:
+            return 0
+
+        return statistics["total_amount"] / statistics["transaction_count"]
@@ -0,0 +1,163 @@
+"""
+Contains a class named ResultQuery, it answers repeated queries over the results of a DataProcessor from derived metrics that are materialized once,
+and rebuilt only after the DataProcessor has processed new transactions.
+"""
+
+__author__ = "Khushpreet Kaur"
+__version__ = "2.49.0.windows.1"
+__credits__ = "COMP-1327 Faculty"
+
+from data_processor.data_processor import DataProcessor
+
+class ResultQuery:
+    """
+    This class materializes metrics derived from a DataProcessor: the average amount of each transaction type, the average deposit, average withdrawal and deposit to withdrawal ratio of each account, and the totals of each currency.
+    Each metric table is built in one pass the first time it is queried, and kept until the version of the DataProcessor changes, so repeated queries between batches are dictionary lookups.
+    Returned tables are shared with later queries and must not be modified.
+    """
+
+    def __init__(self, data_processor: DataProcessor):
+        """
+        Initialize the query layer over a DataProcessor.
+
+        Args:
+            data_processor (DataProcessor): Holds the results the metrics are derived from, it may keep processing batches.
+        Raises:
+            ValueError: When the DataProcessor does not track result metrics, see its track_result_metrics option.
+        Attributes:
+            __data_processor (DataProcessor): Saves the DataProcessor queried.
+            __tables (dict): Stores each materialized metric table with the DataProcessor version it was built from, keyed by table name.
+            __refresh_count (int): Counts the metric tables built so far.
+        """
+
+        if not data_processor.track_result_metrics:
+            raise ValueError("ResultQuery needs a DataProcessor created with track_result_metrics=True.")
+
+        self.__data_processor = data_processor
+        self.__tables = {}
+        self.__refresh_count = 0
+
+    @property
+    def data_processor(self) -> DataProcessor:
+        """Returns the DataProcessor queried."""
+
+        return self.__data_processor
+
+    @property
+    def refresh_count(self) -> int:
+        """Returns the number of metric tables built so far, which only grows when a table is queried after new data."""
+
+        return self.__refresh_count
+
+    @property
+    def average_transaction_amounts(self) -> dict:
+        """Returns the average amount of each transaction type."""
+
+        return self.__table("average_transaction_amounts", self.__build_average_transaction_amounts)
+
+    @property
+    def account_metrics(self) -> dict:
+        """Returns the average deposit, average withdrawal and deposit to withdrawal ratio of each account, keyed by account number."""
+
+        return self.__table("account_metrics", self.__build_account_metrics)
+
+    @property
+    def currency_totals(self) -> dict:
+        """Returns the total amount, number of transactions and average amount of each currency."""
+
+        return self.__table("currency_totals", self.__build_currency_totals)
+
+    def get_average_transaction_amount(self, transaction_type: str) -> float:
+        """
+        It returns the average amount of a transaction type from the materialized averages.
+
+        Args:
+            transaction_type (str): The transaction type to look up.
+        Returns:
+            float: Returns the average amount, 0 for a transaction type without transactions.
+        """
+
+        return self.average_transaction_amounts.get(transaction_type, 0)
+
+    def get_account_metrics(self, account_number) -> dict:
+        """
+        It returns the derived metrics of one account from the materialized account metrics.
+
+        Args:
+            account_number: The account to look up.
+        Returns:
+            dict: Returns the average deposit, average withdrawal and deposit to withdrawal ratio of the account, or None for an account without transactions.
+        """
+
+        return self.account_metrics.get(account_number)
+
+    def invalidate(self) -> None:
+        """
+        It drops every materialized table, for when the DataProcessor's dictionaries were changed without processing a batch or restoring a state.
+
+        Returns:
+            None
+        """
+
+        self.__tables.clear()
+
+    def __table(self, name: str, build) -> dict:
+        """
+        It returns a materialized table, building it again when the DataProcessor has changed since it was built.
+
+        Returns:
+            dict: Returns the table.
+        """
+
+        version = self.__data_processor.version
+        cached = self.__tables.get(name)
+
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        table = build()
+        self.__tables[name] = (version, table)
+        self.__refresh_count += 1
+
+        return table
+
+    def __build_average_transaction_amounts(self) -> dict:
+        """It divides the total amount of each transaction type by its number of transactions."""
+
+        return {transaction_type: statistics["total_amount"] / statistics["transaction_count"]
+                for transaction_type, statistics
+                in self.__data_processor.transaction_statistics.items()
+                if statistics["transaction_count"]}
+
+    def __build_account_metrics(self) -> dict:
+        """
+        It derives the metrics of every account in one pass over the account summaries.
+        The ratio is None for an account without withdrawals.
+        """
+
+        transaction_counts = self.__data_processor.account_transaction_counts
+        account_metrics = {}
+
+        for account_number, summary in self.__data_processor.account_summaries.items():
+            counts = transaction_counts.get(account_number, {})
+            deposit_count = counts.get("deposit", 0)
+            withdrawal_count = counts.get("withdrawal", 0)
+            total_deposits = summary["total_deposits"]
+            total_withdrawals = summary["total_withdrawals"]
+
+            account_metrics[account_number] = {
+                "average_deposit": total_deposits / deposit_count if deposit_count else 0,
+                "average_withdrawal": total_withdrawals / withdrawal_count if withdrawal_count else 0,
+                "deposit_withdrawal_ratio": total_deposits / total_withdrawals if total_withdrawals else None
+            }
+
+        return account_metrics
+
+    def __build_currency_totals(self) -> dict:
+        """It copies the statistics of each currency and adds their average amount."""
+
+        return {currency: {"total_amount": statistics["total_amount"],
+                           "transaction_count": statistics["transaction_count"],
+                           "average_amount": statistics["total_amount"] / statistics["transaction_count"]}
+                for currency, statistics in self.__data_processor.currency_statistics.items()
+                if statistics["transaction_count"]}
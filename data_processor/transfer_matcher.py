@@ -0,0 +1,260 @@
+"""
+Contains a class named TransferMatcher, it pairs outgoing transfers with the incoming transfers of other accounts that have the same amount and currency and a date within a window,
+using hash indexes so that millions of transfers are matched in linear time.
+"""
+
+__author__ = "Khushpreet Kaur"
+__version__ = "2.49.0.windows.1"
+__credits__ = "COMP-1327 Faculty"
+
+from datetime import date
+
+class TransferMatcher:
+    """
+    This class matches transfers as they arrive, in any order.
+    Transfers waiting for their counterpart are indexed by direction, currency and amount in cents and then by day, so a new transfer finds its counterpart with one lookup and a probe of the days of the window instead of searching every waiting transfer.
+    The counterpart on the closest day is taken, and the earliest to arrive among those on the same day.
+    """
+
+    WINDOW_DAYS = 1
+    """Days a transfer may be booked before or after its counterpart."""
+
+    DIRECTION_FIELD = "Direction"
+    """Optional transaction field holding "in" or "out", it takes precedence over the description."""
+
+    INCOMING_DESCRIPTION_PREFIX = "transfer from"
+    """Descriptions starting with this text, in any case, are incoming transfers, every other transfer is outgoing."""
+
+    def __init__(self, window_days: int = WINDOW_DAYS):
+        """
+        Initialize the matcher with the date window of a match.
+
+        Args:
+            window_days (int, optional): Days a transfer may be booked before or after its counterpart. Defaults to WINDOW_DAYS.
+        Raises:
+            ValueError: When window_days is negative.
+        Attributes:
+            __probe_offsets (list): Stores the day offsets searched for a counterpart, closest first.
+            __pending (dict): Stores the transfers waiting for a counterpart in arrival order, keyed by arrival number.
+            __indexes (dict): Stores the arrival numbers of waiting transfers keyed by direction, then by currency and amount in cents, then by day.
+            __arrivals (int): Counts the transfers added.
+            __matched_count (int): Counts the pairs matched.
+            __saved_arrivals (int): Stores the value of __arrivals when the waiting transfers were last marked as saved.
+            __matched_saved (list): Stores the arrival numbers of transfers waiting when last marked as saved that were matched since.
+        """
+
+        if window_days < 0:
+            raise ValueError(f"Transfer window must not be negative: {window_days}")
+
+        self.__probe_offsets = [0]
+
+        for offset in range(1, window_days + 1):
+            self.__probe_offsets += [-offset, offset]
+
+        self.__pending = {}
+        self.__indexes = {"in": {}, "out": {}}
+        self.__arrivals = 0
+        self.__matched_count = 0
+        self.__saved_arrivals = 0
+        self.__matched_saved = []
+
+    @property
+    def pending_transfers(self) -> list:
+        """Returns the transfers still waiting for a counterpart, in arrival order."""
+
+        return list(self.__pending.values())
+
+    @property
+    def pending_arrivals(self) -> list:
+        """Returns the arrival numbers of the transfers still waiting for a counterpart, in the order of pending_transfers."""
+
+        return list(self.__pending)
+
+    @property
+    def matched_count(self) -> int:
+        """Returns the number of transfer pairs matched."""
+
+        return self.__matched_count
+
+    @classmethod
+    def get_direction(cls, transaction: dict) -> str:
+        """
+        It returns whether a transfer leaves or enters its account, from its Direction field when it has one, otherwise from its description.
+
+        Args:
+            transaction (dict): A dictionary containing transaction details about Description.
+        Returns:
+            str: Returns "in" or "out".
+        """
+
+        direction = (transaction.get(cls.DIRECTION_FIELD) or "").strip().lower()
+
+        if direction in ("in", "out"):
+            return direction
+
+        description = (transaction.get("Description") or "").lstrip().lower()
+
+        return "in" if description.startswith(cls.INCOMING_DESCRIPTION_PREFIX) else "out"
+
+    def match(self, transaction: dict) -> dict:
+        """
+        It looks for a waiting transfer of another account in the opposite direction with the same currency and amount within the window.
+        The counterpart found is no longer waiting, when none is found the transfer waits for one instead.
+
+        Args:
+            transaction (dict): A dictionary containing transaction details about Account number, Date, Amount, Currency and Description.
+        Returns:
+            dict: Returns the counterpart, or None when the transfer is left waiting.
+        """
+
+        direction, key, day = self.__index_keys(transaction)
+        account_number = transaction["Account number"]
+        opposite_index = self.__indexes["out" if direction == "in" else "in"]
+        counterparts = opposite_index.get(key)
+
+        if counterparts:
+            # transfers without a valid date only match on the same text.
+            probe_days = ([day + offset for offset in self.__probe_offsets]
+                          if isinstance(day, int) else [day])
+
+            for probe_day in probe_days:
+                arrivals = counterparts.get(probe_day)
+
+                if not arrivals:
+                    continue
+
+                for position, arrival in enumerate(arrivals):
+                    counterpart = self.__pending[arrival]
+
+                    if counterpart["Account number"] != account_number:
+                        del arrivals[position]
+
+                        if not arrivals:
+                            del counterparts[probe_day]
+
+                            if not counterparts:
+                                del opposite_index[key]
+
+                        del self.__pending[arrival]
+                        self.__matched_count += 1
+
+                        if arrival <= self.__saved_arrivals:
+                            self.__matched_saved.append(arrival)
+
+                        return counterpart
+
+        self.__arrivals += 1
+        self.__add(self.__arrivals, transaction, direction, key, day)
+
+        return None
+
+    def restore(self, pending_transfers: list, matched_count: int = 0, arrivals: list = None) -> None:
+        """
+        It replaces the waiting transfers with saved ones, for example those of pending_transfers in a saved state.
+
+        Args:
+            pending_transfers (list): The transfers waiting for a counterpart, in arrival order.
+            matched_count (int, optional): The number of pairs matched before they were saved. Defaults to 0.
+            arrivals (list, optional): The arrival numbers of pending_transfers, as returned by pending_arrivals, so that changes exported after they were saved can be restored too. Defaults to numbering them from 1.
+        Returns:
+            None
+        """
+
+        self.__pending.clear()
+        self.__indexes = {"in": {}, "out": {}}
+        self.__arrivals = 0
+
+        if arrivals is None:
+            # waiting transfers did not match each other, so adding them again only indexes them.
+            for transaction in pending_transfers:
+                self.match(transaction)
+        else:
+            for arrival, transaction in zip(arrivals, pending_transfers):
+                self.__add(arrival, transaction, *self.__index_keys(transaction))
+
+        self.__matched_count = matched_count
+        self.mark_saved()
+
+    def mark_saved(self) -> None:
+        """
+        It marks the waiting transfers as saved, so that export_changes only returns what changed after this call.
+
+        Returns:
+            None
+        """
+
+        self.__saved_arrivals = self.__arrivals
+        self.__matched_saved = []
+
+    def export_changes(self) -> dict:
+        """
+        It returns what changed since mark_saved, the transfers that arrived since and are still waiting and the arrival numbers of the saved ones matched since, so that a checkpoint does not save every waiting transfer again.
+
+        Returns:
+            dict: Returns a dictionary to pass to restore_changes after the saved transfers are restored.
+        """
+
+        added = []
+
+        for arrival in reversed(self.__pending):
+            if arrival <= self.__saved_arrivals:
+                break
+
+            added.append((arrival, self.__pending[arrival]))
+
+        added.reverse()
+
+        return {"added": added,
+                "matched": list(self.__matched_saved),
+                "matched_count": self.__matched_count}
+
+    def restore_changes(self, changes: dict) -> None:
+        """
+        It applies changes returned by export_changes on top of the restored transfers, in the order they were exported.
+
+        Args:
+            changes (dict): A dictionary returned by export_changes.
+        Returns:
+            None
+        """
+
+        for arrival in changes["matched"]:
+            transaction = self.__pending.pop(arrival)
+            direction, key, day = self.__index_keys(transaction)
+            counterparts = self.__indexes[direction][key]
+            counterparts[day].remove(arrival)
+
+            if not counterparts[day]:
+                del counterparts[day]
+
+                if not counterparts:
+                    del self.__indexes[direction][key]
+
+        for arrival, transaction in changes["added"]:
+            self.__add(arrival, transaction, *self.__index_keys(transaction))
+
+        self.__matched_count = changes["matched_count"]
+        self.mark_saved()
+
+    def __add(self, arrival: int, transaction: dict, direction: str, key: tuple, day) -> None:
+        """It adds a transfer to the waiting transfers and their index under an arrival number."""
+
+        self.__pending[arrival] = transaction
+        self.__indexes[direction].setdefault(key, {}).setdefault(day, []).append(arrival)
+        self.__arrivals = max(self.__arrivals, arrival)
+
+    def __index_keys(self, transaction: dict) -> tuple:
+        """It returns the direction, the currency and amount in cents, and the day a transfer is indexed by."""
+
+        return (self.get_direction(transaction),
+                (transaction["Currency"], round(float(transaction["Amount"]) * 100)),
+                self.__day(transaction.get("Date")))
+
+    @staticmethod
+    def __day(value):
+        """It returns the ordinal of a YYYY-MM-DD date, or the value itself when it is not one."""
+
+        try:
+            return date.fromisoformat(value).toordinal()
+        except (TypeError, ValueError):
+            return value
@@ -0,0 +1,169 @@
+"""Contains a class titled HyperLogLog, a mergeable sketch that
+estimates the number of distinct values added to it using a few
+kilobytes of memory."""
+
+import math
+from hashlib import blake2b
+
+__author__ = "Khushpreet Kaur"
+__version__ = "2.49.0.windows.1"
+__credits__ = "COMP-1327 Faculty"
+
+class HyperLogLog:
+    """
+    Estimates distinct counts with 2 ** precision one-byte registers.
+    The relative standard error is about 1.04 / sqrt(2 ** precision), so the default precision of 12 uses 4 KB and is accurate to about 1.6%.
+    Sketches with the same precision can be merged, which gives the same estimate as a single sketch that saw every value.
+
+    Citations:
+        Flajolet, P., Fusy, E., Gandouet, O., & Meunier, F. (2007). HyperLogLog: the analysis of a near-optimal cardinality estimation algorithm. Discrete Mathematics and Theoretical Computer Science Proceedings.
+    """
+
+    DEFAULT_PRECISION = 12
+    """Number of hash bits used to select a register."""
+
+    MIN_PRECISION = 4
+    """Smallest supported precision, 16 registers."""
+
+    MAX_PRECISION = 16
+    """Largest supported precision, 65536 registers."""
+
+    HASH_BITS = 64
+    """Width of the hash values used by the sketch."""
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers: bytes = None):
+        """
+        Initialize an empty sketch, or one with saved registers.
+
+        Args:
+            precision (int, optional): Number of hash bits used to select a register. Defaults to 12.
+            registers (bytes, optional): Registers returned by to_bytes of a sketch with the same precision.
+        Raises:
+            ValueError: When precision is out of range or registers has the wrong size.
+        """
+
+        if not self.MIN_PRECISION <= precision <= self.MAX_PRECISION:
+            raise ValueError(f"Precision must be between {self.MIN_PRECISION} "
+                             f"and {self.MAX_PRECISION}, got {precision}.")
+
+        self.__precision = precision
+        self.__register_count = 1 << precision
+
+        if registers is None:
+            self.__registers = bytearray(self.__register_count)
+        elif len(registers) == self.__register_count:
+            self.__registers = bytearray(registers)
+        else:
+            raise ValueError(f"Expected {self.__register_count} registers, got {len(registers)}.")
+
+    @property
+    def precision(self) -> int:
+        """Returns the precision of the sketch."""
+
+        return self.__precision
+
+    @staticmethod
+    def hash(value) -> int:
+        """
+        It returns the 64 bit hash of a value, so that one value can be added to several sketches while being hashed once.
+
+        Args:
+            value: The value to hash, it is converted to a string first.
+        Returns:
+            int: The hash of the value.
+        """
+
+        return int.from_bytes(blake2b(str(value).encode(), digest_size=8).digest(), "big")
+
+    def add(self, value) -> None:
+        """
+        It adds a value to the sketch.
+
+        Args:
+            value: The value to count, it is converted to a string first.
+        Returns:
+            None
+        """
+
+        self.add_hash(self.hash(value))
+
+    def add_hash(self, value_hash: int) -> None:
+        """
+        It adds a value that was already hashed with HyperLogLog.hash.
+        The first precision bits select the register, which keeps the longest run of leading zeros seen in the remaining bits.
+
+        Args:
+            value_hash (int): A hash returned by HyperLogLog.hash.
+        Returns:
+            bool: Returns True when a register was raised, False when the sketch is unchanged.
+        """
+
+        remaining_bits = self.HASH_BITS - self.__precision
+        index = value_hash >> remaining_bits
+        rank = remaining_bits - (value_hash & ((1 << remaining_bits) - 1)).bit_length() + 1
+
+        if rank > self.__registers[index]:
+            self.__registers[index] = rank
+            return True
+
+        return False
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """
+        It merges another sketch into this one by keeping the larger value of each register.
+
+        Args:
+            other (HyperLogLog): A sketch with the same precision.
+        Raises:
+            ValueError: When the precisions are different.
+        Returns:
+            None
+        """
+
+        if other.precision != self.__precision:
+            raise ValueError(f"Cannot merge a sketch with precision {other.precision} "
+                             f"into one with precision {self.__precision}.")
+
+        self.__registers = bytearray(map(max, self.__registers, other.to_bytes()))
+
+    def count(self) -> int:
+        """
+        It estimates the number of distinct values added to the sketch.
+        Small counts are estimated by linear counting of the empty registers, which is more accurate while many registers are unused.
+
+        Returns:
+            int: The estimated number of distinct values.
+        """
+
+        m = self.__register_count
+
+        if m == 16:
+            alpha = 0.673
+        elif m == 32:
+            alpha = 0.697
+        elif m == 64:
+            alpha = 0.709
+        else:
+            alpha = 0.7213 / (1 + 1.079 / m)
+
+        estimate = alpha * m * m / sum(2.0 ** -register for register in self.__registers)
+        empty_registers = self.__registers.count(0)
+
+        if estimate <= 2.5 * m and empty_registers:
+            estimate = m * math.log(m / empty_registers)
+
+        return round(estimate)
+
+    def to_bytes(self) -> bytes:
+        """Returns a copy of the registers, which can be passed back to the constructor."""
+
+        return bytes(self.__registers)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, HyperLogLog):
+            return NotImplemented
+
+        return self.__precision == other.precision and self.to_bytes() == other.to_bytes()
+
+    def __repr__(self) -> str:
+        return f"HyperLogLog(precision={self.__precision}, count={self.count()})"
@@ -3,7 +3,12 @@ and execute methods to read them accordingly, then logging the results in transa
 
 import csv
 import json
+from itertools import islice
 from os import path
+from account_index.account_index import AccountIndex
+from metrics.metrics import MetricsRegistry
+from input_handler.transaction_validator import TransactionValidator
+from sampling.sampling import TransactionSampler
 
 __author__ = "Owen Maxwell"
 __version__ = "1.0.0"
@@ -15,14 +20,27 @@ class InputHandler:
     inside of a list titled transactions.    
     """
 
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, 
+                       account_index: AccountIndex = None,
+                       metrics: MetricsRegistry = None,
+                       rejects_sink = None):
         """defines a file path based on an input string.
 
         Args:
             file_path (str): string outlining which
+            account_index (AccountIndex, optional): index filled with
+              the byte offset of every row while a csv file is read.
+            metrics (MetricsRegistry, optional): registry the rows and
+              bytes read and the rows rejected are counted in.
+            rejects_sink (callable, optional): called by validate_batch
+              with each rejected transaction and its reason code, see
+              TransactionValidator.
         """
 
         self.__file_path = file_path
+        self.__account_index = account_index
+        self.__metrics = metrics if metrics is not None else MetricsRegistry(enabled=False)
+        self.__validator = TransactionValidator(rejects_sink)
 
     @property
     def file_path(self) -> str:
@@ -35,6 +53,17 @@ class InputHandler:
 
         return self.__file_path
 
+    @property
+    def reject_counts(self) -> dict:
+        """Accessor for the number of transactions rejected by
+        validate_batch for each reason code.
+
+        Returns:
+            dict: counts keyed by TransactionValidator reason code.
+        """
+
+        return self.__validator.reject_counts
+
     def get_file_format(self) -> str:
         """Takes the input file path string and splits it
         based on the period between the name and file type,
@@ -57,15 +86,345 @@ class InputHandler:
         transactions = []
         file_format = self.get_file_format()
         
-        # checks if the file format is csv or json
-        # then logs transaction.
+        with self.__metrics.stage("read_input_data"):
+            # checks if the file format is csv or json
+            # then logs transaction.
+            if file_format == "csv":
+                transactions =  self.read_csv_data()
+            elif file_format == "json":
+                transactions = self.read_json_data()
+
+            if self.__metrics.enabled and path.isfile(self.__file_path):
+                self.__metrics.increment("bytes_read", path.getsize(self.__file_path))
+
+        transactions = self.validate_batch(transactions)
+        return transactions
+
+    def read_sampled_data(self, sampler: TransactionSampler) -> list:
+        """Reads a random sample of the input file and returns the
+        valid sampled transactions. The rows of a csv file that are
+        not sampled are passed over without being parsed, unless the
+        sample is stratified.
+
+        Args:
+            sampler (TransactionSampler): draws the sample and keeps
+              the counts needed to scale it up afterwards.
+
+        Raises:
+            FileNotFoundError: Raised when file cannot
+             be found with file_path.
+
+        Returns:
+            list: the valid transactions of the sample.
+        """
+
+        transactions = []
+        file_format = self.get_file_format()
+
+        with self.__metrics.stage("read_input_data"):
+            if file_format == "csv":
+                transactions = self.__read_sampled_csv_data(sampler)
+            elif file_format == "json":
+                transactions = sampler.sample(self.read_json_data())
+
+            if self.__metrics.enabled and path.isfile(self.__file_path):
+                self.__metrics.increment("bytes_read", path.getsize(self.__file_path))
+
+        return self.validate_batch(transactions)
+
+    def __read_sampled_csv_data(self, sampler: TransactionSampler) -> list:
+        """Samples the rows of a csv file, see read_sampled_data.
+
+        Returns:
+            list: the sampled rows as dictionaries keyed by the header.
+        """
+
+        # detects whether or not file path leads to a file.
+        if not path.isfile(self.__file_path):
+            raise FileNotFoundError(f"File: {self.__file_path} does not exist.")
+
+        with open(self.__file_path, "rb") as input_file:
+            fieldnames = self.__read_csv_header(input_file)
+            lines = self.__iterate_csv_lines(input_file)
+
+            if sampler.stratify_field is not None:
+                # every row has to be parsed to find its stratum, one
+                # reader parses them faster than a reader per line.
+                rows = csv.DictReader((line.decode("utf-8") for line in lines), fieldnames)
+                return sampler.sample(rows)
+
+            rows = [self.__parse_csv_line(line, fieldnames) for line in sampler.sample(lines)]
+
+        return [row for row in rows if row is not None]
+
+    def __iterate_csv_lines(self, input_file):
+        """Yields the remaining csv records of a file opened in binary
+        mode, like __read_csv_line but without a call per line."""
+
+        for line in input_file:
+            # an odd number of quotes means a quoted value
+            # continues on the next line.
+            while line.count(b'"') % 2 and (more := next(input_file, b"")):
+                line += more
+
+            yield line
+
+    def validate_batch(self, transactions: list) -> list:
+        """Validates a batch of transactions, counting the rows read
+        and the rows rejected for each reason and passing rejected rows
+        to the rejects sink.
+
+        Args:
+            transactions (list): raw transactions read from the file.
+
+        Returns:
+            list: the valid transactions.
+        """
+
+        counts_before = self.__validator.reject_counts
+
+        with self.__metrics.stage("validate"):
+            valid_transactions = self.__validator.validate(transactions)
+
+        self.__metrics.increment("rows_read", len(transactions))
+        self.__metrics.increment("rows_rejected", len(transactions) - len(valid_transactions))
+
+        if self.__metrics.enabled:
+            for reason, count in self.__validator.reject_counts.items():
+                if count > counts_before[reason]:
+                    self.__metrics.increment(f"rows_rejected_{reason}", count - counts_before[reason])
+
+        return valid_transactions
+
+    def read_input_batches(self, batch_size: int = 10000):
+        """Reads the input file in batches of raw transactions so
+        callers can start processing before the whole file is read.
+        Batches are not validated, pass each one to validate_batch.
+
+        Args:
+            batch_size (int, optional): Maximum number of transactions
+              per batch. Defaults to 10000.
+
+        Raises:
+            FileNotFoundError: Raised when file cannot
+             be found with file_path.
+
+        Yields:
+            list: the next batch of transactions from the file.
+        """
+
+        file_format = self.get_file_format()
+
+        if file_format not in ("csv", "json"):
+            return
+
+        # detects whether or not file path leads to a file.
+        if not path.isfile(self.__file_path):
+            raise FileNotFoundError(f"File: {self.__file_path} does not exist.")
+
+        with open(self.__file_path, "r") as input_file:
+            # a json document has to be loaded whole, csv rows are
+            # pulled from the reader only as batches are requested.
+            if file_format == "csv":
+                rows = iter(csv.DictReader(input_file))
+            else:
+                rows = iter(json.load(input_file))
+
+            batch = list(islice(rows, batch_size))
+            while batch:
+                yield batch
+                batch = list(islice(rows, batch_size))
+
+        if self.__metrics.enabled:
+            self.__metrics.increment("bytes_read", path.getsize(self.__file_path))
+
+    def read_input_records(self, start_position: int = 0):
+        """Reads the input file one transaction at a time along with
+        its position, so a run can later continue from where it
+        stopped. Positions are byte offsets into a csv file and row
+        numbers into a json file. Records are not validated.
+
+        Args:
+            start_position (int, optional): Position returned as the
+              end of the last record that was already read. Defaults
+              to 0, the start of the data.
+
+        Raises:
+            FileNotFoundError: Raised when file cannot
+             be found with file_path.
+
+        Yields:
+            tuple: start position, end position and the transaction.
+        """
+
+        file_format = self.get_file_format()
+
         if file_format == "csv":
-            transactions =  self.read_csv_data()
+            end = start_position
+
+            for start, end, row in self.read_csv_records(start_position):
+                yield start, end, row
+
+            self.__metrics.increment("bytes_read", end - start_position)
         elif file_format == "json":
             transactions = self.read_json_data()
+            for row_number in range(start_position, len(transactions)):
+                yield row_number, row_number + 1, transactions[row_number]
 
-        transactions = self.data_validation(transactions)
-        return transactions
+            if self.__metrics.enabled:
+                self.__metrics.increment("bytes_read", path.getsize(self.__file_path))
+
+    def read_csv_records(self, start_offset: int = 0):
+        """Reads a csv file one row at a time in binary mode so that the
+        byte offset of every row is known. Quoted values spanning
+        several lines are kept together in one row.
+
+        Args:
+            start_offset (int, optional): Byte offset of the first row
+              to read. Offsets inside the header are treated as the
+              start of the data. Defaults to 0.
+
+        Raises:
+            FileNotFoundError: Raised when file cannot
+             be found with file_path.
+
+        Yields:
+            tuple: start offset, end offset and the row as a dictionary
+              keyed by the header, like csv.DictReader.
+        """
+
+        # detects whether or not file path leads to a file.
+        if not path.isfile(self.__file_path):
+            raise FileNotFoundError(f"File: {self.__file_path} does not exist.")
+
+        with open(self.__file_path, "rb") as input_file:
+            fieldnames = self.__read_csv_header(input_file)
+
+            offset = max(start_offset, input_file.tell())
+            input_file.seek(offset)
+
+            while line := self.__read_csv_line(input_file):
+                start = offset
+                offset += len(line)
+                row = self.__parse_csv_line(line, fieldnames)
+
+                if row is not None:
+                    yield start, offset, row
+
+    def __read_csv_header(self, input_file) -> list:
+        """Reads the header of a csv file opened in binary mode.
+
+        Returns:
+            list: the field names of the file.
+        """
+
+        header = self.__read_csv_line(input_file).decode("utf-8-sig")
+        return next(csv.reader([header]), [])
+
+    def __read_csv_line(self, input_file) -> bytes:
+        """Reads one csv record from a file opened in binary mode.
+        Quoted values spanning several lines are kept together.
+
+        Returns:
+            bytes: the record, or an empty value at the end of the file.
+        """
+
+        line = input_file.readline()
+
+        # an odd number of quotes means a quoted value
+        # continues on the next line.
+        while line.count(b'"') % 2 and (more := input_file.readline()):
+            line += more
+
+        return line
+
+    def __parse_csv_line(self, line: bytes, fieldnames: list) -> dict:
+        """Converts one csv record into a dictionary keyed by fieldnames.
+
+        Returns:
+            dict: the row, or None when the line is blank.
+        """
+
+        text = line.decode("utf-8")
+
+        if not text.strip():
+            return None
+
+        values = next(csv.reader([text]))
+        row = dict(zip(fieldnames, values))
+
+        # missing values are filled in the same way as DictReader.
+        for fieldname in fieldnames[len(values):]:
+            row[fieldname] = None
+
+        return row
+
+    def build_account_index(self, include_dates: bool = False) -> AccountIndex:
+        """Scans a csv file and records the byte offset of every row
+        under its account number.
+
+        Args:
+            include_dates (bool, optional): Also record row dates so
+              lookups can be narrowed to one date. Defaults to False.
+
+        Raises:
+            FileNotFoundError: Raised when file cannot
+             be found with file_path.
+
+        Returns:
+            AccountIndex: the completed index, save it to reuse it.
+        """
+
+        account_index = AccountIndex(self.__file_path, include_dates)
+
+        for start, _, row in self.read_csv_records():
+            account_index.add(row.get("Account number"), start, row.get("Date"))
+
+        account_index.mark_complete()
+        return account_index
+
+    def read_account_history(self, account_number: str,
+                             account_index: AccountIndex = None,
+                             date: str = None) -> list:
+        """Reads only the rows of one account by seeking to the offsets
+        recorded in an account index, instead of scanning the file.
+
+        Args:
+            account_number (str): account to read the transactions of.
+            account_index (AccountIndex, optional): index of the file.
+              Defaults to the index given to the constructor.
+            date (str, optional): only return transactions of this date,
+              the index must have been built with dates.
+
+        Raises:
+            ValueError: When there is no index or the file changed
+              after the index was built.
+
+        Returns:
+            list: the account's valid transactions in file order.
+        """
+
+        account_index = account_index or self.__account_index
+
+        if account_index is None:
+            raise ValueError("No account index was given.")
+
+        if account_index.is_stale():
+            raise ValueError(f"The account index of {self.__file_path} is out of date.")
+
+        transactions = []
+
+        with open(self.__file_path, "rb") as input_file:
+            fieldnames = self.__read_csv_header(input_file)
+
+            for offset in account_index.get_offsets(account_number, date):
+                input_file.seek(offset)
+                row = self.__parse_csv_line(self.__read_csv_line(input_file), fieldnames)
+
+                if row is not None:
+                    transactions.append(row)
+
+        return self.data_validation(transactions)
 
     def read_csv_data(self) -> list:
         """First verifies if the file type is csv,
@@ -86,6 +445,16 @@ class InputHandler:
 
         transactions = []
 
+        # offsets are only known when reading in binary mode, so the
+        # slower record reader is used while an index is being built.
+        if self.__account_index is not None:
+            for start, _, row in self.read_csv_records():
+                self.__account_index.add(row.get("Account number"), start, row.get("Date"))
+                transactions.append(row)
+
+            self.__account_index.mark_complete()
+            return transactions
+
         with open(self.__file_path, "r") as input_file:
             reader = csv.DictReader(input_file)
             for row in reader:
@@ -124,50 +493,28 @@ class InputHandler:
     def data_validation(self, transactions) -> list:
         """Sorts through all transactions and returns a list
         of dictionaries representing valid transactions.
+        A valid transaction has an account number, a currency,
+        a positive amount, which may have decimals, and a
+        transaction type of deposit, withdrawal or transfer.
+        The handler's validator is used, so rejected rows are counted
+        in reject_counts and passed to the rejects sink; use
+        validate_batch to also report them to the metrics registry.
+        Called on another object, as in
+        InputHandler.data_validation(other, transactions), a new
+        validator is used instead.
 
         Args:
             transactions (list): a list recording all
               transactions made so far.
 
-        Raises:
-            ValueError: When Transaction type is not a valid selection.
-
-            ValueError: When the value of Amount is negative.
-
-            TypeError: When Amount is a non numeric type.
-
         Returns:
             list: a list containing all valid transactions
               written as dictionaries.
         """
 
-        valid_transactions = []
-        valid_transaction_types = ["deposit", "withdrawal", "transfer"]
-
-        # Iterate over each transaction in list.
-        for transaction in transactions:
-            # Amount Validation
-            try:
-                # Retrieves value associated with "Amount" and converts to int.
-                amount_value = int(transaction.get("Amount"))
-                
-                
-                if isinstance(amount_value, (int, float)) and amount_value > 0:
-            
-                    # Transaction Type Validation
-                    try:
-                        if transaction["Transaction type"] in valid_transaction_types:
-
-                            valid_transactions.append(transaction)
-
-                    except ValueError:
-                        valid_transaction_types
-                
-            except (ValueError, TypeError):
+        validator = getattr(self, "_InputHandler__validator", None) or TransactionValidator()
 
-                valid_transactions
-
-        return valid_transactions
+        return validator.validate(transactions)
 
 
 
@@ -0,0 +1,175 @@
+"""Contains a class titled TransactionValidator, which checks every
+field of a transaction in one pass and reports each rejected
+transaction with a reason code instead of dropping it silently."""
+
+import math
+import re
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+class TransactionValidator:
+    """Validates transactions against the fields DataProcessor reads.
+
+    Valid rows take a fast path of one float parse, one pattern match,
+    one set lookup and two truth tests; the reason code is only worked
+    out by check for rows that fail it. Amounts written as text must be
+    plain decimal numbers, so "100.50" is valid but "1e3", "1_000",
+    "nan" and "inf" are not.
+    Transactions are passed on unchanged.
+
+    Reason codes:
+        missing_field             a required field is absent or empty
+        invalid_amount            the amount is not a finite decimal number
+        non_positive_amount       the amount is zero or negative
+        invalid_transaction_type  the type is not a known type
+    """
+
+    TRANSACTION_FIELDS = ["Transaction ID",
+                          "Account number",
+                          "Date",
+                          "Transaction type",
+                          "Amount",
+                          "Currency",
+                          "Description"]
+    """Fields of a transaction in the input file layout."""
+
+    REQUIRED_FIELDS = ["Account number", "Transaction type", "Amount", "Currency"]
+    """Fields DataProcessor reads from every transaction, they must be
+    present and not empty."""
+
+    TRANSACTION_TYPES = ["deposit", "withdrawal", "transfer"]
+    """Valid values of the transaction type."""
+
+    REASON_CODES = ["missing_field",
+                    "invalid_amount",
+                    "non_positive_amount",
+                    "invalid_transaction_type"]
+    """Reasons a transaction can be rejected for."""
+
+    REJECT_FIELDS = TRANSACTION_FIELDS + ["Reason code"]
+    """Fields of each record passed to the rejects sink."""
+
+    DECIMAL_PATTERN = re.compile(r"\s*[+-]?(\d+(\.\d*)?|\.\d+)\s*")
+    """Amounts written as text must match this pattern in full, float
+    alone also accepts exponents, underscores, nan and inf."""
+
+    def __init__(self, rejects_sink = None, extra_required_fields: list = ()):
+        """Initializes the validator.
+
+        Args:
+            rejects_sink (callable, optional): Called with a record of
+             REJECT_FIELDS for each rejected transaction, for example
+             a TransactionStream. Defaults to None.
+            extra_required_fields (list, optional): Fields that must
+             also be present and not empty, such as "Transaction ID"
+             for a store keyed by it. Defaults to none.
+        """
+
+        self.__rejects_sink = rejects_sink
+        self.__extra_required_fields = tuple(extra_required_fields)
+        self.__required_fields = self.REQUIRED_FIELDS + list(extra_required_fields)
+        self.__transaction_types = frozenset(self.TRANSACTION_TYPES)
+        self.__reject_counts = dict.fromkeys(self.REASON_CODES, 0)
+
+    @property
+    def reject_counts(self) -> dict:
+        """Returns the number of transactions rejected for each reason code."""
+
+        return dict(self.__reject_counts)
+
+    @property
+    def rejected_count(self) -> int:
+        """Returns the number of transactions rejected so far."""
+
+        return sum(self.__reject_counts.values())
+
+    def check(self, transaction: dict) -> str:
+        """Returns the reason code a transaction is rejected for, or
+        None when it is valid.
+
+        Args:
+            transaction (dict): Transaction to check.
+
+        Returns:
+            str: One of REASON_CODES, or None.
+        """
+
+        for field in self.__required_fields:
+            value = transaction.get(field)
+            if value is None or value == "":
+                return "missing_field"
+
+        amount = transaction.get("Amount")
+
+        if isinstance(amount, str) and not self.DECIMAL_PATTERN.fullmatch(amount):
+            return "invalid_amount"
+
+        try:
+            amount = float(amount)
+        except (ValueError, TypeError):
+            return "invalid_amount"
+
+        if not math.isfinite(amount):
+            return "invalid_amount"
+
+        if amount <= 0:
+            return "non_positive_amount"
+
+        transaction_type = transaction.get("Transaction type")
+
+        if not isinstance(transaction_type, str) or transaction_type not in self.__transaction_types:
+            return "invalid_transaction_type"
+
+        return None
+
+    def validate(self, transactions: list) -> list:
+        """Returns the valid transactions, counting each rejected one
+        and passing it to the rejects sink.
+
+        Args:
+            transactions (list): Transactions to validate.
+
+        Returns:
+            list: The valid transactions, in their original order.
+        """
+
+        transaction_types = self.__transaction_types
+        extra_required_fields = self.__extra_required_fields
+        infinity = math.inf
+        decimal_match = self.DECIMAL_PATTERN.fullmatch
+        valid_transactions = []
+        append = valid_transactions.append
+
+        for transaction in transactions:
+            # nan fails both comparisons, so it is left to check too.
+            try:
+                amount = transaction["Amount"]
+
+                if (0 < float(amount) < infinity
+                        and (amount.__class__ is not str or decimal_match(amount))
+                        and transaction["Transaction type"] in transaction_types
+                        and transaction["Account number"]
+                        and transaction["Currency"]
+                        and (not extra_required_fields
+                             or all(transaction.get(field) for field in extra_required_fields))):
+                    append(transaction)
+                    continue
+            except (KeyError, ValueError, TypeError):
+                pass
+
+            reason = self.check(transaction)
+
+            if reason is None:
+                append(transaction)
+                continue
+
+            self.__reject_counts[reason] += 1
+
+            if self.__rejects_sink is not None:
+                record = {field: transaction.get(field, "") for field in self.TRANSACTION_FIELDS}
+                record["Reason code"] = reason
+                self.__rejects_sink(record)
+
+        return valid_transactions
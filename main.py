@@ -1,20 +1,407 @@
-
 """
 Main file is entry point for data processing.
 This is main file to run the data processing. 
 It reads input data, processes data with logging, write output data to files.
 """ 
 
-from os import path
+import argparse
+import glob
+from os import makedirs, path
 from input_handler.input_handler import InputHandler
+from input_handler.transaction_validator import TransactionValidator
 from data_processor.data_processor import DataProcessor
+from data_processor.concurrent_data_processor import ConcurrentDataProcessor
+from data_processor.transfer_matcher import TransferMatcher
 from output_handler.output_handler import OutputHandler
+from pipeline.pipeline import AsyncPipeline
+from checkpoint.checkpoint import CheckpointManager
+from account_index.account_index import AccountIndex
+from output_handler.transaction_stream import TransactionStream
+from run_cache.run_cache import RunCache
+from metrics.metrics import MetricsRegistry
+from service.service import TransactionService
+from partial_result.partial_result import PartialResult
+from sampling.sampling import TransactionSampler
+from spool_watcher.spool_watcher import SpoolWatcher
+from storage.storage import SQLiteStore
 
 __author__ = "Khushpreet Kaur"
 __version__ = "2.49.0.windows.1"
 __credits__ = "COMP-1327 Faculty"
 
-def main() -> None:
+# Each option and the options a run using it cannot also use.
+INCOMPATIBLE_OPTIONS = {
+    "async_pipeline": ("checkpoint_interval", "resume", "compression"),
+    "account_index": ("async_pipeline", "checkpoint_interval", "resume"),
+    "stream_suspicious": ("async_pipeline", "resume"),
+    "partitions": ("async_pipeline", "stream_suspicious"),
+    "delta": ("async_pipeline", "checkpoint_interval", "resume", "partitions"),
+    "serve": ("async_pipeline", "stream_suspicious", "cache", "delta"),
+    "merge": ("input", "async_pipeline", "checkpoint_interval", "resume", "delta", 
+              "account_index", "stream_suspicious", "cache"),
+    "store": ("async_pipeline", "checkpoint_interval", "resume", "threads", "merge", 
+              "sample", "watch"),
+    "save_partial": ("stream_suspicious",),
+    "sample": ("async_pipeline", "checkpoint_interval", "resume", "delta", "merge", 
+               "account_index", "serve", "save_partial"),
+    "daily_balances": ("delta", "merge", "sample"),
+    "match_transfers": ("threads", "merge", "sample"),
+    "threads": ("async_pipeline", "checkpoint_interval", "resume", "delta", "merge", 
+                "sample", "account_index", "anomaly_z_score"),
+    "watch": ("input", "async_pipeline", "checkpoint_interval", "resume", "delta", 
+              "compact", "merge", "sample", "threads", "serve", "cache", "partitions", 
+              "account_index", "save_partial", "stream_suspicious"),
+    "cache": ("delta", "compact", "resume"),
+}
+
+def option_flag(option: str) -> str:
+    """Returns the command line flag of a parsed option.
+
+    Args:
+        option (str): Name of the option in the parsed namespace.
+
+    Returns:
+        str: The flag, such as --async-pipeline.
+    """
+
+    return "--" + option.replace("_", "-")
+
+def create_parser() -> argparse.ArgumentParser:
+    """Creates the parser of the command line options of the data 
+    processing run.
+
+    Returns:
+        argparse.ArgumentParser: The parser.
+    """
+
+    parser = argparse.ArgumentParser(description="Processes the input "
+                                     "transactions and writes the results "
+                                     "to the output folder.")
+    parser.add_argument("--input", metavar="PATH",
+                        help="input file to process (default: "
+                        "input/input_data.csv)")
+    parser.add_argument("--async-pipeline", action="store_true",
+                        help="overlap reading, validation, processing and "
+                        "writing in a staged asyncio pipeline")
+    parser.add_argument("--threads", type=int, default=0, metavar="N",
+                        help="process batches on N threads, each with its own "
+                        "results that are merged at the end")
+    parser.add_argument("--checkpoint-interval", type=int, default=0,
+                        metavar="ROWS",
+                        help="save a checkpoint every ROWS input rows")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue from the last saved checkpoint")
+    parser.add_argument("--distinct-count-precision", type=int, default=0,
+                        metavar="BITS",
+                        help="estimate distinct accounts per currency, type "
+                        "and date with HyperLogLog sketches of 2 ** BITS bytes")
+    parser.add_argument("--output-format", choices=OutputHandler.OUTPUT_FORMATS,
+                        default="csv",
+                        help="format of the result files (default: csv)")
+    parser.add_argument("--compression", choices=OutputHandler.AVAILABLE_COMPRESSION_FORMATS,
+                        help="compress the result files, zst needs the "
+                        "zstandard package")
+    parser.add_argument("--background-compression", action="store_true",
+                        help="compress on a background thread")
+    parser.add_argument("--stream-suspicious", action="store_true",
+                        help="write suspicious transactions to their file as "
+                        "soon as they are found instead of at the end")
+    parser.add_argument("--account-index", action="store_true",
+                        help="save a sidecar index of each account's row "
+                        "offsets next to the input file while reading it")
+    parser.add_argument("--partitions", type=int, default=0, metavar="N",
+                        help="split the results into N partitions by account "
+                        "number under output/partitioned")
+    parser.add_argument("--partition-scheme", choices=OutputHandler.PARTITION_SCHEMES,
+                        default="hash",
+                        help="assign accounts to partitions by hash or by "
+                        "contiguous account range (default: hash)")
+    parser.add_argument("--no-month-split", action="store_true",
+                        help="do not split the partitioned suspicious "
+                        "transactions by month")
+    parser.add_argument("--delta", action="store_true",
+                        help="continue from the saved account summaries and "
+                        "write only the accounts changed by this run to a "
+                        "delta file under output/deltas")
+    parser.add_argument("--compact", action="store_true",
+                        help="with --delta, merge the delta files into the "
+                        "account summaries file")
+    parser.add_argument("--filter-field", default="balance",
+                        choices=["balance", "total_deposits", "total_withdrawals"],
+                        help="account summary field the filtered file is "
+                        "selected by (default: balance)")
+    parser.add_argument("--filter-value", type=float, default=5000,
+                        help="value the filter field is compared with "
+                        "(default: 5000)")
+    parser.add_argument("--filter-above", action="store_true",
+                        help="keep accounts at or above the filter value "
+                        "instead of at or below it")
+    parser.add_argument("--cache", action="store_true",
+                        help="skip processing when the input and settings "
+                        "match the previous cached run and reuse its outputs")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="write stage timings and counters to PATH, in "
+                        "the Prometheus text format when PATH ends with "
+                        ".prom and as json otherwise")
+    parser.add_argument("--serve", action="store_true",
+                        help="process the input file, then keep the results "
+                        "in memory and serve batches and queries over HTTP "
+                        "until interrupted")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="address the service listens on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080,
+                        help="port the service listens on (default: 8080)")
+    parser.add_argument("--socket", metavar="PATH",
+                        help="listen on a Unix socket instead of a port")
+    parser.add_argument("--save-partial", metavar="PATH",
+                        help="also save the results as a partial result that "
+                        "can be merged with those of other input files")
+    parser.add_argument("--merge", nargs="+", metavar="PARTIAL",
+                        help="merge saved partial results instead of reading "
+                        "the input file, then write the outputs as usual")
+    parser.add_argument("--watch", metavar="DIRECTORY",
+                        help="keep processing the csv and json files dropped "
+                        "into DIRECTORY, each exactly once, and rewrite the "
+                        "outputs after each new file until interrupted")
+    parser.add_argument("--poll-interval", type=float,
+                        default=SpoolWatcher.POLL_INTERVAL, metavar="SECONDS",
+                        help="seconds between two scans of the watched "
+                        f"directory (default: {SpoolWatcher.POLL_INTERVAL:g})")
+    parser.add_argument("--store", metavar="PATH",
+                        help="also load the input rows into the SQLite "
+                        "database at PATH, rows already stored are skipped")
+    parser.add_argument("--rejects", metavar="PATH",
+                        help="write rejected input rows and their reason "
+                        "codes to PATH, a csv or ndjson file")
+    parser.add_argument("--sample", choices=TransactionSampler.SAMPLING_METHODS,
+                        help="process a random sample of the input and "
+                        "estimate the transaction statistics of all of it, "
+                        "account summaries and suspicious transactions only "
+                        "cover the sample")
+    parser.add_argument("--sample-rate", type=float, default=0.01,
+                        help="share of rows a bernoulli sample keeps "
+                        "(default: 0.01)")
+    parser.add_argument("--sample-size", type=int, default=10000, metavar="ROWS",
+                        help="rows a reservoir sample keeps, per stratum when "
+                        "stratified (default: 10000)")
+    parser.add_argument("--sample-stratify", choices=list(TransactionSampler.STRATIFY_FIELDS),
+                        help="draw a reservoir sample of each account or "
+                        "transaction type")
+    parser.add_argument("--sample-seed", type=int,
+                        help="seed for a repeatable sample")
+    parser.add_argument("--daily-balances", action="store_true",
+                        help="also write the balance of each account at the "
+                        "end of each date it has transactions")
+    parser.add_argument("--anomaly-z-score", type=float, default=0, metavar="Z",
+                        help="also flag transactions more than Z standard "
+                        "deviations from the mean amount of their account")
+    parser.add_argument("--anomaly-min-history", type=int,
+                        default=DataProcessor.ANOMALY_MIN_HISTORY, metavar="ROWS",
+                        help="transactions an account needs before its next "
+                        "ones are scored (default: "
+                        f"{DataProcessor.ANOMALY_MIN_HISTORY})")
+    parser.add_argument("--match-transfers", action="store_true",
+                        help="move the amount of each outgoing transfer matched "
+                        "with an incoming transfer of another account between "
+                        "their balances, and write the unmatched transfers")
+    parser.add_argument("--transfer-window", type=int,
+                        default=TransferMatcher.WINDOW_DAYS, metavar="DAYS",
+                        help="days a transfer may be booked before or after its "
+                        f"counterpart (default: {TransferMatcher.WINDOW_DAYS})")
+    parser.add_argument("--confidence", type=float, default=0.95,
+                        help="confidence level of the estimated intervals "
+                        "(default: 0.95)")
+
+    return parser
+
+def parse_arguments(arguments: list = None) -> argparse.Namespace:
+    """Parses the command line options of the data processing run.
+
+    Args:
+        arguments (list, optional): Arguments to parse. Defaults to 
+        the command line arguments.
+
+    Returns:
+        argparse.Namespace: The parsed options.
+    """
+
+    parser = create_parser()
+    options = parser.parse_args(arguments)
+
+    if options.checkpoint_interval < 0:
+        parser.error("--checkpoint-interval must not be negative")
+
+    if options.partitions < 0:
+        parser.error("--partitions must not be negative")
+
+    if options.threads < 0:
+        parser.error("--threads must not be negative")
+
+    if not 0 < options.sample_rate <= 1:
+        parser.error("--sample-rate must be above 0 and at most 1")
+
+    if options.sample_size < 2:
+        parser.error("--sample-size must be at least 2")
+
+    if not 0 < options.confidence < 1:
+        parser.error("--confidence must be between 0 and 1")
+
+    if options.transfer_window < 0:
+        parser.error("--transfer-window must not be negative")
+
+    if options.anomaly_z_score < 0:
+        parser.error("--anomaly-z-score must not be negative")
+
+    if options.anomaly_min_history < 2:
+        parser.error("--anomaly-min-history must be at least 2")
+
+    if options.poll_interval <= 0:
+        parser.error("--poll-interval must be positive")
+
+    if options.distinct_count_precision and not 4 <= options.distinct_count_precision <= 16:
+        parser.error("--distinct-count-precision must be between 4 and 16")
+
+    for option, conflicts in INCOMPATIBLE_OPTIONS.items():
+        used = [conflict for conflict in conflicts if getattr(options, conflict)]
+
+        if getattr(options, option) and used:
+            parser.error(f"{option_flag(option)} cannot be combined with "
+                         + ", ".join(option_flag(conflict) for conflict in used))
+
+    if options.compact and not options.delta:
+        # A full run already replaced the account summaries, merging
+        # the deltas into them would apply those deltas again.
+        parser.error("--compact can only be used with --delta")
+
+    if options.sample_stratify and options.sample != "reservoir":
+        parser.error("--sample-stratify needs --sample reservoir")
+
+    if options.async_pipeline and options.output_format != "csv":
+        parser.error("--async-pipeline only writes csv files")
+
+    if options.account_index and options.input and not options.input.endswith(".csv"):
+        parser.error("--account-index records offsets of csv rows and needs a csv input")
+
+    if options.stream_suspicious and (options.compression 
+                                      or options.output_format not in TransactionStream.STREAM_FORMATS):
+        parser.error("--stream-suspicious only writes uncompressed csv or ndjson files")
+
+    if options.rejects and options.rejects.split(".")[-1] not in TransactionStream.STREAM_FORMATS:
+        parser.error("--rejects only writes csv or ndjson files")
+
+    return options
+
+def write_filtered_summaries(output_handler: OutputHandler, 
+                             filtered_filename: str, 
+                             options: argparse.Namespace) -> None:
+    """Filters the account summaries and writes them to a csv file.
+
+    Args:
+        output_handler (OutputHandler): Holds the account summaries.
+        filtered_filename (str): Destination of the filtered file.
+        options (argparse.Namespace): The filter options.
+    """
+
+    filtered_summaries = output_handler.filter_account_summaries(
+        options.filter_field, options.filter_value, options.filter_above
+    )
+
+    output_handler.write_filtered_summaries_to_csv(filtered_summaries, filtered_filename)
+
+    print(f"Filtered account summaries written to: {filtered_filename}")
+
+def write_metrics(metrics: MetricsRegistry, options: argparse.Namespace) -> None:
+    """Writes the metrics of the run when they were requested.
+
+    Args:
+        metrics (MetricsRegistry): The collected metrics.
+        options (argparse.Namespace): The metrics option.
+    """
+
+    if options.metrics:
+        metrics.write(options.metrics)
+        print(f"Metrics written to: {options.metrics}")
+
+def serve(service: TransactionService, options: argparse.Namespace) -> None:
+    """Serves the service until the process is interrupted.
+
+    Args:
+        service (TransactionService): Holds the processed results.
+        options (argparse.Namespace): The address options.
+    """
+
+    server = service.create_server(options.host, options.port, options.socket)
+    address = options.socket or f"http://{options.host}:{server.server_address[1]}"
+
+    print(f"Serving transactions and queries on: {address}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+def watch(data_processor: DataProcessor, state_path: str,
+          file_path: dict, filtered_filename: str,
+          delta_pattern: str, delta_ledger_path: str,
+          options: argparse.Namespace, metrics: MetricsRegistry,
+          rejects_sink = None) -> None:
+    """Processes the files dropped into the watched directory until the
+    process is interrupted, rewriting the outputs after each poll that
+    found new files.
+
+    Args:
+        data_processor (DataProcessor): Holds the running results, the
+         saved state is restored into it.
+        state_path (str): File the ledger and state are kept in.
+        file_path (dict): Output paths keyed by result.
+        filtered_filename (str): Destination of the filtered file.
+        delta_pattern (str): Delta files of the account summaries, 
+         with a * in place of the number, they are removed when the 
+         full file is rewritten.
+        delta_ledger_path (str): Delta ledger, it records the files 
+         in the full account summaries file.
+        options (argparse.Namespace): The watch, filter and metrics
+         options.
+        metrics (MetricsRegistry): Registry written with the outputs.
+        rejects_sink (callable, optional): Receives rejected rows.
+    """
+
+    def write_outputs(entries: list) -> None:
+        output_handler = OutputHandler(data_processor.account_summaries,
+                                       data_processor.suspicious_transactions,
+                                       data_processor.transaction_statistics,
+                                       data_processor.distinct_accounts,
+                                       metrics=metrics,
+                                       daily_balances=(data_processor.get_daily_balances()
+                                                       if "daily_balances" in file_path else None),
+                                       unmatched_transfers=data_processor.unmatched_transfers)
+        output_handler.write_all(file_path)
+        OutputHandler.reset_delta_ledger(delta_ledger_path,
+                                         [digest for digest, entry in watcher.ledger.items()
+                                          if entry["status"] == "done"],
+                                         glob.glob(delta_pattern))
+        write_filtered_summaries(output_handler, filtered_filename, options)
+
+        if options.metrics:
+            metrics.write(options.metrics)
+
+        for entry in entries:
+            print(f"{entry['file']}: {entry['status']}, {entry['rows']} transactions")
+
+    watcher = SpoolWatcher(options.watch, data_processor, state_path,
+                           on_processed=write_outputs, metrics=metrics,
+                           rejects_sink=rejects_sink)
+
+    print(f"Watching {options.watch} for new transaction files.")
+
+    try:
+        watcher.run(options.poll_interval)
+    except KeyboardInterrupt:
+        pass
+
+def main(arguments: list = None) -> None:
     """Main function to read input data, process it, and write the 
     results to output files.
 
@@ -22,66 +409,409 @@ def main() -> None:
     - Processes the data using DataProcessor.
     - Writes the processed data to CSV and JSON files using 
     OutputHandler.
+
+    Args:
+        arguments (list, optional): Command line arguments, see 
+        parse_arguments.
     """
 
+    options = parse_arguments(arguments)
+
     # Retrieves the directory name of the current script or module file.
     current_directory = path.dirname(path.abspath(__file__))
 
     # Joins the current directory, the relative path to the input folder 
     # and the filename to create a complete path to the file.
-    input_file_path = path.join(current_directory, "input/input_data.csv")
+    input_file_path = options.input or path.join(current_directory, "input/input_data.csv")
 
-    input_handler = InputHandler(input_file_path)
-    transactions = input_handler.read_input_data()
+    # Joins the current directory, the relative path to the output 
+    # folder and the filename to create a complete path to each of the 
+    # output files.
+    file_prefix = "output_data"
+    file_extension = options.output_format
+
+    if options.compression:
+        file_extension += f".{options.compression}"
+
+    filenames = ["account_summaries", 
+                 "suspicious_transactions", 
+                 "transaction_statistics"]
+
+    file_path = {}
+
+    for filename in filenames:
+        file_path[filename] = path.join(current_directory,
+                                        f"output/{file_prefix}_{filename}.{file_extension}")
+
+    distinct_path = path.join(current_directory, 
+                              f"output/{file_prefix}_distinct_accounts.{file_extension}")
+    sampling_path = path.join(current_directory, 
+                              f"output/{file_prefix}_sampling_estimates.{file_extension}")
+    daily_balance_path = path.join(current_directory, 
+                                   f"output/{file_prefix}_daily_balances.{file_extension}")
+    unmatched_transfer_path = path.join(current_directory, 
+                                        f"output/{file_prefix}_unmatched_transfers.{file_extension}")
+    partition_directory = path.join(current_directory, "output/partitioned")
+    filtered_filename = path.join(current_directory, "output", "fdp_filter_team_2.csv")
+
+    # Delta files are numbered so that sorting them by name gives
+    # the order they were written in.
+    delta_pattern = path.join(current_directory, 
+                              f"output/deltas/{file_prefix}_account_summaries.delta-*.{file_extension}")
+    delta_paths = sorted(glob.glob(delta_pattern))
+    delta_ledger_path = path.join(current_directory, 
+                                  f"output/deltas/{file_prefix}_account_summaries.ledger.json")
+    delta_input_digest = None
+
+    if options.delta:
+        # An input is applied once, whether it is in the full file, its
+        # delta is pending or it was already compacted.
+        delta_input_digest = RunCache.content_digest(input_file_path)
+
+        try:
+            OutputHandler.check_delta_input(delta_input_digest, delta_paths, delta_ledger_path)
+        except ValueError as error:
+            create_parser().error(str(error))
+
+    # A disabled registry costs nothing, the handlers report to it
+    # once per batch or file.
+    metrics = MetricsRegistry(enabled=bool(options.metrics))
+
+    run_cache = None
+
+    if options.cache:
+        # Outputs are reused when the input contents and every setting
+        # that changes them match the last run.
+        run_cache = RunCache(path.join(current_directory, "output/run_cache.json"))
+        filter_input_path = file_path["account_summaries"]
+
+        if options.output_format == "fcol":
+            # Columnar files store every amount as a float, the cached
+            # filter reads a json copy that keeps whole numbers as a 
+            # fresh run has them.
+            filter_input_path = path.join(current_directory, 
+                                          "output/run_cache_account_summaries.json")
+
+        # Options that only change how the run is measured or written,
+        # not what the outputs hold, and output locations, which are 
+        # compared through output_paths instead.
+        unfingerprinted_options = ("cache", "host", "port", "socket", "metrics",
+                                   "background_compression", "store", "rejects",
+                                   "save_partial")
+        processing_fingerprint = run_cache.fingerprint([input_file_path], {
+            "large_transaction_threshold": DataProcessor.LARGE_TRANSACTION_THRESHOLD,
+            "uncommon_currencies": DataProcessor.UNCOMMON_CURRENCIES,
+            "options": {name: value for name, value in vars(options).items()
+                        if not name.startswith("filter_") 
+                        and name not in unfingerprinted_options}})
+        filter_fingerprint = run_cache.fingerprint([], {
+            "processing": processing_fingerprint,
+            "filter": [options.filter_field, options.filter_value, options.filter_above]})
+
+        if options.partitions:
+            output_paths = [path.join(partition_directory, "manifest.json")]
+        else:
+            output_paths = list(file_path.values())
+
+            if filter_input_path not in output_paths:
+                output_paths.append(filter_input_path)
+
+        if options.distinct_count_precision:
+            output_paths.append(distinct_path)
+
+        if options.sample:
+            output_paths.append(sampling_path)
+
+        if options.daily_balances:
+            output_paths.append(daily_balance_path)
+
+        if options.match_transfers:
+            output_paths.append(unmatched_transfer_path)
+
+        if options.account_index:
+            output_paths.append(AccountIndex.sidecar_path(input_file_path))
+
+        if options.rejects:
+            output_paths.append(options.rejects)
+
+        if options.save_partial:
+            output_paths.append(options.save_partial)
+
+        if options.store:
+            output_paths.append(options.store)
+
+        # The filtered file is not written when no account matches.
+        filter_outputs = [filtered_filename] if path.isfile(filtered_filename) else []
+
+        if run_cache.is_current("processing", processing_fingerprint, output_paths):
+            if run_cache.is_current("filter", filter_fingerprint, filter_outputs):
+                print("Input and settings are unchanged, the outputs in "
+                      f"{path.dirname(filtered_filename)} are up to date.")
+                metrics.increment("cache_hits")
+                write_metrics(metrics, options)
+                return
+
+            if not options.partitions:
+                # Only the filter changed, filter the cached summaries.
+                with metrics.stage("filter"):
+                    account_summaries = OutputHandler.read_account_summaries(filter_input_path)
+                    write_filtered_summaries(OutputHandler(account_summaries, [], {}),
+                                             filtered_filename, options)
+
+                filter_outputs = [filtered_filename] if path.isfile(filtered_filename) else []
+                run_cache.record("filter", filter_fingerprint, filter_outputs)
+                metrics.increment("cache_hits")
+                write_metrics(metrics, options)
+                return
+
+    account_index = None
+
+    if options.account_index:
+        account_index = AccountIndex(input_file_path, include_dates=True)
+
+    rejects_stream = None
+    sampling_estimates = None
+
+    checkpoint_path = path.join(current_directory, "output/checkpoint.pkl")
+
+    if options.rejects:
+        # A resumed run keeps the rejects found before the checkpoint,
+        # and rows rejected by the service show up as they are sent.
+        rejects_stream = TransactionStream(options.rejects, TransactionValidator.REJECT_FIELDS,
+                                           flush_every=1 if options.serve else 1000,
+                                           append=options.resume and path.isfile(checkpoint_path))
+
+    input_handler = InputHandler(input_file_path, account_index, metrics, rejects_stream)
 
     # Logging integration start
     group_number = 2
     log_filename = f"fdp_team_{group_number}.log"
 
-    data_processor = DataProcessor(transactions, logging_level="INFO", log_file=log_filename)
-    processed_data = data_processor.process_data()
+    processor_options = {"logging_level": "INFO",
+                         "log_file": log_filename,
+                         "distinct_count_precision": options.distinct_count_precision,
+                         "metrics": metrics,
+                         "track_daily_balances": options.daily_balances,
+                         "anomaly_z_score": options.anomaly_z_score,
+                         "anomaly_min_history": options.anomaly_min_history,
+                         "match_transfers": options.match_transfers,
+                         "transfer_window_days": options.transfer_window,
+                         # Only the service queries the derived metrics.
+                         "track_result_metrics": options.serve}
+
+    suspicious_stream = None
+
+    if options.stream_suspicious:
+        # Flags go straight to their file instead of being kept in
+        # memory until the end of the run.
+        suspicious_stream = OutputHandler.open_suspicious_transactions_stream(
+            file_path.pop("suspicious_transactions"))
+        processor_options["suspicious_sink"] = suspicious_stream
+
+    if options.watch:
+        if options.distinct_count_precision:
+            file_path["distinct_accounts"] = distinct_path
+
+        if options.daily_balances:
+            file_path["daily_balances"] = daily_balance_path
+
+        if options.match_transfers:
+            file_path["unmatched_transfers"] = unmatched_transfer_path
+
+        try:
+            watch(DataProcessor([], **processor_options),
+                  path.join(current_directory, "output/spool_state.pkl"),
+                  file_path, filtered_filename, delta_pattern, delta_ledger_path,
+                  options, metrics, rejects_stream)
+        finally:
+            if rejects_stream is not None:
+                rejects_stream.close()
+
+        return
+
+    if options.merge:
+        # Partial results of other runs take the place of the input.
+        partial_result = PartialResult.merge_all([PartialResult.load(partial_path)
+                                                  for partial_path in options.merge])
+        data_processor = DataProcessor([], **processor_options)
+        data_processor.restore_state(partial_result.to_state())
+        processed_data = data_processor.export_state()
+    elif options.async_pipeline:
+        # The pipeline writes the output files itself as it runs.
+        data_processor = DataProcessor([], **processor_options)
+        pipeline = AsyncPipeline(input_handler, data_processor, file_path, metrics=metrics)
+        processed_data = pipeline.run()
+    elif options.checkpoint_interval or options.resume:
+        checkpoint_manager = CheckpointManager(checkpoint_path, 
+                                               options.checkpoint_interval 
+                                               or CheckpointManager.CHECKPOINT_INTERVAL)
+        data_processor = DataProcessor([], **processor_options)
+        processed_data = checkpoint_manager.run(input_handler, data_processor, 
+                                                resume=options.resume,
+                                                rejects_stream=rejects_stream)
+    elif options.threads:
+        # Batches are read and validated here and processed by the
+        # worker threads.
+        concurrent_processor = ConcurrentDataProcessor(**processor_options)
+        concurrent_processor.process_batches((input_handler.validate_batch(batch) for batch
+                                              in input_handler.read_input_batches()),
+                                             options.threads)
+        data_processor = concurrent_processor.merge()
+        processed_data = data_processor.export_state()
+    elif options.sample:
+        # Rows that are not sampled are passed over unparsed.
+        sampler = TransactionSampler(options.sample, options.sample_rate, options.sample_size,
+                                     options.sample_stratify, options.sample_seed)
+        transactions = input_handler.read_sampled_data(sampler)
+        data_processor = DataProcessor(transactions, **processor_options)
+        processed_data = data_processor.process_data()
+        sampling_estimates = sampler.estimate_statistics(transactions, options.confidence)
+        processed_data["transaction_statistics"] = TransactionSampler.to_transaction_statistics(
+            sampling_estimates)
+
+        print(f"Sampled {sampler.sample_size:,} of {sampler.population_size:,} input rows, "
+              "the transaction statistics are estimates.")
+    else:
+        transactions = input_handler.read_input_data()
+
+        if account_index is not None:
+            account_index.save()
+
+        if options.store:
+            with SQLiteStore(options.store) as store:
+                inserted = store.load_transactions(transactions)
+                store_rejects = {reason: count for reason, count
+                                 in store.reject_counts.items() if count}
+
+            print(f"Stored {inserted:,} new transactions in {options.store}.")
+
+            if store_rejects:
+                print(f"Rows not stored: {store_rejects}")
+
+        data_processor = DataProcessor(transactions, **processor_options)
+
+        if options.delta:
+            # Balances carry on from the last full file and its deltas.
+            data_processor.restore_state({
+                "account_summaries": OutputHandler.read_account_summaries(
+                    file_path["account_summaries"], delta_paths),
+                "suspicious_transactions": [],
+                "transaction_statistics": {}})
+
+        processed_data = data_processor.process_data()
     # Logging integration ends
 
+    if suspicious_stream is not None:
+        suspicious_stream.close()
+
+    # The service keeps writing the rows it rejects until it stops.
+    if rejects_stream is not None and not options.serve:
+        rejects_stream.close()
+
+    # Rejected rows are reported rather than dropped silently.
+    reject_counts = {reason: count for reason, count
+                     in input_handler.reject_counts.items() if count}
+
+    if reject_counts:
+        print(f"Rejected input rows: {reject_counts}")
+
+    if options.save_partial:
+        sources = (partial_result.source_labels if options.merge 
+                   else PartialResult.source_of(input_file_path))
+        PartialResult.from_state(processed_data, sources).save(options.save_partial)
+
+    daily_balances = data_processor.get_daily_balances() if options.daily_balances else None
+
+    if options.match_transfers:
+        print(f"Matched {data_processor.matched_transfer_count:,} transfer pairs, "
+              f"{len(data_processor.unmatched_transfers):,} transfers are unmatched.")
+
     account_summaries = processed_data["account_summaries"]
     suspicious_transactions = processed_data["suspicious_transactions"]
     transaction_statistics = processed_data["transaction_statistics"]
+    distinct_accounts = processed_data["distinct_accounts"]
     
     output_handler = OutputHandler(account_summaries, 
                                    suspicious_transactions, 
-                                   transaction_statistics)
+                                   transaction_statistics,
+                                   distinct_accounts,
+                                   background_compression=options.background_compression,
+                                   metrics=metrics,
+                                   sampling_estimates=sampling_estimates,
+                                   daily_balances=daily_balances,
+                                   unmatched_transfers=data_processor.unmatched_transfers)
 
-    # Joins the current directory, the relative path to the output 
-    # folder and the filename to create a complete path to each of the 
-    # output files.
-    file_prefix = "output_data"
-    filenames = ["account_summaries", 
-                 "suspicious_transactions", 
-                 "transaction_statistics"]
+    # The async pipeline has already written the main output files.
+    if options.async_pipeline:
+        file_path = {}
 
-    file_path = {}
+    if options.partitions:
+        # The partitions replace the single result files.
+        output_handler.write_partitioned(partition_directory,
+                                         options.partitions, 
+                                         options.partition_scheme,
+                                         split_by_month=not options.no_month_split,
+                                         file_extension=file_extension)
+        file_path = {}
 
-    for filename in filenames:
-        file_path[filename] = path.join(current_directory,
-                                        f"output/{file_prefix}_{filename}.csv")
+    if options.delta:
+        delta_path = OutputHandler.delta_file_path(delta_pattern, len(delta_paths) + 1,
+                                                   delta_input_digest)
+        makedirs(path.dirname(delta_path), exist_ok=True)
+        output_handler.write_account_summary_delta(delta_path, 
+                                                   processed_data["changed_accounts"])
+        delta_paths.append(delta_path)
+        del file_path["account_summaries"]
+
+    if options.distinct_count_precision:
+        file_path["distinct_accounts"] = distinct_path
+
+    if sampling_estimates:
+        file_path["sampling_estimates"] = sampling_path
+
+    if daily_balances is not None:
+        file_path["daily_balances"] = daily_balance_path
+
+    if options.match_transfers:
+        file_path["unmatched_transfers"] = unmatched_transfer_path
 
-    output_handler.write_account_summaries_to_csv(file_path["account_summaries"])
-    output_handler.write_suspicious_transactions_to_csv(file_path["suspicious_transactions"])
-    output_handler.write_transaction_statistics_to_csv(file_path["transaction_statistics"])
+    output_handler.write_all(file_path)
+
+    if not options.delta and not options.partitions:
+        # The full file was replaced, deltas written before it no longer
+        # apply and its inputs must not be applied again.
+        OutputHandler.reset_delta_ledger(delta_ledger_path,
+                                         (list(partial_result.source_labels) if options.merge
+                                          else [RunCache.content_digest(input_file_path)]),
+                                         delta_paths)
+
+    if options.compact:
+        OutputHandler.compact_account_summaries(
+            path.join(current_directory, f"output/{file_prefix}_account_summaries.{file_extension}"),
+            delta_paths, ledger_path=delta_ledger_path)
+
+    if run_cache is not None:
+        if options.output_format == "fcol" and not options.partitions:
+            OutputHandler(account_summaries, [], {}).write_output("account_summaries", 
+                                                                  filter_input_path)
+
+        run_cache.record("processing", processing_fingerprint, output_paths)
 
     # Filtering 
-    filtered_filename = path.join(
-        current_directory,
-        "output",
-        "fdp_filter_team_2.csv"   
-    )
+    write_filtered_summaries(output_handler, filtered_filename, options)
 
-    filtered_summaries = output_handler.filter_account_summaries(
-        "balance", 5000, False
-    )
+    if options.serve:
+        try:
+            serve(TransactionService(data_processor, input_handler), options)
+        finally:
+            if rejects_stream is not None:
+                rejects_stream.close()
 
-    output_handler.write_filtered_summaries_to_csv(filtered_summaries, filtered_filename)
+    if run_cache is not None:
+        filter_outputs = [filtered_filename] if path.isfile(filtered_filename) else []
+        run_cache.record("filter", filter_fingerprint, filter_outputs)
 
-    print(f"Filtered account summaries written to: {filtered_filename}")
+    write_metrics(metrics, options)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,186 @@
+"""Contains a class titled MetricsRegistry, which collects stage
+timings and counters from InputHandler, DataProcessor and
+OutputHandler during a run and exports them as json or in the
+Prometheus text format."""
+
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# resource is not available on Windows, peak RSS is then not reported.
+try:
+    import resource
+except ImportError:
+    resource = None
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+class MetricsRegistry:
+    """Collects counters and per-stage timings.
+
+    Counters are updated once per batch or file rather than per row,
+    and a disabled registry returns from every method straight away,
+    so the handlers can always report to a registry. Stages record wall
+    time and process CPU time; CPU time includes every thread, so
+    stages running at the same time each see the others' CPU use.
+
+    Counters reported by the handlers:
+        rows_read, rows_rejected, bytes_read (InputHandler)
+        rows_processed, transactions_flagged (DataProcessor)
+        rows_written, files_written, bytes_written (OutputHandler)
+    """
+
+    PROMETHEUS_PREFIX = "fdp_"
+    """Prefix of every metric name in the Prometheus export."""
+
+    def __init__(self, enabled: bool = True):
+        """Creates an empty registry.
+
+        Args:
+            enabled (bool, optional): Collect metrics. Defaults to True.
+        """
+
+        self.__enabled = enabled
+        self.__counters = {}
+        self.__stages = {}
+        self.__lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Accessor for whether metrics are collected."""
+
+        return self.__enabled
+
+    @property
+    def counters(self) -> dict:
+        """Returns a copy of the counters keyed by name."""
+
+        with self.__lock:
+            return dict(self.__counters)
+
+    @property
+    def stages(self) -> dict:
+        """Returns a copy of the stage timings keyed by stage name."""
+
+        with self.__lock:
+            return {name: dict(stage) for name, stage in self.__stages.items()}
+
+    def increment(self, name: str, value: int = 1) -> None:
+        """Adds value to a counter.
+
+        Args:
+            name (str): Counter name.
+            value (int, optional): Amount added. Defaults to 1.
+        """
+
+        if not self.__enabled:
+            return
+
+        with self.__lock:
+            self.__counters[name] = self.__counters.get(name, 0) + value
+
+    def stage(self, name: str):
+        """Returns a context manager timing the code it wraps as one
+        call of a stage.
+
+        Args:
+            name (str): Stage name.
+
+        Returns:
+            A context manager, one that does nothing when disabled.
+        """
+
+        if not self.__enabled:
+            return nullcontext()
+
+        return self.__timed_stage(name)
+
+    @contextmanager
+    def __timed_stage(self, name: str):
+        """Records the wall and CPU time of the wrapped code."""
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        try:
+            yield
+        finally:
+            wall_seconds = time.perf_counter() - wall_start
+            cpu_seconds = time.process_time() - cpu_start
+
+            with self.__lock:
+                stage = self.__stages.setdefault(name, {"calls": 0,
+                                                        "wall_seconds": 0.0,
+                                                        "cpu_seconds": 0.0})
+                stage["calls"] += 1
+                stage["wall_seconds"] += wall_seconds
+                stage["cpu_seconds"] += cpu_seconds
+
+    @staticmethod
+    def peak_rss_bytes() -> int:
+        """Returns the peak resident set size of the process in bytes,
+        or None where it cannot be read."""
+
+        if resource is None:
+            return None
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        # Linux reports kilobytes, macOS reports bytes.
+        return peak if sys.platform == "darwin" else peak * 1024
+
+    def to_dict(self) -> dict:
+        """Returns the counters, stages and peak RSS as a dictionary."""
+
+        return {"counters": self.counters,
+                "stages": self.stages,
+                "peak_rss_bytes": self.peak_rss_bytes()}
+
+    def to_prometheus(self) -> str:
+        """Returns the metrics in the Prometheus text exposition format."""
+
+        prefix = self.PROMETHEUS_PREFIX
+        lines = []
+
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"# TYPE {prefix}{name}_total counter")
+            lines.append(f"{prefix}{name}_total {value}")
+
+        stages = self.stages
+
+        for field, metric_type in [("calls", "counter"),
+                                   ("wall_seconds", "counter"),
+                                   ("cpu_seconds", "counter")]:
+            if not stages:
+                break
+
+            lines.append(f"# TYPE {prefix}stage_{field}_total {metric_type}")
+
+            for name, stage in sorted(stages.items()):
+                lines.append(f'{prefix}stage_{field}_total{{stage="{name}"}} {stage[field]}')
+
+        peak_rss = self.peak_rss_bytes()
+
+        if peak_rss is not None:
+            lines.append(f"# TYPE {prefix}peak_rss_bytes gauge")
+            lines.append(f"{prefix}peak_rss_bytes {peak_rss}")
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, file_path: str) -> None:
+        """Writes the metrics to a file, in the Prometheus text format
+        when the file ends with .prom and as json otherwise.
+
+        Args:
+            file_path (str): Destination of the metrics file.
+        """
+
+        with open(file_path, "w") as metrics_file:
+            if file_path.endswith(".prom"):
+                metrics_file.write(self.to_prometheus())
+            else:
+                json.dump(self.to_dict(), metrics_file, indent=2)
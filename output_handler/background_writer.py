@@ -0,0 +1,84 @@
+"""Contains a class titled BackgroundWriter, a binary file object
+that hands the chunks written to it to a background thread, so that
+slow work such as compression overlaps with producing the data."""
+
+import io
+import queue
+import threading
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+class BackgroundWriter(io.RawIOBase):
+    """Forwards written chunks to a target file from a separate thread.
+
+    Chunks pass through a bounded queue, so a producer that gets ahead
+    of the target waits instead of buffering without limit. Wrap the
+    writer in io.BufferedWriter to turn many small writes into a few
+    large chunks. An error raised by the target is re-raised by the
+    next write or by close.
+    """
+
+    QUEUE_SIZE = 8
+    """Maximum number of chunks waiting for the background thread."""
+
+    def __init__(self, target, queue_size: int = QUEUE_SIZE):
+        """Starts the background thread.
+
+        Args:
+            target: Binary file object the chunks are written to. It is
+             closed when the writer is closed.
+            queue_size (int, optional): Chunks allowed to wait for the
+             thread. Defaults to QUEUE_SIZE.
+        """
+
+        super().__init__()
+        self.__target = target
+        self.__chunks = queue.Queue(queue_size)
+        self.__error = None
+        self.__thread = threading.Thread(target=self.__drain, daemon=True)
+        self.__thread.start()
+
+    def __drain(self) -> None:
+        """Writes queued chunks to the target until the end marker."""
+
+        try:
+            while (chunk := self.__chunks.get()) is not None:
+                self.__target.write(chunk)
+            self.__target.close()
+        except BaseException as error:
+            self.__error = error
+
+            # keeps taking chunks so the producer is never blocked.
+            while self.__chunks.get() is not None:
+                pass
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        """Queues a copy of data for the background thread.
+
+        Returns:
+            int: Number of bytes accepted.
+        """
+
+        if self.__error is not None:
+            raise self.__error
+
+        chunk = bytes(data)
+        self.__chunks.put(chunk)
+
+        return len(chunk)
+
+    def close(self) -> None:
+        """Waits for every queued chunk to be written and closes the target."""
+
+        if not self.closed:
+            self.__chunks.put(None)
+            self.__thread.join()
+            super().close()
+
+            if self.__error is not None:
+                raise self.__error
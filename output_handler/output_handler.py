@@ -1,8 +1,35 @@
 """OutputHandler takes 3 arguments from
  data_processor.py and writes the
-data to a csv file."""
+data to csv, json or ndjson files, optionally compressed.
+Files are written to a temporary file and renamed into place."""
 
+import bz2
 import csv
+import gzip
+import io
+import json
+import lzma
+import os
+import re
+import shutil
+import threading
+import zlib
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from os import path
+from queue import Queue
+from uuid import uuid4
+from output_handler.background_writer import BackgroundWriter
+from columnar.columnar import ColumnarFile
+from output_handler.transaction_stream import TransactionStream
+from metrics.metrics import MetricsRegistry
+
+# zstandard is optional, .zst output is only available when installed.
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 __author__ = "Owen Maxwell"
 __version__ = "1.0.0"
@@ -10,13 +37,112 @@ __credits__ = "COMP-1327 Faculty"
 
 class OutputHandler:
     """Takes 3 arguments and after verification,
-    writes the data in a csv file"""
+    writes the data in a csv, json or ndjson file"""
 
     # Arguments come from data_processor.
 
+    ACCOUNT_SUMMARY_FIELDS = ["Account number", 
+                              "Balance", 
+                              "Total Deposits", 
+                              "Total Withdrawals"]
+    """Column headers of the account summaries file."""
+
+    SUSPICIOUS_TRANSACTION_FIELDS = ["Transaction ID", 
+                                     "Account number", 
+                                     "Date", 
+                                     "Transaction type", 
+                                     "Amount", 
+                                     "Currency", 
+                                     "Description"]
+    """Column headers of the suspicious transactions file, which are
+    also the transaction keys written to each row."""
+
+    TRANSACTION_STATISTICS_FIELDS = ["Transaction type", 
+                                     "Total amount", 
+                                     "Transaction count"]
+    """Column headers of the transaction statistics file."""
+
+    DISTINCT_ACCOUNTS_FIELDS = ["Dimension", 
+                                "Value", 
+                                "Distinct accounts"]
+    """Column headers of the distinct accounts file."""
+
+    SAMPLING_ESTIMATE_FIELDS = ["Transaction type",
+                                "Statistic",
+                                "Estimate",
+                                "Lower bound",
+                                "Upper bound"]
+    """Column headers of the sampling estimates file."""
+
+    DAILY_BALANCE_FIELDS = ["Account number",
+                            "Date",
+                            "Balance"]
+    """Column headers of the daily balances file, one row per account
+    and date with transactions."""
+
+    UNMATCHED_TRANSFER_FIELDS = SUSPICIOUS_TRANSACTION_FIELDS
+    """Column headers of the unmatched transfers file, the transaction
+    keys written to each row."""
+
+    OUTPUT_FORMATS = ["csv", "json", "ndjson", ColumnarFile.FILE_EXTENSION]
+    """File extensions of the supported output formats."""
+
+    COLUMN_TYPES = {"Balance": "<f8",
+                    "Total Deposits": "<f8",
+                    "Total Withdrawals": "<f8",
+                    "Amount": "<f8",
+                    "Total amount": "<f8",
+                    "Transaction count": "<i8",
+                    "Distinct accounts": "<i8",
+                    "Estimate": "<f8",
+                    "Lower bound": "<f8",
+                    "Upper bound": "<f8"}
+    """Types of the numeric columns in columnar files, other columns
+    are stored as text."""
+
+    COMPRESSION_FORMATS = ["gz", "bz2", "xz", "zst"]
+    """File extensions of the supported compression formats, added
+    after the output format extension, e.g. "summaries.csv.gz"."""
+
+    AVAILABLE_COMPRESSION_FORMATS = [compression for compression in COMPRESSION_FORMATS
+                                     if compression != "zst" or zstandard is not None]
+    """The compression formats that can be written here, zst needs
+    the optional zstandard package."""
+
+    PARTITION_SCHEMES = ["hash", "range"]
+    """Ways account numbers can be assigned to output partitions."""
+
+    DELTA_DIGEST_LENGTH = 16
+    """Hex digits of an input's content digest kept in the name of its
+    delta file and in the delta ledger."""
+
+    DELTA_NAME_PATTERN = re.compile(r"\.delta-\d+-([0-9a-f]+)\.")
+    """Finds the input digest in the name of a delta file."""
+
+    PARTITION_CHUNK_ROWS = 1024
+    """Rows handed to a partition file's writer at a time."""
+
+    PARTITION_QUEUE_CHUNKS = 4
+    """Chunks that may wait for a partition file's writer before the
+    rows being routed are held back."""
+
+    PARTITION_OPEN_FILES = 256
+    """Partition files written at the same time, each holds an open
+    file and a writer thread."""
+
+    WRITE_BUFFER_SIZE = 1 << 20
+    """Default size in bytes of the buffer used when writing files."""
+
     def __init__(self, account_summaries: dict, 
                        suspicious_transactions: list, 
-                       transaction_statistics: dict):
+                       transaction_statistics: dict,
+                       distinct_accounts: dict = None,
+                       buffer_size: int = WRITE_BUFFER_SIZE,
+                       background_compression: bool = False,
+                       metrics: MetricsRegistry = None,
+                       sampling_estimates: dict = None,
+                       daily_balances: dict = None,
+                       unmatched_transfers: list = None):
         """Initializes the class instance with 3 arguments.
         
         Args:
@@ -25,11 +151,36 @@ class OutputHandler:
              flagged as suspicious.
             transaction_statistics (dict): Stores statistics relative
              to each transaction.
+            distinct_accounts (dict, optional): HyperLogLog sketches of
+             distinct accounts keyed by dimension and value.
+            buffer_size (int, optional): Size in bytes of the buffer
+             used when writing files. Defaults to WRITE_BUFFER_SIZE.
+            background_compression (bool, optional): Compress files on
+             a background thread, so compression overlaps with record
+             formatting. Defaults to False.
+            metrics (MetricsRegistry, optional): Registry the write time
+             and the rows, files and bytes written are reported to.
+            sampling_estimates (dict, optional): Estimated transaction
+             statistics and their confidence intervals, as returned by
+             TransactionSampler.estimate_statistics.
+            daily_balances (dict, optional): Sorted dates and the
+             balances at the end of them keyed by account number, as
+             returned by DataProcessor.get_daily_balances.
+            unmatched_transfers (list, optional): Transfers without a
+             counterpart, as returned by
+             DataProcessor.unmatched_transfers.
         """
 
         self.__account_summaries = account_summaries
         self.__suspicious_transactions = suspicious_transactions
         self.__transaction_statistics = transaction_statistics
+        self.__distinct_accounts = distinct_accounts or {}
+        self.__buffer_size = buffer_size
+        self.__background_compression = background_compression
+        self.__metrics = metrics if metrics is not None else MetricsRegistry(enabled=False)
+        self.__sampling_estimates = sampling_estimates or {}
+        self.__daily_balances = daily_balances or {}
+        self.__unmatched_transfers = unmatched_transfers or []
     
     # Propert Accessors
 
@@ -51,7 +202,351 @@ class OutputHandler:
 
         return self.__transaction_statistics
 
-    # CSV file writing
+    @property
+    def distinct_accounts(self) -> dict:
+        """Enables access to distinct_accounts for value retrieval."""
+
+        return self.__distinct_accounts
+
+    @property
+    def sampling_estimates(self) -> dict:
+        """Enables access to sampling_estimates for value retrieval."""
+
+        return self.__sampling_estimates
+
+    @property
+    def daily_balances(self) -> dict:
+        """Enables access to daily_balances for value retrieval."""
+
+        return self.__daily_balances
+
+    @property
+    def unmatched_transfers(self) -> list:
+        """Enables access to unmatched_transfers for value retrieval."""
+
+        return self.__unmatched_transfers
+
+    # Output file writing
+
+    # Row generators, shared by the writers so that rows are produced
+    # one at a time while the file is written.
+
+    def __account_summary_rows(self):
+        """Yields one csv row per account summary."""
+
+        for account_number, summary in self.__account_summaries.items():
+            yield (account_number,
+                   summary["balance"],
+                   summary["total_deposits"],
+                   summary["total_withdrawals"])
+
+    def __suspicious_transaction_rows(self):
+        """Yields one csv row per suspicious transaction."""
+
+        fields = self.SUSPICIOUS_TRANSACTION_FIELDS
+
+        for transaction in self.__suspicious_transactions:
+            yield [transaction[field] for field in fields]
+
+    def __transaction_statistic_rows(self):
+        """Yields one csv row per transaction type."""
+
+        for transaction_type, statistic in self.__transaction_statistics.items():
+            yield (transaction_type,
+                   statistic["total_amount"],
+                   statistic["transaction_count"])
+
+    def __distinct_account_rows(self):
+        """Yields one csv row per dimension value."""
+
+        for dimension, sketches in self.__distinct_accounts.items():
+            for value, sketch in sketches.items():
+                yield (dimension, value, sketch.count())
+
+    def __sampling_estimate_rows(self):
+        """Yields one csv row per estimated statistic."""
+
+        for transaction_type, statistics in self.__sampling_estimates.items():
+            for statistic, estimate in statistics.items():
+                yield (transaction_type,
+                       statistic,
+                       estimate["estimate"],
+                       estimate["lower"],
+                       estimate["upper"])
+
+    def __daily_balance_rows(self):
+        """Yields one csv row per account and date, in the long format
+        so that only dates with transactions take up rows."""
+
+        for account_number, (dates, balances) in self.__daily_balances.items():
+            for date, balance in zip(dates, balances):
+                yield (account_number, date, balance)
+
+    def __unmatched_transfer_rows(self):
+        """Yields one csv row per unmatched transfer."""
+
+        fields = self.UNMATCHED_TRANSFER_FIELDS
+
+        for transaction in self.__unmatched_transfers:
+            yield [transaction[field] for field in fields]
+
+    def __result_rows(self, result_name: str) -> tuple:
+        """Returns the header and row generator of a result.
+
+        Raises:
+            KeyError: When result_name does not name a result.
+        """
+
+        results = {"account_summaries": (self.ACCOUNT_SUMMARY_FIELDS,
+                                         self.__account_summary_rows),
+                   "suspicious_transactions": (self.SUSPICIOUS_TRANSACTION_FIELDS,
+                                               self.__suspicious_transaction_rows),
+                   "transaction_statistics": (self.TRANSACTION_STATISTICS_FIELDS,
+                                              self.__transaction_statistic_rows),
+                   "distinct_accounts": (self.DISTINCT_ACCOUNTS_FIELDS,
+                                         self.__distinct_account_rows),
+                   "sampling_estimates": (self.SAMPLING_ESTIMATE_FIELDS,
+                                          self.__sampling_estimate_rows),
+                   "daily_balances": (self.DAILY_BALANCE_FIELDS,
+                                      self.__daily_balance_rows),
+                   "unmatched_transfers": (self.UNMATCHED_TRANSFER_FIELDS,
+                                           self.__unmatched_transfer_rows)}
+
+        if result_name not in results:
+            raise KeyError(f"Unknown result: {result_name}")
+
+        header, rows = results[result_name]
+        return header, rows()
+
+    @classmethod
+    def get_compression(cls, file_path: str) -> str:
+        """Takes a file path and returns the compression format
+        selected by its extension.
+
+        Args:
+            file_path (str): Destination of an output file.
+
+        Returns:
+            str: One of COMPRESSION_FORMATS, or None for no compression.
+        """
+
+        extension = file_path.split(".")[-1].lower()
+
+        return extension if extension in cls.COMPRESSION_FORMATS else None
+
+    @classmethod
+    def get_output_format(cls, file_path: str) -> str:
+        """Takes a file path and returns the output format
+        selected by its extension, ignoring a compression extension.
+
+        Args:
+            file_path (str): Destination of an output file.
+
+        Raises:
+            ValueError: When the extension is not a supported format.
+
+        Returns:
+            str: One of OUTPUT_FORMATS.
+        """
+
+        extensions = file_path.lower().split(".")
+
+        if cls.get_compression(file_path):
+            extensions.pop()
+
+        file_format = extensions[-1]
+
+        if file_format not in cls.OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported output format: {file_path}")
+
+        return file_format
+
+    def write_output(self, result_name: str, file_path: str, file_format: str = None) -> None:
+        """Writes one result to a file in csv, json, ndjson or columnar
+        format. Text rows are formatted and written one at a time
+        through a write buffer of buffer_size bytes, so memory use does
+        not grow with the size of the output. Columnar files are written
+        in row groups, each column of a group contiguous, and are read
+        with ColumnarFile.
+        
+        Args:
+            result_name (str): "account_summaries", 
+             "suspicious_transactions", "transaction_statistics",
+             "distinct_accounts", "sampling_estimates",
+             "daily_balances" or "unmatched_transfers".
+            file_path (str): String representing the destination
+             of the created file.
+            file_format (str, optional): Output format, defaults to
+             the format selected by the file extension.
+
+        Raises:
+            KeyError: When result_name does not name a result.
+            ValueError: When the format is not supported.
+
+        Output:
+            file: Created a file containing the result, json and ndjson
+             records are keyed by the csv column headers.
+        """
+
+        header, rows = self.__result_rows(result_name)
+        self.__write_file(file_path, header, rows, file_format)
+
+    def __write_file(self, file_path: str, header: list, rows, file_format: str = None) -> None:
+        """Writes a header and rows to file_path in the given format,
+        or the format selected by the file extension."""
+
+        file_format = file_format or self.get_output_format(file_path)
+
+        if file_format == "csv":
+            writer = self.__write_csv
+        elif file_format == "json":
+            writer = self.__write_json
+        elif file_format == "ndjson":
+            writer = self.__write_ndjson
+        elif file_format == ColumnarFile.FILE_EXTENSION:
+            writer = self.__write_columnar
+        else:
+            raise ValueError(f"Unsupported output format: {file_format}")
+
+        binary = writer == self.__write_columnar
+
+        if self.__metrics.enabled:
+            rows = self.__count_rows(rows)
+
+        with self.__metrics.stage("write"), self.__open_output(file_path, binary) as output_file:
+            writer(output_file, header, rows)
+
+    def __count_rows(self, rows):
+        """Passes rows through and counts them once all are written."""
+
+        count = 0
+
+        for row in rows:
+            count += 1
+            yield row
+
+        self.__metrics.increment("rows_written", count)
+
+    @contextmanager
+    def __open_output(self, file_path: str, binary: bool = False):
+        """Opens a text stream to a temporary file next to file_path
+        and renames it to file_path once the stream is closed without
+        an error, so readers never see a partly written file. Output is
+        compressed when file_path ends with a compression extension.
+        With binary set, a binary stream is opened instead.
+
+        Raises:
+            ValueError: When zstandard output is requested but the
+             package is not installed, or a binary file is compressed.
+        """
+
+        directory, filename = path.split(path.abspath(file_path))
+        temp_path = path.join(directory, f".{filename}.{uuid4().hex}.tmp")
+        compression = self.get_compression(file_path)
+
+        if compression == "zst" and zstandard is None:
+            raise ValueError("Writing .zst files requires the zstandard package.")
+
+        if compression and binary:
+            raise ValueError(f"Binary output cannot be compressed: {file_path}")
+
+        try:
+            if binary:
+                with open(temp_path, "xb", buffering=self.__buffer_size) as output_file:
+                    yield output_file
+            elif compression is None:
+                with open(temp_path, "x", newline="", encoding="utf-8",
+                          buffering=self.__buffer_size) as output_file:
+                    yield output_file
+            else:
+                with open(temp_path, "xb") as raw_file:
+                    target = self.__open_compressor(raw_file, compression)
+
+                    if self.__background_compression:
+                        target = io.BufferedWriter(BackgroundWriter(target), self.__buffer_size)
+
+                    with io.TextIOWrapper(target, encoding="utf-8", newline="") as output_file:
+                        yield output_file
+
+            os.replace(temp_path, file_path)
+
+            if self.__metrics.enabled:
+                self.__metrics.increment("files_written")
+                self.__metrics.increment("bytes_written", path.getsize(file_path))
+        except BaseException:
+            if path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def __open_compressor(self, raw_file, compression: str):
+        """Returns a binary stream compressing into raw_file."""
+
+        if compression == "gz":
+            return gzip.GzipFile(fileobj=raw_file, mode="wb", compresslevel=6)
+        elif compression == "bz2":
+            return bz2.BZ2File(raw_file, "wb")
+        elif compression == "xz":
+            return lzma.LZMAFile(raw_file, "wb")
+
+        return zstandard.ZstdCompressor().stream_writer(raw_file, closefd=False)
+
+    def __write_csv(self, output_file, header: list, rows) -> None:
+        """Writes a header line followed by one line per row."""
+
+        writer = csv.writer(output_file)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+    def __write_json(self, output_file, header: list, rows) -> None:
+        """Writes a json array with one object per row, encoding each
+        object separately instead of the whole array at once."""
+
+        encode = json.JSONEncoder().encode
+        separator = "\n"
+
+        output_file.write("[")
+
+        for row in rows:
+            output_file.write(separator + encode(dict(zip(header, row))))
+            separator = ",\n"
+
+        output_file.write("\n]\n")
+
+    def __write_ndjson(self, output_file, header: list, rows) -> None:
+        """Writes one json object per line."""
+
+        encode = json.JSONEncoder().encode
+
+        for row in rows:
+            output_file.write(encode(dict(zip(header, row))) + "\n")
+
+    def __write_columnar(self, output_file, header: list, rows) -> None:
+        """Writes the rows in columnar layout with typed numeric columns."""
+
+        ColumnarFile.write(output_file, header, rows, self.COLUMN_TYPES)
+
+    # stream_suspicious_transactions
+
+    @classmethod
+    def open_suspicious_transactions_stream(cls, file_path: str, flush_every: int = 1) -> TransactionStream:
+        """Opens a csv or ndjson file that suspicious transactions are
+        written to one at a time, for use as the suspicious sink of a
+        DataProcessor so flags are written as soon as they are found.
+
+        Args:
+            file_path (str): String representing the destination
+            of the created file.
+            flush_every (int, optional): Transactions written between
+            flushes. Defaults to 1.
+
+        Raises:
+            ValueError: When the extension is not csv or ndjson.
+
+        Returns:
+            TransactionStream: The open stream, close it when done.
+        """
+
+        return TransactionStream(file_path, cls.SUSPICIOUS_TRANSACTION_FIELDS, flush_every)
 
     # write_account_summaries
 
@@ -67,18 +562,7 @@ class OutputHandler:
             file (csv): Created a csv file containing account summary data.
         """
 
-        with open(file_path, "w", newline="") as output_file:
-            writer = csv.writer(output_file)
-            writer.writerow(["Account number", 
-                             "Balance", 
-                             "Total Deposits", 
-                             "Total Withdrawals"])
-
-            for account_number, summary in self.__account_summaries.items():
-                writer.writerow([account_number,
-                                summary["balance"],
-                                summary["total_deposits"],
-                                summary["total_withdrawals"]])
+        self.write_output("account_summaries", file_path, "csv")
 
     # write_suspicious_transactions
 
@@ -94,24 +578,7 @@ class OutputHandler:
             file (csv): Created a csv file containing suspicious transaction data.            
         """
 
-        with open(file_path, "w", newline="") as output_file:
-            writer = csv.writer(output_file)
-            writer.writerow(["Transaction ID", 
-                            "Account number", 
-                            "Date", 
-                            "Transaction type", 
-                            "Amount", 
-                            "Currency", 
-                            "Description"])
-
-            for transaction in self.__suspicious_transactions:
-                writer.writerow([transaction["Transaction ID"],
-                                transaction["Account number"],
-                                transaction["Date"],
-                                transaction["Transaction type"],
-                                transaction["Amount"],
-                                transaction["Currency"],
-                                transaction["Description"]])
+        self.write_output("suspicious_transactions", file_path, "csv")
 
     # write_transaction_statistics
 
@@ -126,16 +593,594 @@ class OutputHandler:
         Output:
             file (csv): Created a csv file containing transaction statistics data.            
         """
-        with open(file_path, "w", newline="") as output_file:
-            writer = csv.writer(output_file)
-            writer.writerow(["Transaction type", 
-                             "Total amount", 
-                             "Transaction count"])
 
-            for transaction_type, statistic in self.__transaction_statistics.items():
-                writer.writerow([transaction_type, 
-                                 statistic["total_amount"], 
-                                 statistic["transaction_count"]])
+        self.write_output("transaction_statistics", file_path, "csv")
+
+    # write_distinct_accounts
+
+    def write_distinct_accounts_to_csv(self, file_path: str) -> None:
+        """Takes an file path (str) as an argument and writes the
+        estimated number of distinct accounts for each dimension
+        value to a csv file.
+        
+        Args:
+            file_path (str): String representing the destination
+            of the created file.
+
+        Output:
+            file (csv): Created a csv file containing distinct account counts.            
+        """
+
+        self.write_output("distinct_accounts", file_path, "csv")
+
+    # write_partitioned
+
+    def write_partitioned(self, directory: str, 
+                                partitions: int, 
+                                scheme: str = "hash", 
+                                split_by_month: bool = True, 
+                                file_extension: str = "csv",
+                                max_open_files: int = PARTITION_OPEN_FILES) -> dict:
+        """Writes account summaries and suspicious transactions split
+        into partitions by account number, so that a consumer owning
+        a slice of accounts only reads its own files. Rows are routed
+        to a writer thread per partition file, in chunks of
+        PARTITION_CHUNK_ROWS, so no partition is held in memory.
+        At most max_open_files files are written at a time, the rows
+        of further files are routed in another pass over the results
+        once those are complete.
+
+        The partitions and a manifest.json listing every file are
+        written to a new folder next to directory, which then replaces
+        directory as a whole, so partitions of an earlier run that
+        are not in the new manifest do not remain.
+
+        Layout:
+            directory/manifest.json
+            directory/account_summaries/part-00000.csv
+            directory/suspicious_transactions/month=2023-03/part-00000.csv
+            directory/transaction_statistics.csv
+
+        Args:
+            directory (str): Folder the partitions are written to, any
+             earlier contents are replaced.
+            partitions (int): Number of account partitions.
+            scheme (str, optional): "hash" spreads accounts by a stable
+             hash of the account number, "range" gives each partition a
+             contiguous range of account numbers. Defaults to "hash".
+            split_by_month (bool, optional): Also split suspicious
+             transactions by the month of their date. Defaults to True.
+            file_extension (str, optional): Format of the files, for
+             example "csv", "ndjson" or "csv.gz". Defaults to "csv".
+            max_open_files (int, optional): Partition files written at
+             the same time. Defaults to PARTITION_OPEN_FILES.
+
+        Raises:
+            ValueError: When partitions or max_open_files is not
+             positive, or the scheme is unknown.
+
+        Output:
+            files: Created the partition files and manifest.json.
+
+        Returns:
+            dict: The manifest.
+        """
+
+        if partitions <= 0:
+            raise ValueError(f"Partitions must be positive, got {partitions}.")
+
+        if max_open_files <= 0:
+            raise ValueError(f"Open partition files must be positive, got {max_open_files}.")
+
+        if scheme not in self.PARTITION_SCHEMES:
+            raise ValueError(f"Unknown partition scheme: {scheme}")
+
+        partition_of, ranges = self.__partitioner(partitions, scheme)
+        parent, name = path.split(path.abspath(directory))
+        build_directory = path.join(parent, f".{name}.{uuid4().hex}.tmp")
+        os.makedirs(build_directory)
+        files = {}
+        open_files = {}
+        deferred = False
+
+        def route(result_name: str, header: list, relative_path: str, key: dict, row) -> None:
+            nonlocal deferred
+            partition_file = open_files.get(relative_path)
+
+            if partition_file is None:
+                if relative_path in files:
+                    # written in full by an earlier pass.
+                    return
+
+                if len(open_files) >= max_open_files:
+                    deferred = True
+                    return
+
+                partition_file = self.__open_partition_file(
+                    path.join(build_directory, relative_path), header,
+                    {"result": result_name, "path": relative_path, **key})
+                files[relative_path] = open_files[relative_path] = partition_file
+
+            partition_file["chunk"].append(row)
+
+            if len(partition_file["chunk"]) >= self.PARTITION_CHUNK_ROWS:
+                self.__send_partition_chunk(partition_file)
+
+        try:
+            # each pass completes every file it opens, since it sees
+            # all of their rows.
+            while True:
+                open_files.clear()
+                deferred = False
+
+                try:
+                    for row in self.__account_summary_rows():
+                        partition = partition_of(row[0])
+                        route("account_summaries", self.ACCOUNT_SUMMARY_FIELDS,
+                              f"account_summaries/part-{partition:05d}.{file_extension}",
+                              {"partition": partition}, row)
+
+                    for transaction, row in zip(self.__suspicious_transactions,
+                                                self.__suspicious_transaction_rows()):
+                        partition = partition_of(transaction["Account number"])
+                        folder = "suspicious_transactions"
+                        key = {"partition": partition}
+
+                        if split_by_month:
+                            month = str(transaction.get("Date") or "")[:7] or "unknown"
+                            folder += f"/month={month}"
+                            key["month"] = month
+
+                        route("suspicious_transactions", self.SUSPICIOUS_TRANSACTION_FIELDS,
+                              f"{folder}/part-{partition:05d}.{file_extension}", key, row)
+                finally:
+                    # the writers finish even when routing failed, so none is left waiting.
+                    for partition_file in open_files.values():
+                        self.__send_partition_chunk(partition_file)
+                        partition_file["queue"].put(None)
+
+                    for partition_file in open_files.values():
+                        partition_file["thread"].join()
+
+                for partition_file in open_files.values():
+                    if partition_file["error"] is not None:
+                        raise partition_file["error"]
+
+                if not deferred:
+                    break
+
+            statistics_rows = list(self.__transaction_statistic_rows())
+            statistics_path = f"transaction_statistics.{file_extension}"
+            self.__write_file(path.join(build_directory, statistics_path),
+                              self.TRANSACTION_STATISTICS_FIELDS, statistics_rows)
+
+            manifest = {"scheme": scheme,
+                        "partitions": partitions,
+                        "split_by_month": split_by_month,
+                        "ranges": ranges,
+                        "files": [partition_file["entry"] | {"rows": partition_file["rows"]}
+                                  for partition_file in files.values()]
+                                 + [{"result": "transaction_statistics",
+                                     "path": statistics_path,
+                                     "rows": len(statistics_rows)}]}
+
+            with self.__open_output(path.join(build_directory, "manifest.json")) as manifest_file:
+                json.dump(manifest, manifest_file, indent=2)
+
+            self.__replace_directory(build_directory, directory)
+        except BaseException:
+            shutil.rmtree(build_directory, ignore_errors=True)
+            raise
+
+        return manifest
+
+    def __open_partition_file(self, file_path: str, header: list, entry: dict) -> dict:
+        """Starts a writer thread for one partition file, it writes the
+        row chunks put on the returned queue until it gets None."""
+
+        os.makedirs(path.dirname(file_path), exist_ok=True)
+        partition_file = {"entry": entry, "rows": 0, "chunk": [], "error": None,
+                          "queue": Queue(self.PARTITION_QUEUE_CHUNKS)}
+
+        def rows():
+            while True:
+                chunk = partition_file["queue"].get()
+
+                if chunk is None:
+                    return
+
+                yield from chunk
+
+        def write() -> None:
+            try:
+                self.__write_file(file_path, header, rows())
+            except BaseException as error:
+                partition_file["error"] = error
+
+                # keeps taking chunks so routing is never blocked on a failed writer.
+                while partition_file["queue"].get() is not None:
+                    pass
+
+        partition_file["thread"] = threading.Thread(target=write, daemon=True)
+        partition_file["thread"].start()
+
+        return partition_file
+
+    @staticmethod
+    def __send_partition_chunk(partition_file: dict) -> None:
+        """Hands the rows routed to a partition file to its writer."""
+
+        chunk = partition_file["chunk"]
+
+        if chunk:
+            partition_file["rows"] += len(chunk)
+            partition_file["queue"].put(chunk)
+            partition_file["chunk"] = []
+
+    @staticmethod
+    def __replace_directory(source: str, target: str) -> None:
+        """Moves a fully written folder to target, removing the folder
+        it replaces once the new one is in place."""
+
+        if not path.exists(target):
+            os.rename(source, target)
+            return
+
+        old_directory = f"{source}.old"
+        os.rename(target, old_directory)
+        os.rename(source, target)
+        shutil.rmtree(old_directory, ignore_errors=True)
+
+    def __partitioner(self, partitions: int, scheme: str) -> tuple:
+        """Returns a function mapping an account number to its partition,
+        and for the range scheme the first and last account number of
+        each partition."""
+
+        if scheme == "hash":
+            # crc32 rather than hash(), which differs between processes.
+            def partition_of(account_number) -> int:
+                return zlib.crc32(str(account_number).encode()) % partitions
+
+            return partition_of, None
+
+        accounts = sorted(self.__account_summaries, key=self.__account_sort_key)
+        size = -(-len(accounts) // partitions) or 1
+        chunks = [accounts[start:start + size] for start in range(0, len(accounts), size)]
+        lower_bounds = [self.__account_sort_key(chunk[0]) for chunk in chunks[1:]]
+
+        def partition_of(account_number) -> int:
+            return bisect_right(lower_bounds, self.__account_sort_key(account_number))
+
+        return partition_of, [[chunk[0], chunk[-1]] for chunk in chunks]
+
+    @staticmethod
+    def __account_sort_key(account_number) -> tuple:
+        """Orders numeric account numbers by value and others after them."""
+
+        account_number = str(account_number)
+
+        if account_number.isdigit():
+            return (0, int(account_number), "")
+
+        return (1, 0, account_number)
+
+    # account summary deltas
+
+    def write_account_summary_delta(self, file_path: str, changed_accounts) -> int:
+        """Writes the summaries of the changed accounts only, so that
+        a run that moves a few accounts writes a few rows instead of
+        the whole account summaries file. Deltas are merged into the
+        full file with compact_account_summaries.
+
+        Args:
+            file_path (str): Destination of the delta file, its
+             extension selects the format.
+            changed_accounts (set): Account numbers whose summaries
+             changed, see DataProcessor.changed_accounts.
+
+        Output:
+            file: Created the delta file.
+
+        Returns:
+            int: The number of summaries written.
+        """
+
+        rows = [row for row in self.__account_summary_rows() if row[0] in changed_accounts]
+
+        self.__write_file(file_path, self.ACCOUNT_SUMMARY_FIELDS, rows)
+
+        return len(rows)
+
+    @classmethod
+    def read_account_summaries(cls, file_path: str, delta_paths: list = ()) -> dict:
+        """Reads an account summaries file written by OutputHandler and
+        applies delta files to it in order, a later summary of an
+        account replacing an earlier one.
+
+        Args:
+            file_path (str): Full account summaries file, skipped when
+             it does not exist yet.
+            delta_paths (list, optional): Delta files, oldest first.
+
+        Raises:
+            ValueError: When an extension is not a supported format.
+
+        Returns:
+            dict: Account summaries in the form built by DataProcessor.
+        """
+
+        account_summaries = {}
+
+        for summaries_path in [file_path, *delta_paths]:
+            if summaries_path == file_path and not path.exists(file_path):
+                continue
+
+            for record in cls.__read_records(summaries_path):
+                account_number = str(record["Account number"])
+                account_summaries[account_number] = {
+                    "account_number": account_number,
+                    "balance": cls.__number(record["Balance"]),
+                    "total_deposits": cls.__number(record["Total Deposits"]),
+                    "total_withdrawals": cls.__number(record["Total Withdrawals"])
+                }
+
+        return account_summaries
+
+    @staticmethod
+    def __number(value):
+        """Returns a value read from a file as a number, keeping whole
+        numbers that were written without a decimal point as int, so
+        that they are written back unchanged."""
+
+        if isinstance(value, int) or isinstance(value, str) and value.lstrip("-").isdigit():
+            return int(value)
+
+        return float(value)
+
+    @classmethod
+    def compact_account_summaries(cls, file_path: str, 
+                                       delta_paths: list, 
+                                       remove_deltas: bool = True,
+                                       ledger_path: str = None) -> int:
+        """Merges delta files into the full account summaries file.
+        The full file is replaced atomically before the deltas are
+        removed, and applying a delta twice gives the same result, so
+        an interrupted compaction can simply be run again.
+
+        Args:
+            file_path (str): Full account summaries file, created when
+             it does not exist yet.
+            delta_paths (list): Delta files, oldest first.
+            remove_deltas (bool, optional): Delete the delta files once
+             they are merged. Defaults to True.
+            ledger_path (str, optional): Delta ledger the input digests
+             of the merged deltas are moved to before the deltas are
+             removed, see check_delta_input. Defaults to None.
+
+        Output:
+            file: Replaced the full account summaries file.
+
+        Returns:
+            int: The number of accounts in the compacted file.
+        """
+
+        account_summaries = cls.read_account_summaries(file_path, delta_paths)
+
+        cls(account_summaries, [], {}).write_output("account_summaries", file_path)
+
+        if ledger_path is not None:
+            merged_inputs = cls.__read_delta_ledger(ledger_path)
+            merged_inputs.update(cls.__delta_input_digest(delta_path) for delta_path in delta_paths)
+            merged_inputs.discard(None)
+            cls.__write_delta_ledger(ledger_path, merged_inputs)
+
+        if remove_deltas:
+            for delta_path in delta_paths:
+                os.remove(delta_path)
+
+        return len(account_summaries)
+
+    @classmethod
+    def delta_file_path(cls, delta_pattern: str, number: int, input_digest: str) -> str:
+        """Returns the path of a delta file, named by its number and the
+        content digest of the input it was produced from.
+
+        Args:
+            delta_pattern (str): Delta file path with a * in place of
+             the number.
+            number (int): Position of the delta, 1 for the first.
+            input_digest (str): Hex content digest of the input, see
+             RunCache.content_digest.
+
+        Returns:
+            str: The delta file path.
+        """
+
+        return delta_pattern.replace("*", f"{number:05d}-{input_digest[:cls.DELTA_DIGEST_LENGTH]}")
+
+    @classmethod
+    def check_delta_input(cls, input_digest: str, delta_paths: list, ledger_path: str) -> None:
+        """Refuses an input whose contents were already applied, either
+        by a delta file that is still pending or by the full file, which
+        the delta ledger records the inputs of, including those of the
+        deltas merged into it. Deltas hold absolute summaries that
+        carry on from every earlier delta, so applying the same input
+        again would count its transactions twice.
+
+        Args:
+            input_digest (str): Hex content digest of the input.
+            delta_paths (list): Delta files not compacted yet.
+            ledger_path (str): Delta ledger, skipped when it does not
+             exist yet.
+
+        Raises:
+            ValueError: When the input was already applied.
+        """
+
+        input_digest = input_digest[:cls.DELTA_DIGEST_LENGTH]
+
+        for delta_path in delta_paths:
+            if cls.__delta_input_digest(delta_path) == input_digest:
+                raise ValueError(f"The input was already applied by {delta_path}.")
+
+        if input_digest in cls.__read_delta_ledger(ledger_path):
+            raise ValueError(f"The input is already in the account summaries, see {ledger_path}.")
+
+    @classmethod
+    def reset_delta_ledger(cls, ledger_path: str, input_digests: list, delta_paths: list) -> None:
+        """Starts the delta ledger over once a full run has replaced the
+        account summaries file. The ledger then holds the inputs of the
+        new full file, so none of them is applied again by a delta, and
+        the pending delta files are removed, since their summaries carry
+        on from the replaced file.
+
+        Args:
+            ledger_path (str): Delta ledger, created when it does not
+             exist yet.
+            input_digests (list): Hex content digests of the inputs the
+             full file was built from.
+            delta_paths (list): Delta files not compacted yet.
+
+        Output:
+            files: Replaced the delta ledger and removed the delta files.
+        """
+
+        os.makedirs(path.dirname(path.abspath(ledger_path)), exist_ok=True)
+        cls.__write_delta_ledger(ledger_path, {input_digest[:cls.DELTA_DIGEST_LENGTH]
+                                               for input_digest in input_digests})
+
+        for delta_path in delta_paths:
+            os.remove(delta_path)
+
+    @classmethod
+    def __delta_input_digest(cls, delta_path: str) -> str:
+        """Returns the input digest in a delta file name, None for
+        delta files named without one."""
+
+        match = cls.DELTA_NAME_PATTERN.search(path.basename(delta_path))
+
+        return match.group(1) if match else None
+
+    @staticmethod
+    def __read_delta_ledger(ledger_path: str) -> set:
+        """Returns the input digests recorded in the delta ledger."""
+
+        if not path.isfile(ledger_path):
+            return set()
+
+        with open(ledger_path, "r") as ledger_file:
+            return set(json.load(ledger_file)["inputs"])
+
+    @staticmethod
+    def __write_delta_ledger(ledger_path: str, input_digests: set) -> None:
+        """Replaces the delta ledger atomically."""
+
+        directory, filename = path.split(path.abspath(ledger_path))
+        temp_path = path.join(directory, f".{filename}.{uuid4().hex}.tmp")
+
+        try:
+            with open(temp_path, "x") as ledger_file:
+                json.dump({"inputs": sorted(input_digests)}, ledger_file, indent=2)
+
+            os.replace(temp_path, ledger_path)
+        except BaseException:
+            if path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    @classmethod
+    def __read_records(cls, file_path: str) -> list:
+        """Returns the rows of an output file as dictionaries keyed by
+        column header."""
+
+        file_format = cls.get_output_format(file_path)
+
+        if file_format == ColumnarFile.FILE_EXTENSION:
+            with ColumnarFile(file_path) as columnar_file:
+                return columnar_file.to_records()
+
+        compression = cls.get_compression(file_path)
+        openers = {None: open, "gz": gzip.open, "bz2": bz2.open, "xz": lzma.open}
+
+        if compression == "zst":
+            if zstandard is None:
+                raise ValueError("Reading .zst files requires the zstandard package.")
+            input_file = io.TextIOWrapper(zstandard.open(file_path, "rb"), 
+                                          encoding="utf-8", newline="")
+        else:
+            input_file = openers[compression](file_path, "rt", encoding="utf-8", newline="")
+
+        with input_file:
+            if file_format == "csv":
+                return list(csv.DictReader(input_file))
+            elif file_format == "json":
+                return json.load(input_file)
+
+            return [json.loads(line) for line in input_file if line.strip()]
+
+    # write_all
+
+    def write_all(self, file_paths: dict, max_workers: int = None) -> None:
+        """Writes several output files at the same time, each from its
+        own thread, so that formatting one file overlaps with disk
+        writes of the others. The format of each file is selected by
+        its extension.
+
+        Args:
+            file_paths (dict): Destination of each file keyed by the
+             result it holds: "account_summaries", 
+             "suspicious_transactions", "transaction_statistics",
+             "distinct_accounts", "sampling_estimates",
+             "daily_balances" or "unmatched_transfers". Results
+             without a path are skipped.
+            max_workers (int, optional): Number of writer threads.
+             Defaults to one per file.
+
+        Raises:
+            KeyError: When a key does not name a result.
+            ValueError: When an extension is not a supported format.
+
+        Output:
+            files: Created a file for each given path.
+        """
+
+        self.__write_in_parallel(file_paths, None, max_workers)
+
+    def write_all_to_csv(self, file_paths: dict, max_workers: int = None) -> None:
+        """Writes several csv output files at the same time, see write_all.
+
+        Args:
+            file_paths (dict): Destination of each file keyed by the
+             result it holds.
+            max_workers (int, optional): Number of writer threads.
+             Defaults to one per file.
+
+        Raises:
+            KeyError: When a key does not name a result.
+
+        Output:
+            files (csv): Created a csv file for each given path.
+        """
+
+        self.__write_in_parallel(file_paths, "csv", max_workers)
+
+    def __write_in_parallel(self, file_paths: dict, file_format: str, max_workers: int) -> None:
+        """Runs write_output for each path on a thread pool and raises
+        the first error once every write has finished."""
+
+        for result_name in file_paths:
+            self.__result_rows(result_name)
+
+        if not file_paths:
+            return
+
+        with ThreadPoolExecutor(max_workers=max_workers or len(file_paths)) as executor:
+            futures = [executor.submit(self.write_output, result_name, file_path, file_format)
+                       for result_name, file_path in file_paths.items()]
+
+            # result() raises the error of a failed write.
+            for future in futures:
+                future.result()
 
     # 
     def filter_account_summaries(self, filter_field: str, filter_value: int, filter_mode: bool) -> list:
@@ -179,7 +1224,7 @@ class OutputHandler:
         fieldnames = filtered_data[0].keys()
 
         try:
-            with open(file_path, mode="w", newline="", encoding="utf-8") as file:
+            with self.__open_output(file_path) as file:
                 writer = csv.DictWriter(file, fieldnames=fieldnames)
                 writer.writeheader()
                 writer.writerows(filtered_data)
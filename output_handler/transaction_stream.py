@@ -0,0 +1,138 @@
+"""Contains a class titled TransactionStream, which appends transactions
+to a csv or ndjson file as soon as they are received, so that readers
+of the file see them while the run is still going."""
+
+import csv
+import json
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+class TransactionStream:
+    """Writes transactions to a file one at a time.
+
+    An instance can be passed to DataProcessor as its suspicious sink,
+    calling it writes one transaction. The file is flushed every
+    flush_every transactions, by default after each one, so alert
+    consumers reading the file see flags immediately. Unlike the
+    OutputHandler writers the file is written in place rather than
+    renamed when complete, since it is meant to be read while it grows.
+    """
+
+    STREAM_FORMATS = ["csv", "ndjson"]
+    """File extensions of the formats that can be streamed."""
+
+    def __init__(self, file_path: str, fields: list, flush_every: int = 1,
+                 append: bool = False):
+        """Opens the file and writes the csv header.
+
+        Args:
+            file_path (str): Destination file, its extension selects
+             csv or ndjson.
+            fields (list): Transaction keys written for each transaction,
+             also the csv header.
+            flush_every (int, optional): Transactions written between
+             flushes. Defaults to 1.
+            append (bool, optional): Add to the end of an existing
+             file instead of replacing it, the csv header is only
+             written to an empty file. Defaults to False.
+
+        Raises:
+            ValueError: When the extension is not a streamable format.
+        """
+
+        self.__file_format = file_path.split(".")[-1].lower()
+
+        if self.__file_format not in self.STREAM_FORMATS:
+            raise ValueError(f"Unsupported stream format: {file_path}")
+
+        self.__fields = list(fields)
+        self.__flush_every = max(1, flush_every)
+        self.__count = 0
+        self.__output_file = open(file_path, "a" if append else "w", newline="",
+                                  encoding="utf-8")
+
+        if self.__file_format == "csv":
+            self.__writer = csv.writer(self.__output_file)
+
+            if self.__output_file.tell() == 0:
+                self.__writer.writerow(self.__fields)
+                self.__output_file.flush()
+
+    @property
+    def count(self) -> int:
+        """Returns the number of transactions written so far."""
+
+        return self.__count
+
+    def __write_row(self, transaction: dict) -> None:
+        """Formats and writes one transaction without flushing."""
+
+        values = [transaction[field] for field in self.__fields]
+
+        if self.__file_format == "csv":
+            self.__writer.writerow(values)
+        else:
+            self.__output_file.write(json.dumps(dict(zip(self.__fields, values))) + "\n")
+
+    def write(self, transaction: dict) -> None:
+        """Writes one transaction.
+
+        Args:
+            transaction (dict): Transaction holding every stream field.
+        """
+
+        self.__write_row(transaction)
+        self.__count += 1
+
+        if self.__count % self.__flush_every == 0:
+            self.__output_file.flush()
+
+    def write_batch(self, transactions: list) -> None:
+        """Writes several transactions and flushes the file once.
+
+        Args:
+            transactions (list): Transactions holding every stream field.
+        """
+
+        for transaction in transactions:
+            self.__write_row(transaction)
+
+        self.__count += len(transactions)
+        self.__output_file.flush()
+
+    @property
+    def position(self) -> int:
+        """Flushes the file and returns its size, which can later be
+        passed to truncate."""
+
+        self.__output_file.flush()
+
+        return self.__output_file.tell()
+
+    def truncate(self, position: int) -> None:
+        """Drops everything written after position, for example the
+        rows written again when a run is resumed from a checkpoint.
+
+        Args:
+            position (int): A size returned by position.
+        """
+
+        self.__output_file.flush()
+        self.__output_file.truncate(position)
+        self.__output_file.seek(position)
+
+    def __call__(self, transaction: dict) -> None:
+        self.write(transaction)
+
+    def close(self) -> None:
+        """Flushes and closes the file."""
+
+        self.__output_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
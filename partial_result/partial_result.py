@@ -0,0 +1,321 @@
+"""Contains a class titled PartialResult, the aggregates DataProcessor
+built from part of a day's input, saved in a compact file so results
+from several processes or machines can be merged into one."""
+
+import base64
+import gzip
+import json
+import os
+import tempfile
+from os import path
+from hyperloglog.hyperloglog import HyperLogLog
+from run_cache.run_cache import RunCache
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+class PartialResult:
+    """Account summaries, transaction statistics, suspicious transactions
+    and distinct account sketches of a set of input files.
+
+    merge is associative and commutative: sums are added, sketches are
+    merged and suspicious transactions are kept sorted by date and
+    transaction ID, so partials can be combined in any grouping and
+    order. Sums are floats, so the result is exact for amounts in whole
+    cents below 2 ** 53 and otherwise equal up to rounding. Each partial
+    records the input files it was built from, identified by a digest
+    of their contents with their path kept as a label, and merging two
+    partials that share a file is refused, since its transactions would
+    be counted twice. A copy of a file under another path is therefore
+    still recognized as the same input.
+
+    Saved files are gzip compressed json, FILE_SUFFIX is the expected
+    extension.
+    """
+
+    FILE_FORMAT = "fdp-partial-result"
+    """Value of the "format" key of every saved partial result."""
+
+    FILE_VERSION = 2
+    """Version of the saved layout, files of another version are refused."""
+
+    FILE_SUFFIX = ".partial.json.gz"
+    """Extension of saved partial results."""
+
+    def __init__(self, account_summaries: dict = None,
+                       transaction_statistics: dict = None,
+                       suspicious_transactions: list = None,
+                       distinct_accounts: dict = None,
+                       sources: list = None):
+        """Initializes a partial result, empty by default.
+
+        Args:
+            account_summaries (dict, optional): Summaries keyed by
+             account number, as built by DataProcessor.
+            transaction_statistics (dict, optional): Totals and counts
+             keyed by transaction type.
+            suspicious_transactions (list, optional): Flagged
+             transactions.
+            distinct_accounts (dict, optional): HyperLogLog sketches
+             keyed by dimension and value.
+            sources (dict, optional): Input files the aggregates were
+             built from, labels keyed by source ID, see source_of. A
+             list of source IDs is also accepted, each its own label.
+        """
+
+        self.__account_summaries = account_summaries or {}
+        self.__transaction_statistics = transaction_statistics or {}
+        self.__suspicious_transactions = suspicious_transactions or []
+        self.__distinct_accounts = {dimension: sketches for dimension, sketches
+                                    in (distinct_accounts or {}).items() if sketches}
+        sources = sources if isinstance(sources, dict) else {source: source 
+                                                             for source in sources or []}
+        self.__sources = dict(sorted(sources.items()))
+
+    @classmethod
+    def from_state(cls, state: dict, sources: list = None) -> "PartialResult":
+        """Creates a partial result from DataProcessor.export_state.
+
+        Args:
+            state (dict): Aggregate state of a DataProcessor.
+            sources (dict, optional): Input files the state was built
+             from, labels keyed by source ID.
+
+        Returns:
+            PartialResult: The partial result.
+        """
+
+        return cls(state["account_summaries"],
+                   state["transaction_statistics"],
+                   state["suspicious_transactions"],
+                   state.get("distinct_accounts"),
+                   sources)
+
+    @staticmethod
+    def source_of(file_path: str) -> dict:
+        """Returns the source entry of an input file, its path keyed by
+        the sha256 digest of its contents.
+
+        Args:
+            file_path (str): Input file the aggregates are built from.
+
+        Raises:
+            FileNotFoundError: When the file does not exist.
+
+        Returns:
+            dict: One label keyed by source ID.
+        """
+
+        return {RunCache.content_digest(file_path): path.abspath(file_path)}
+
+    @property
+    def sources(self) -> list:
+        """Returns the IDs of the input files the aggregates were built from."""
+
+        return list(self.__sources)
+
+    @property
+    def source_labels(self) -> dict:
+        """Returns the path each input file was read from, keyed by source ID."""
+
+        return dict(self.__sources)
+
+    def to_state(self) -> dict:
+        """Returns the aggregates in the form of DataProcessor.export_state,
+        which can be passed to DataProcessor.restore_state or OutputHandler.
+
+        Returns:
+            dict: account summaries, suspicious transactions,
+             transaction statistics and distinct account sketches.
+        """
+
+        return {"account_summaries": self.__account_summaries,
+                "suspicious_transactions": self.__suspicious_transactions,
+                "transaction_statistics": self.__transaction_statistics,
+                "distinct_accounts": self.__distinct_accounts}
+
+    def merge(self, other: "PartialResult") -> "PartialResult":
+        """Returns the combination of two partial results, neither is
+        changed.
+
+        Args:
+            other (PartialResult): Aggregates of other input files.
+
+        Raises:
+            ValueError: When both were built from the same input file,
+             or distinct account sketches have different precisions.
+
+        Returns:
+            PartialResult: The merged result.
+        """
+
+        return self.merge_all([self, other])
+
+    @classmethod
+    def merge_all(cls, partial_results: list) -> "PartialResult":
+        """Merges any number of partial results into one accumulator,
+        which is sorted once at the end, none of them is changed.
+
+        Args:
+            partial_results (list): Partial results to combine.
+
+        Raises:
+            ValueError: When two of them were built from the same input
+             file, or distinct account sketches have different
+             precisions.
+
+        Returns:
+            PartialResult: The merged result, empty when none are given.
+        """
+
+        sources = {}
+        account_summaries = {}
+        transaction_statistics = {}
+        suspicious_transactions = []
+        distinct_accounts = {}
+
+        for partial_result in partial_results:
+            shared_sources = set(sources) & set(partial_result.__sources)
+
+            if shared_sources:
+                labels = sorted({sources[source] for source in shared_sources}
+                                | {partial_result.__sources[source] for source in shared_sources})
+                raise ValueError(f"Partial results share input files: {labels}")
+
+            sources.update(partial_result.__sources)
+
+            for account_number, summary in partial_result.__account_summaries.items():
+                total = account_summaries.get(account_number)
+
+                if total is None:
+                    account_summaries[account_number] = {
+                        "account_number": account_number,
+                        "balance": summary["balance"],
+                        "total_deposits": summary["total_deposits"],
+                        "total_withdrawals": summary["total_withdrawals"]
+                    }
+                else:
+                    total["balance"] += summary["balance"]
+                    total["total_deposits"] += summary["total_deposits"]
+                    total["total_withdrawals"] += summary["total_withdrawals"]
+
+            for transaction_type, statistics in partial_result.__transaction_statistics.items():
+                total = transaction_statistics.setdefault(transaction_type, 
+                                                          {"total_amount": 0,
+                                                           "transaction_count": 0})
+                total["total_amount"] += statistics["total_amount"]
+                total["transaction_count"] += statistics["transaction_count"]
+
+            suspicious_transactions.extend(partial_result.__suspicious_transactions)
+
+            for dimension, sketches in partial_result.__distinct_accounts.items():
+                merged_sketches = distinct_accounts.setdefault(dimension, {})
+
+                for value, sketch in sketches.items():
+                    if value in merged_sketches:
+                        merged_sketches[value].merge(sketch)
+                    else:
+                        merged_sketches[value] = HyperLogLog(sketch.precision, sketch.to_bytes())
+
+        suspicious_transactions.sort(key=lambda transaction: (
+            str(transaction.get("Date", "")),
+            cls.__sort_key(transaction.get("Transaction ID", "")),
+            cls.__sort_key(transaction.get("Account number", ""))))
+
+        return cls({account_number: account_summaries[account_number] for account_number
+                    in sorted(account_summaries, key=cls.__sort_key)},
+                   dict(sorted(transaction_statistics.items())),
+                   suspicious_transactions,
+                   {dimension: dict(sorted(distinct_accounts[dimension].items(),
+                                           key=lambda item: str(item[0])))
+                    for dimension in sorted(distinct_accounts)},
+                   sources)
+
+    @staticmethod
+    def __sort_key(value) -> tuple:
+        """Orders numeric strings by value and others after them."""
+
+        value = str(value)
+
+        if value.isdigit():
+            return (0, int(value), "")
+
+        return (1, 0, value)
+
+    def save(self, file_path: str) -> None:
+        """Writes the partial result to a gzip compressed json file,
+        through a temporary file that replaces file_path once complete,
+        so a crash never leaves a truncated partial to be merged.
+
+        Args:
+            file_path (str): Destination, normally ending in FILE_SUFFIX.
+        """
+
+        data = {"format": self.FILE_FORMAT,
+                "version": self.FILE_VERSION,
+                "sources": self.__sources,
+                "account_summaries": [[summary["account_number"],
+                                       summary["balance"],
+                                       summary["total_deposits"],
+                                       summary["total_withdrawals"]]
+                                      for summary in self.__account_summaries.values()],
+                "transaction_statistics": self.__transaction_statistics,
+                "suspicious_transactions": self.__suspicious_transactions,
+                "distinct_accounts": {dimension: [[value, sketch.precision,
+                                                   base64.b64encode(sketch.to_bytes()).decode()]
+                                                  for value, sketch in sketches.items()]
+                                      for dimension, sketches in self.__distinct_accounts.items()}}
+
+        directory, filename = path.split(path.abspath(file_path))
+        file_descriptor, temp_path = tempfile.mkstemp(prefix=f".{filename}.",
+                                                      suffix=".tmp",
+                                                      dir=directory)
+
+        try:
+            with os.fdopen(file_descriptor, "wb") as raw_file:
+                with gzip.open(raw_file, "wt", encoding="utf-8") as partial_file:
+                    json.dump(data, partial_file, separators=(",", ":"))
+
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    @classmethod
+    def load(cls, file_path: str) -> "PartialResult":
+        """Reads a partial result written by save.
+
+        Args:
+            file_path (str): Path of the saved partial result.
+
+        Raises:
+            ValueError: When the file is not a partial result of this version.
+
+        Returns:
+            PartialResult: The loaded partial result.
+        """
+
+        with gzip.open(file_path, "rt", encoding="utf-8") as partial_file:
+            data = json.load(partial_file)
+
+        if data.get("format") != cls.FILE_FORMAT or data.get("version") != cls.FILE_VERSION:
+            raise ValueError(f"{file_path} is not a version {cls.FILE_VERSION} partial result.")
+
+        account_summaries = {account_number: {"account_number": account_number,
+                                              "balance": balance,
+                                              "total_deposits": total_deposits,
+                                              "total_withdrawals": total_withdrawals}
+                             for account_number, balance, total_deposits, total_withdrawals
+                             in data["account_summaries"]}
+
+        distinct_accounts = {dimension: {value: HyperLogLog(precision, base64.b64decode(registers))
+                                         for value, precision, registers in sketches}
+                             for dimension, sketches in data["distinct_accounts"].items()}
+
+        return cls(account_summaries,
+                   data["transaction_statistics"],
+                   data["suspicious_transactions"],
+                   distinct_accounts,
+                   data["sources"])
@@ -0,0 +1,168 @@
+"""Contains a class titled AsyncPipeline, which runs reading,
+validation, processing and writing as overlapping asyncio stages
+connected by bounded queues."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from input_handler.input_handler import InputHandler
+from data_processor.data_processor import DataProcessor
+from output_handler.output_handler import OutputHandler
+from metrics.metrics import MetricsRegistry
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+class AsyncPipeline:
+    """Runs the InputHandler, DataProcessor and OutputHandler steps as
+    a staged pipeline.
+
+    The reader, validator, processor and writer stages each run as a
+    coroutine and hand batches to the next stage through a bounded
+    asyncio.Queue. A full queue suspends the stage feeding it, so a
+    slow stage applies backpressure instead of letting batches pile up
+    in memory. Blocking file I/O and batch processing run in executor
+    threads, so the stages overlap and the total run time approaches
+    that of the slowest stage.
+    """
+
+    BATCH_SIZE = 10000
+    """Number of transactions passed between stages at a time."""
+
+    QUEUE_SIZE = 4
+    """Maximum number of batches waiting between two stages."""
+
+    def __init__(self, input_handler: InputHandler,
+                       data_processor: DataProcessor,
+                       file_paths: dict,
+                       batch_size: int = BATCH_SIZE,
+                       queue_size: int = QUEUE_SIZE,
+                       metrics: MetricsRegistry = None):
+        """Initializes the pipeline.
+
+        Args:
+            input_handler (InputHandler): Reads the input file.
+            data_processor (DataProcessor): Receives each validated
+             batch, normally created with an empty transaction list.
+            file_paths (dict): Output paths keyed by "account_summaries",
+             "suspicious_transactions" and "transaction_statistics".
+            batch_size (int, optional): Transactions per batch.
+            queue_size (int, optional): Batches buffered between stages.
+            metrics (MetricsRegistry, optional): Registry the output
+             files written are reported to.
+        """
+
+        self.__input_handler = input_handler
+        self.__data_processor = data_processor
+        self.__file_paths = file_paths
+        self.__batch_size = batch_size
+        self.__queue_size = queue_size
+        self.__metrics = metrics
+
+    def run(self) -> dict:
+        """Runs the pipeline to completion from synchronous code.
+
+        Returns:
+            dict: The DataProcessor results, as returned by
+             DataProcessor.process_data.
+        """
+
+        return asyncio.run(self.run_async())
+
+    async def run_async(self) -> dict:
+        """Runs all stages concurrently and waits for them to finish.
+        If any stage fails the others are cancelled and the error is
+        raised.
+
+        Returns:
+            dict: The DataProcessor results, as returned by
+             DataProcessor.process_data.
+        """
+
+        raw_batches = asyncio.Queue(self.__queue_size)
+        valid_batches = asyncio.Queue(self.__queue_size)
+        flagged_batches = asyncio.Queue(self.__queue_size)
+
+        # Processing runs on its own single thread so batches are
+        # applied to the DataProcessor strictly in order.
+        with ThreadPoolExecutor(max_workers=2) as io_executor, \
+             ThreadPoolExecutor(max_workers=1) as process_executor:
+            tasks = [asyncio.create_task(self.__read(raw_batches, io_executor)),
+                     asyncio.create_task(self.__validate(raw_batches, valid_batches)),
+                     asyncio.create_task(self.__process(valid_batches, flagged_batches,
+                                                        process_executor)),
+                     asyncio.create_task(self.__write(flagged_batches, io_executor))]
+
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+
+        return self.__data_processor.export_state()
+
+    async def __read(self, output_queue: asyncio.Queue, executor) -> None:
+        """Reader stage, pulls raw batches from the input file."""
+
+        loop = asyncio.get_running_loop()
+        batches = self.__input_handler.read_input_batches(self.__batch_size)
+
+        while True:
+            batch = await loop.run_in_executor(executor, next, batches, None)
+            if batch is None:
+                break
+            await output_queue.put(batch)
+
+        await output_queue.put(None)
+
+    async def __validate(self, input_queue: asyncio.Queue,
+                               output_queue: asyncio.Queue) -> None:
+        """Validator stage, drops invalid transactions from each batch."""
+
+        loop = asyncio.get_running_loop()
+
+        while (batch := await input_queue.get()) is not None:
+            valid = await loop.run_in_executor(None, self.__input_handler.validate_batch, batch)
+            await output_queue.put(valid)
+
+        await output_queue.put(None)
+
+    async def __process(self, input_queue: asyncio.Queue,
+                              output_queue: asyncio.Queue, executor) -> None:
+        """Processor stage, applies batches to the DataProcessor and
+        forwards the transactions it flagged as suspicious."""
+
+        loop = asyncio.get_running_loop()
+        suspicious_transactions = self.__data_processor.suspicious_transactions
+
+        while (batch := await input_queue.get()) is not None:
+            flagged_before = len(suspicious_transactions)
+            await loop.run_in_executor(executor, self.__data_processor.process_batch, batch)
+            await output_queue.put(suspicious_transactions[flagged_before:])
+
+        await output_queue.put(None)
+
+    async def __write(self, input_queue: asyncio.Queue, executor) -> None:
+        """Writer stage, streams suspicious transactions to their file
+        while processing runs, then writes the summaries and statistics
+        files side by side once every batch has been processed."""
+
+        loop = asyncio.get_running_loop()
+
+        with OutputHandler.open_suspicious_transactions_stream(
+                self.__file_paths["suspicious_transactions"]) as stream:
+            while (batch := await input_queue.get()) is not None:
+                await loop.run_in_executor(executor, stream.write_batch, batch)
+
+        output_handler = OutputHandler(self.__data_processor.account_summaries,
+                                       self.__data_processor.suspicious_transactions,
+                                       self.__data_processor.transaction_statistics,
+                                       metrics=self.__metrics)
+
+        await asyncio.gather(
+            loop.run_in_executor(executor, output_handler.write_account_summaries_to_csv,
+                                 self.__file_paths["account_summaries"]),
+            loop.run_in_executor(executor, output_handler.write_transaction_statistics_to_csv,
+                                 self.__file_paths["transaction_statistics"]))
@@ -0,0 +1,201 @@
+"""Contains a class titled RunCache, which fingerprints the input files
+and configuration of a run so that a run seeing the same input and
+configuration as the previous one can reuse its output files."""
+
+import hashlib
+import json
+import os
+import tempfile
+from os import path
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+class RunCache:
+    """Remembers the fingerprint each stage of a run was produced from.
+
+    A fingerprint is a sha256 digest of the contents of the input files
+    and of the stage configuration. Input digests are reused while a
+    file keeps the size and modification time it had when it was last
+    hashed, so an unchanged input is not read again. Each stage also
+    records the size and modification time of its output files, so the
+    stage is run again when an output was removed or edited.
+    """
+
+    CACHE_VERSION = 1
+    """Version of the cache file layout, caches of another version are ignored."""
+
+    READ_SIZE = 1 << 20
+    """Number of bytes hashed at a time."""
+
+    def __init__(self, cache_path: str):
+        """Loads the cache file when it exists.
+
+        Args:
+            cache_path (str): json file the cache is kept in.
+        """
+
+        self.__cache_path = cache_path
+        self.__inputs = {}
+        self.__stages = {}
+
+        if path.isfile(cache_path):
+            with open(cache_path, "r") as cache_file:
+                data = json.load(cache_file)
+
+            if data.get("version") == self.CACHE_VERSION:
+                self.__inputs = data["inputs"]
+                self.__stages = data["stages"]
+
+    @property
+    def cache_path(self) -> str:
+        """Accessor for the path of the cache file."""
+
+        return self.__cache_path
+
+    def fingerprint(self, input_paths: list, configuration: dict) -> str:
+        """Returns the fingerprint of input files and a configuration.
+
+        Args:
+            input_paths (list): Files the stage reads.
+            configuration (dict): Settings the stage output depends on,
+             any json serializable values.
+
+        Raises:
+            FileNotFoundError: When an input file does not exist.
+
+        Returns:
+            str: Hex sha256 digest.
+        """
+
+        digest = hashlib.sha256()
+
+        for input_path in input_paths:
+            digest.update(self.__file_digest(input_path).encode())
+
+        digest.update(json.dumps(configuration, sort_keys=True, default=str).encode())
+
+        return digest.hexdigest()
+
+    def __file_digest(self, file_path: str) -> str:
+        """Returns the sha256 digest of a file's contents, reusing the
+        cached digest while the file's size and mtime are unchanged."""
+
+        status = os.stat(file_path)
+        key = path.abspath(file_path)
+        cached = self.__inputs.get(key)
+
+        if (cached and cached["size"] == status.st_size 
+                and cached["mtime_ns"] == status.st_mtime_ns):
+            return cached["sha256"]
+
+        digest = self.content_digest(file_path)
+
+        self.__inputs[key] = {"size": status.st_size,
+                              "mtime_ns": status.st_mtime_ns,
+                              "sha256": digest}
+
+        return digest
+
+    @classmethod
+    def content_digest(cls, file_path: str) -> str:
+        """Returns the sha256 digest of a file's contents, read
+        READ_SIZE bytes at a time, so that files are identified by what
+        they hold rather than by where they are.
+
+        Args:
+            file_path (str): File to hash.
+
+        Raises:
+            FileNotFoundError: When the file does not exist.
+
+        Returns:
+            str: Hex sha256 digest.
+        """
+
+        digest = hashlib.sha256()
+
+        with open(file_path, "rb") as input_file:
+            while chunk := input_file.read(cls.READ_SIZE):
+                digest.update(chunk)
+
+        return digest.hexdigest()
+
+    def is_current(self, stage: str, fingerprint: str, output_paths: list) -> bool:
+        """Checks whether a stage can be skipped.
+
+        Args:
+            stage (str): Name of the stage.
+            fingerprint (str): Fingerprint of the stage's inputs and
+             configuration for this run.
+            output_paths (list): Files the stage writes.
+
+        Returns:
+            bool: True when the stage was recorded with the same
+             fingerprint and output files, and none of the outputs
+             changed since.
+        """
+
+        entry = self.__stages.get(stage)
+
+        if entry is None or entry["fingerprint"] != fingerprint:
+            return False
+
+        if sorted(entry["outputs"]) != sorted(path.abspath(output_path) 
+                                              for output_path in output_paths):
+            return False
+
+        for output_path, recorded in entry["outputs"].items():
+            if not path.isfile(output_path):
+                return False
+
+            status = os.stat(output_path)
+
+            if status.st_size != recorded["size"] or status.st_mtime_ns != recorded["mtime_ns"]:
+                return False
+
+        return True
+
+    def record(self, stage: str, fingerprint: str, output_paths: list) -> None:
+        """Records that a stage wrote its outputs from a fingerprint
+        and saves the cache file.
+
+        Args:
+            stage (str): Name of the stage.
+            fingerprint (str): Fingerprint the outputs were produced from.
+            output_paths (list): Files the stage wrote.
+
+        Raises:
+            FileNotFoundError: When an output file does not exist.
+        """
+
+        outputs = {}
+
+        for output_path in output_paths:
+            status = os.stat(output_path)
+            outputs[path.abspath(output_path)] = {"size": status.st_size,
+                                                  "mtime_ns": status.st_mtime_ns}
+
+        self.__stages[stage] = {"fingerprint": fingerprint, "outputs": outputs}
+        self.save()
+
+    def save(self) -> None:
+        """Writes the cache file, replacing it atomically."""
+
+        directory, filename = path.split(path.abspath(self.__cache_path))
+        file_descriptor, temp_path = tempfile.mkstemp(prefix=f".{filename}.",
+                                                      suffix=".tmp",
+                                                      dir=directory)
+
+        try:
+            with os.fdopen(file_descriptor, "w") as cache_file:
+                json.dump({"version": self.CACHE_VERSION,
+                           "inputs": self.__inputs,
+                           "stages": self.__stages}, cache_file, indent=2)
+
+            os.replace(temp_path, self.__cache_path)
+        except BaseException:
+            if path.exists(temp_path):
+                os.remove(temp_path)
+            raise
@@ -0,0 +1,351 @@
+"""Contains a class titled TransactionSampler, which keeps a random
+sample of the input rows while they are read and estimates the
+transaction statistics of all rows, with confidence intervals, from
+the sample."""
+
+import math
+import random
+from statistics import NormalDist
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+class Reservoir:
+    """Keeps a uniform random sample of up to size items from a stream
+    of unknown length.
+
+    Items are added with Algorithm L, which draws how many items to
+    pass over before the next replacement instead of a random number
+    for every item, so adding an item that is not kept costs one
+    comparison.
+
+    Citations:
+        Li, K.-H. (1994). Reservoir-sampling algorithms of time complexity O(n(1 + log(N/n))). ACM Transactions on Mathematical Software, 20(4), 481-493.
+    """
+
+    def __init__(self, size: int, random_generator: random.Random = None):
+        """Initializes an empty reservoir.
+
+        Args:
+            size (int): Maximum number of items kept.
+            random_generator (random.Random, optional): Source of
+             random numbers. Defaults to a new unseeded generator.
+        """
+
+        self.__size = size
+        self.__random = random_generator or random.Random()
+        self.__items = []
+        self.__seen = 0
+        self.__weight = 1.0
+        self.__next = 0
+
+    @property
+    def items(self) -> list:
+        """Accessor for the items kept, in no particular order."""
+
+        return self.__items
+
+    @property
+    def seen(self) -> int:
+        """Accessor for the number of items added so far."""
+
+        return self.__seen
+
+    def add(self, item) -> None:
+        """Adds an item, it is kept with probability size / seen."""
+
+        self.__seen += 1
+
+        if len(self.__items) < self.__size:
+            self.__items.append(item)
+
+            if len(self.__items) == self.__size:
+                self.__draw_next()
+        elif self.__seen == self.__next:
+            self.__items[self.__random.randrange(self.__size)] = item
+            self.__draw_next()
+
+    def __draw_next(self) -> None:
+        """Draws the position of the next item to keep."""
+
+        # 1 - random() is never 0, so the logarithms are defined.
+        self.__weight *= math.exp(math.log(1 - self.__random.random()) / self.__size)
+        self.__next = self.__seen + 1 + math.floor(math.log(1 - self.__random.random())
+                                                   / math.log1p(-self.__weight))
+
+class TransactionSampler:
+    """Samples input rows and scales the statistics of the sample up to
+    estimates for every row.
+
+    Methods:
+        bernoulli  keeps each row with probability rate, the sample
+                   size varies around rate times the number of rows.
+        reservoir  keeps a uniform sample of exactly size rows, or of
+                   size rows of each stratum when stratify_by is set,
+                   so rare accounts or transaction types are covered.
+
+    Rows are sampled before they are validated, so that rows which are
+    not sampled are never parsed. Sampled rows that fail validation
+    count as rows of no transaction type, which keeps the estimates
+    unbiased. Bernoulli samples are scaled by 1 / rate and reservoir
+    samples by the number of rows of each stratum over the number
+    sampled from it. Intervals use the normal approximation, so they
+    are only reliable when each transaction type has at least a few
+    dozen sampled rows.
+    """
+
+    SAMPLING_METHODS = ["bernoulli", "reservoir"]
+    """Supported sampling methods."""
+
+    STRATIFY_FIELDS = {"account": "Account number",
+                       "transaction_type": "Transaction type"}
+    """Strata reservoir samples can be drawn from, mapped to the
+    transaction field holding the stratum."""
+
+    STATISTICS = ["total_amount", "transaction_count"]
+    """Transaction statistics that are estimated."""
+
+    def __init__(self, method: str = "bernoulli",
+                       rate: float = 0.01,
+                       size: int = 10000,
+                       stratify_by: str = None,
+                       seed: int = None):
+        """Initializes the sampler.
+
+        Args:
+            method (str, optional): One of SAMPLING_METHODS. Defaults
+             to "bernoulli".
+            rate (float, optional): Share of rows a bernoulli sample
+             keeps. Defaults to 0.01.
+            size (int, optional): Rows a reservoir sample keeps, per
+             stratum when stratified. Defaults to 10000.
+            stratify_by (str, optional): A key of STRATIFY_FIELDS,
+             reservoir samples only. Defaults to None.
+            seed (int, optional): Seed of the random numbers, for
+             repeatable samples. Defaults to None.
+
+        Raises:
+            ValueError: When an argument is out of range or unknown.
+        """
+
+        if method not in self.SAMPLING_METHODS:
+            raise ValueError(f"Unknown sampling method: {method}")
+
+        if not 0 < rate <= 1:
+            raise ValueError(f"Sampling rate must be above 0 and at most 1, got {rate}.")
+
+        # Two rows per stratum are needed to estimate its variance.
+        if size < 2:
+            raise ValueError(f"Sample size must be at least 2, got {size}.")
+
+        if stratify_by is not None and stratify_by not in self.STRATIFY_FIELDS:
+            raise ValueError(f"Unknown stratum: {stratify_by}")
+
+        if stratify_by is not None and method != "reservoir":
+            raise ValueError("Only reservoir samples can be stratified.")
+
+        self.__method = method
+        self.__rate = rate
+        self.__size = size
+        self.__stratify_field = self.STRATIFY_FIELDS.get(stratify_by)
+        self.__random = random.Random(seed)
+        self.__population_sizes = {}
+        self.__sample_sizes = {}
+
+    @property
+    def method(self) -> str:
+        """Accessor for the sampling method."""
+
+        return self.__method
+
+    @property
+    def stratify_field(self) -> str:
+        """Accessor for the transaction field rows are stratified by,
+        None when the sample is not stratified. Rows must be passed to
+        sample as dictionaries when it is set."""
+
+        return self.__stratify_field
+
+    @property
+    def population_size(self) -> int:
+        """Accessor for the number of rows sampled from."""
+
+        return sum(self.__population_sizes.values())
+
+    @property
+    def sample_size(self) -> int:
+        """Accessor for the number of rows kept."""
+
+        return sum(self.__sample_sizes.values())
+
+    def sample(self, rows) -> list:
+        """Draws a sample from rows, reading them once. Each call draws
+        a new sample, which estimate_statistics then refers to.
+
+        Args:
+            rows (iterable): Rows to sample from, raw csv lines or
+             transactions. Transactions are needed when stratified.
+
+        Returns:
+            list: The sampled rows, in input order for bernoulli
+             samples and in no particular order for reservoir samples.
+        """
+
+        if self.__method == "bernoulli":
+            return self.__sample_bernoulli(rows)
+
+        return self.__sample_reservoir(rows)
+
+    def __sample_bernoulli(self, rows) -> list:
+        """Keeps each row with probability rate."""
+
+        rate = self.__rate
+        draw = self.__random.random
+        population_size = 0
+        sampled_rows = []
+
+        for row in rows:
+            population_size += 1
+
+            if draw() < rate:
+                sampled_rows.append(row)
+
+        self.__population_sizes = {None: population_size}
+        self.__sample_sizes = {None: len(sampled_rows)}
+
+        return sampled_rows
+
+    def __sample_reservoir(self, rows) -> list:
+        """Keeps size rows of each stratum."""
+
+        field = self.__stratify_field
+        reservoirs = {}
+
+        for row in rows:
+            stratum = row.get(field) if field is not None else None
+            reservoir = reservoirs.get(stratum)
+
+            if reservoir is None:
+                reservoir = reservoirs[stratum] = Reservoir(self.__size, self.__random)
+
+            reservoir.add(row)
+
+        self.__population_sizes = {}
+        self.__sample_sizes = {}
+        sampled_rows = []
+
+        for stratum, reservoir in reservoirs.items():
+            self.__population_sizes[stratum] = reservoir.seen
+            self.__sample_sizes[stratum] = len(reservoir.items)
+            sampled_rows.extend(reservoir.items)
+
+        return sampled_rows
+
+    def estimate_statistics(self, transactions: list, confidence: float = 0.95) -> dict:
+        """Estimates the transaction statistics of every row sampled
+        from.
+
+        Args:
+            transactions (list): The sampled rows that passed
+             validation.
+            confidence (float, optional): Confidence level of the
+             intervals. Defaults to 0.95.
+
+        Raises:
+            ValueError: When confidence is not between 0 and 1.
+
+        Returns:
+            dict: For each transaction type and each of STATISTICS, a
+             dictionary of the "estimate" and its "lower" and "upper"
+             bounds.
+        """
+
+        if not 0 < confidence < 1:
+            raise ValueError(f"Confidence must be between 0 and 1, got {confidence}.")
+
+        # Sums and sums of squares of each statistic per transaction
+        # type and stratum, rows of other types add zeros.
+        sums = {}
+        field = self.__stratify_field
+
+        for transaction in transactions:
+            stratum = transaction.get(field) if field is not None else None
+            amount = float(transaction["Amount"])
+            strata = sums.setdefault(transaction["Transaction type"], {})
+            stratum_sums = strata.setdefault(stratum, [0.0, 0.0, 0])
+            stratum_sums[0] += amount
+            stratum_sums[1] += amount * amount
+            stratum_sums[2] += 1
+
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        estimates = {}
+
+        for transaction_type, strata in sums.items():
+            estimates[transaction_type] = {}
+
+            for statistic in self.STATISTICS:
+                estimate = 0.0
+                variance = 0.0
+
+                for stratum, (amount_sum, amount_square_sum, count) in strata.items():
+                    if statistic == "total_amount":
+                        total, square_total = amount_sum, amount_square_sum
+                    else:
+                        total, square_total = count, count
+
+                    stratum_estimate, stratum_variance = self.__estimate_total(
+                        stratum, total, square_total)
+                    estimate += stratum_estimate
+                    variance += stratum_variance
+
+                margin = z * math.sqrt(variance)
+                estimates[transaction_type][statistic] = {"estimate": estimate,
+                                                          "lower": max(estimate - margin, 0.0),
+                                                          "upper": estimate + margin}
+
+        return estimates
+
+    def __estimate_total(self, stratum, total: float, square_total: float) -> tuple:
+        """Scales the sum of a value over the sample of a stratum.
+
+        Returns:
+            tuple: The estimated total of the stratum and its variance.
+        """
+
+        if self.__method == "bernoulli":
+            # Horvitz-Thompson estimator with inclusion probability rate.
+            rate = self.__rate
+            return total / rate, (1 - rate) * square_total / (rate * rate)
+
+        population_size = self.__population_sizes[stratum]
+        sample_size = self.__sample_sizes[stratum]
+
+        if sample_size == population_size:
+            return total, 0.0
+
+        # Simple random sample without replacement, the other rows
+        # of the stratum hold zeros for this value.
+        mean = total / sample_size
+        sample_variance = (square_total - total * mean) / (sample_size - 1)
+        variance = (population_size * population_size * (1 - sample_size / population_size)
+                    * max(sample_variance, 0.0) / sample_size)
+
+        return population_size * mean, variance
+
+    @staticmethod
+    def to_transaction_statistics(estimates: dict) -> dict:
+        """Converts estimates into the layout of
+        DataProcessor.transaction_statistics, counts are rounded.
+
+        Args:
+            estimates (dict): Returned by estimate_statistics.
+
+        Returns:
+            dict: Estimated total amount and transaction count keyed
+             by transaction type.
+        """
+
+        return {transaction_type: {"total_amount": statistics["total_amount"]["estimate"],
+                                   "transaction_count": round(statistics["transaction_count"]["estimate"])}
+                for transaction_type, statistics in estimates.items()}
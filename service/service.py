@@ -0,0 +1,299 @@
+"""Contains a class titled TransactionService, which keeps a warm
+DataProcessor in memory and serves batch ingestion and queries over a
+local HTTP endpoint, on a TCP port or a Unix socket."""
+
+import json
+import os
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from data_processor.data_processor import DataProcessor
+from data_processor.result_query import ResultQuery
+from input_handler.input_handler import InputHandler
+from output_handler.output_handler import OutputHandler
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+class TransactionService:
+    """Applies transaction batches to one DataProcessor and answers
+    queries from its in-memory state.
+
+    Batches are validated under a lock of their own, which keeps the
+    reject counts and the rejects sink consistent between concurrent
+    requests without holding up queries. They are then applied in
+    chunks of CHUNK_SIZE transactions, each under the state lock, so
+    queries arriving during a large batch wait for one chunk at most
+    rather than the whole batch. Query results are copied under the
+    state lock, so they never show a half applied chunk.
+    Derived metrics come from a ResultQuery, so they are computed once
+    per ingested batch however often dashboards ask for them.
+
+    Endpoints:
+        POST /transactions            json array of transactions
+        GET  /accounts/<number>       one account summary
+        GET  /accounts/<number>/metrics
+                                      average deposit, average
+                                      withdrawal and their ratio
+        GET  /accounts?field=&value=&above=
+                                      filtered account summaries
+        GET  /statistics              transaction statistics
+        GET  /averages                average amount per type
+        GET  /currencies              totals per currency
+        GET  /suspicious?limit=       the latest suspicious transactions
+        GET  /health                  accounts and suspicious counts
+    """
+
+    CHUNK_SIZE = 10000
+    """Transactions applied per lock hold while ingesting a batch."""
+
+    FILTER_FIELDS = ["balance", "total_deposits", "total_withdrawals"]
+    """Account summary fields accounts can be filtered by."""
+
+    def __init__(self, data_processor: DataProcessor, input_handler: InputHandler):
+        """Initializes the service.
+
+        Args:
+            data_processor (DataProcessor): Holds the aggregate state,
+             it may already have processed transactions.
+            input_handler (InputHandler): Validates incoming batches.
+        """
+
+        self.__data_processor = data_processor
+        self.__input_handler = input_handler
+        self.__query = ResultQuery(data_processor)
+        self.__lock = threading.Lock()
+        self.__validation_lock = threading.Lock()
+
+    @property
+    def data_processor(self) -> DataProcessor:
+        """Accessor for the DataProcessor holding the state."""
+
+        return self.__data_processor
+
+    def ingest(self, transactions: list) -> dict:
+        """Validates and applies a batch of transactions. Field values
+        are converted to strings first, as read from the input file, so
+        an account number sent as a json number is stored under the
+        same key the account is looked up by.
+
+        Args:
+            transactions (list): Transactions in the input file layout.
+
+        Returns:
+            dict: Numbers of accepted, rejected and flagged transactions.
+        """
+
+        transactions = [{field: value if value is None or isinstance(value, str) else str(value)
+                         for field, value in transaction.items()}
+                        for transaction in transactions]
+
+        with self.__validation_lock:
+            valid = self.__input_handler.validate_batch(transactions)
+        flagged = 0
+
+        for start in range(0, len(valid), self.CHUNK_SIZE):
+            with self.__lock:
+                flagged_before = self.__data_processor.suspicious_transaction_count
+                self.__data_processor.process_batch(valid[start:start + self.CHUNK_SIZE])
+                flagged += self.__data_processor.suspicious_transaction_count - flagged_before
+
+        return {"accepted": len(valid),
+                "rejected": len(transactions) - len(valid),
+                "flagged": flagged}
+
+    def get_account(self, account_number: str) -> dict:
+        """Returns a copy of one account summary, or None when the
+        account has no transactions."""
+
+        with self.__lock:
+            summary = self.__data_processor.account_summaries.get(account_number)
+            return dict(summary) if summary is not None else None
+
+    def filter_accounts(self, filter_field: str, filter_value: float, filter_mode: bool) -> list:
+        """Returns copies of the account summaries selected the same way
+        as OutputHandler.filter_account_summaries.
+
+        Raises:
+            ValueError: When filter_field is not one of FILTER_FIELDS.
+        """
+
+        if filter_field not in self.FILTER_FIELDS:
+            raise ValueError(f"Unknown filter field: {filter_field}")
+
+        with self.__lock:
+            output_handler = OutputHandler(self.__data_processor.account_summaries, [], {})
+            filtered = output_handler.filter_account_summaries(filter_field, filter_value,
+                                                               filter_mode)
+            return [dict(summary) for summary in filtered]
+
+    def get_statistics(self) -> dict:
+        """Returns a copy of the transaction statistics."""
+
+        with self.__lock:
+            return {transaction_type: dict(statistics) for transaction_type, statistics
+                    in self.__data_processor.transaction_statistics.items()}
+
+    def get_averages(self) -> dict:
+        """Returns the average amount of each transaction type."""
+
+        with self.__lock:
+            return dict(self.__query.average_transaction_amounts)
+
+    def get_account_metrics(self, account_number: str) -> dict:
+        """Returns a copy of the derived metrics of one account, or None
+        when the account has no transactions."""
+
+        with self.__lock:
+            metrics = self.__query.get_account_metrics(account_number)
+            return dict(metrics) if metrics is not None else None
+
+    def get_currency_totals(self) -> dict:
+        """Returns a copy of the totals of each currency."""
+
+        with self.__lock:
+            return {currency: dict(totals) for currency, totals
+                    in self.__query.currency_totals.items()}
+
+    def get_suspicious_transactions(self, limit: int = 100) -> list:
+        """Returns the latest suspicious transactions, newest last."""
+
+        with self.__lock:
+            suspicious_transactions = self.__data_processor.suspicious_transactions
+            return list(suspicious_transactions[-limit:]) if limit > 0 else []
+
+    def get_health(self) -> dict:
+        """Returns the number of accounts and suspicious transactions."""
+
+        with self.__lock:
+            return {"accounts": len(self.__data_processor.account_summaries),
+                    "suspicious_transactions": self.__data_processor.suspicious_transaction_count}
+
+    def create_server(self, host: str = "127.0.0.1", port: int = 8080,
+                      socket_path: str = None) -> socketserver.BaseServer:
+        """Creates a threaded HTTP server for the service, each request
+        is handled on its own thread.
+
+        Args:
+            host (str, optional): Address to listen on. Defaults to the
+             loopback address, so only local clients can connect.
+            port (int, optional): TCP port, 0 picks a free one.
+             Defaults to 8080.
+            socket_path (str, optional): Listen on this Unix socket
+             instead of a TCP port.
+
+        Returns:
+            socketserver.BaseServer: The server, call serve_forever to
+             start it.
+        """
+
+        if socket_path is not None:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+
+            server = ThreadingUnixHTTPServer(socket_path, ServiceRequestHandler)
+        else:
+            server = ThreadingHTTPServer((host, port), ServiceRequestHandler)
+
+        server.service = self
+
+        return server
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    """Serves HTTP requests on a Unix socket, one thread per request."""
+
+    daemon_threads = True
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """Maps HTTP requests to TransactionService calls and answers in json."""
+
+    def address_string(self) -> str:
+        # Unix socket clients have no address.
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format: str, *args) -> None:
+        # One line per request would flood the terminal at batch rates.
+        pass
+
+    def do_GET(self) -> None:
+        service = self.server.service
+        url = urlsplit(self.path)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+
+        try:
+            if parts == ["health"]:
+                self.__send(200, service.get_health())
+            elif parts == ["statistics"]:
+                self.__send(200, service.get_statistics())
+            elif parts == ["averages"]:
+                self.__send(200, service.get_averages())
+            elif parts == ["currencies"]:
+                self.__send(200, service.get_currency_totals())
+            elif parts == ["suspicious"]:
+                self.__send(200, service.get_suspicious_transactions(int(query.get("limit", 100))))
+            elif parts == ["accounts"]:
+                self.__send(200, service.filter_accounts(
+                    query.get("field", "balance"),
+                    float(query.get("value", 0)),
+                    query.get("above", "false").lower() in ("1", "true", "yes")))
+            elif len(parts) == 2 and parts[0] == "accounts":
+                summary = service.get_account(parts[1])
+
+                if summary is None:
+                    self.__send(404, {"error": f"Unknown account: {parts[1]}"})
+                else:
+                    self.__send(200, summary)
+            elif len(parts) == 3 and parts[0] == "accounts" and parts[2] == "metrics":
+                metrics = service.get_account_metrics(parts[1])
+
+                if metrics is None:
+                    self.__send(404, {"error": f"Unknown account: {parts[1]}"})
+                else:
+                    self.__send(200, metrics)
+            else:
+                self.__send(404, {"error": f"Unknown path: {url.path}"})
+        except ValueError as error:
+            self.__send(400, {"error": str(error)})
+
+    def do_POST(self) -> None:
+        service = self.server.service
+
+        if urlsplit(self.path).path.rstrip("/") != "/transactions":
+            self.__send(404, {"error": f"Unknown path: {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            transactions = json.loads(self.rfile.read(length) or b"[]")
+        except ValueError as error:
+            self.__send(400, {"error": f"Invalid json: {error}"})
+            return
+
+        if not isinstance(transactions, list) or not all(isinstance(transaction, dict)
+                                                         for transaction in transactions):
+            self.__send(400, {"error": "Expected a json array of transactions."})
+            return
+
+        try:
+            result = service.ingest(transactions)
+        except Exception as error:
+            # The client gets an answer even when applying the batch
+            # failed, for example on a rejects file that cannot be written.
+            self.__send(500, {"error": f"The batch could not be ingested: {error}"})
+            return
+
+        self.__send(200, result)
+
+    def __send(self, status: int, body) -> None:
+        """Writes a json response."""
+
+        data = json.dumps(body).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
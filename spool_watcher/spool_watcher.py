@@ -0,0 +1,283 @@
+"""Contains a class titled SpoolWatcher, which polls a spool directory
+for new transaction files, processes each one exactly once into a
+long-lived DataProcessor and moves it to a done or failed folder."""
+
+import csv
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+from datetime import datetime, timezone
+from os import path
+from input_handler.input_handler import InputHandler
+from data_processor.data_processor import DataProcessor
+from metrics.metrics import MetricsRegistry
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+class SpoolWatcher:
+    """Ingests the files dropped into a spool directory.
+
+    Every file is identified by the sha256 digest of its contents and
+    recorded in a ledger once it has been processed. The ledger and the
+    DataProcessor state are saved together in one state file, replaced
+    atomically after each file, so a file is either counted and in the
+    ledger or neither. A file still in the spool directory after a
+    crash, or dropped again under another name, is found in the ledger
+    and moved to the folder of its first outcome without being counted
+    twice.
+
+    Files are picked up once they have not been modified for
+    settle_seconds, and hidden files are ignored, so upstream can write
+    a file in place or under a dotted name and rename it when done.
+    The state file is pickled, only load state files this program
+    wrote.
+    """
+
+    FILE_FORMATS = ["csv", "json"]
+    """Extensions of the files picked up from the spool directory."""
+
+    POLL_INTERVAL = 5.0
+    """Default seconds between two scans of the spool directory."""
+
+    SETTLE_SECONDS = 2.0
+    """Default seconds a file must be left unmodified before it is read."""
+
+    STATE_VERSION = 1
+    """Format version stored in every state file."""
+
+    READ_SIZE = 1 << 20
+    """Number of bytes hashed at a time."""
+
+    def __init__(self, spool_directory: str,
+                       data_processor: DataProcessor,
+                       state_path: str,
+                       done_directory: str = None,
+                       failed_directory: str = None,
+                       settle_seconds: float = SETTLE_SECONDS,
+                       on_processed = None,
+                       metrics: MetricsRegistry = None,
+                       rejects_sink = None):
+        """Initializes the watcher and restores the saved state, when
+        there is one, into data_processor.
+
+        Args:
+            spool_directory (str): Directory new files are dropped into.
+            data_processor (DataProcessor): Holds the running results,
+             normally created with an empty transaction list.
+            state_path (str): File the ledger and state are saved to.
+            done_directory (str, optional): Where processed files are
+             moved. Defaults to "done" inside the spool directory.
+            failed_directory (str, optional): Where files that could not
+             be read are moved. Defaults to "failed" inside the spool
+             directory.
+            settle_seconds (float, optional): Seconds a file must be
+             left unmodified before it is read.
+            on_processed (callable, optional): Called with the new
+             ledger entries after a poll processed at least one file,
+             for example to rewrite the output files.
+            metrics (MetricsRegistry, optional): Registry the files and
+             rows read are reported to.
+            rejects_sink (callable, optional): Passed to each
+             InputHandler, see TransactionValidator.
+
+        Raises:
+            ValueError: When the state file was written by an
+             incompatible version.
+        """
+
+        self.__spool_directory = spool_directory
+        self.__data_processor = data_processor
+        self.__state_path = state_path
+        self.__done_directory = done_directory or path.join(spool_directory, "done")
+        self.__failed_directory = failed_directory or path.join(spool_directory, "failed")
+        self.__settle_seconds = settle_seconds
+        self.__on_processed = on_processed
+        self.__metrics = metrics if metrics is not None else MetricsRegistry(enabled=False)
+        self.__rejects_sink = rejects_sink
+        self.__ledger = {}
+
+        for directory in (spool_directory, self.__done_directory, self.__failed_directory):
+            os.makedirs(directory, exist_ok=True)
+
+        if path.isfile(state_path):
+            with open(state_path, "rb") as state_file:
+                saved = pickle.load(state_file)
+
+            if saved.get("version") != self.STATE_VERSION:
+                raise ValueError(f"State file {state_path} has unsupported "
+                                 f"version {saved.get('version')}.")
+
+            self.__ledger = saved["ledger"]
+            data_processor.restore_state(saved["state"])
+
+    @property
+    def ledger(self) -> dict:
+        """Accessor for a copy of the ledger, an entry of the file name,
+        status, rows and time keyed by content digest."""
+
+        return {digest: dict(entry) for digest, entry in self.__ledger.items()}
+
+    @property
+    def data_processor(self) -> DataProcessor:
+        """Accessor for the DataProcessor holding the running results."""
+
+        return self.__data_processor
+
+    def poll(self) -> list:
+        """Processes every settled file in the spool directory once.
+
+        Returns:
+            list: The ledger entries of the files processed or failed
+             by this poll, in the order they were handled.
+        """
+
+        entries = []
+
+        for file_path in self.__ready_files():
+            digest = self.__file_digest(file_path)
+
+            # Already counted, the previous move did not happen or the
+            # same contents were dropped again.
+            if digest in self.__ledger:
+                failed = self.__ledger[digest]["status"] == "failed"
+                self.__move(file_path, self.__failed_directory if failed
+                            else self.__done_directory, digest)
+                continue
+
+            entries.append(self.__process_file(file_path, digest))
+
+        if entries and self.__on_processed is not None:
+            self.__on_processed(entries)
+
+        return entries
+
+    def run(self, poll_interval: float = POLL_INTERVAL, max_polls: int = None) -> None:
+        """Polls the spool directory until interrupted.
+
+        Args:
+            poll_interval (float, optional): Seconds between two polls
+             that found nothing to do. Defaults to POLL_INTERVAL.
+            max_polls (int, optional): Stop after this many polls.
+             Defaults to None, which polls forever.
+        """
+
+        polls = 0
+
+        while max_polls is None or polls < max_polls:
+            polls += 1
+
+            # Files that arrived while a poll was busy are picked up
+            # without waiting.
+            if not self.poll():
+                time.sleep(poll_interval)
+
+    def __ready_files(self) -> list:
+        """Returns the settled spool files, oldest first."""
+
+        files = []
+        settled_before = time.time() - self.__settle_seconds
+
+        with os.scandir(self.__spool_directory) as entries:
+            for entry in entries:
+                if (entry.name.startswith(".") or not entry.is_file()
+                        or entry.name.split(".")[-1] not in self.FILE_FORMATS):
+                    continue
+
+                modified = entry.stat().st_mtime
+
+                if modified <= settled_before:
+                    files.append((modified, entry.name, entry.path))
+
+        return [file_path for _, _, file_path in sorted(files)]
+
+    def __process_file(self, file_path: str, digest: str) -> dict:
+        """Reads, validates and processes one file, saves the state and
+        moves the file.
+
+        Returns:
+            dict: The ledger entry of the file.
+        """
+
+        entry = {"file": path.basename(file_path),
+                 "processed_at": datetime.now(timezone.utc).isoformat()}
+        input_handler = InputHandler(file_path, metrics=self.__metrics,
+                                     rejects_sink=self.__rejects_sink)
+
+        # The whole file is read and validated before any of it is
+        # processed, so a file that cannot be read changes nothing.
+        try:
+            transactions = input_handler.read_input_data()
+        except (OSError, ValueError, csv.Error) as error:
+            entry.update({"status": "failed", "rows": 0, "error": str(error)})
+            self.__data_processor.logger.error(f"Spool file {entry['file']} failed: {error}")
+            self.__ledger[digest] = entry
+            self.__save()
+            self.__move(file_path, self.__failed_directory, digest)
+            self.__metrics.increment("spool_files_failed")
+            return entry
+
+        self.__data_processor.process_batch(transactions)
+
+        entry.update({"status": "done",
+                      "rows": len(transactions),
+                      "rejected": sum(input_handler.reject_counts.values())})
+        self.__ledger[digest] = entry
+        self.__save()
+        self.__move(file_path, self.__done_directory, digest)
+        self.__metrics.increment("spool_files_processed")
+        self.__data_processor.logger.info(f"Spool file {entry['file']} processed: "
+                                          f"{entry['rows']} transactions")
+
+        return entry
+
+    def __file_digest(self, file_path: str) -> str:
+        """Returns the sha256 digest of a file's contents."""
+
+        digest = hashlib.sha256()
+
+        with open(file_path, "rb") as input_file:
+            while chunk := input_file.read(self.READ_SIZE):
+                digest.update(chunk)
+
+        return digest.hexdigest()
+
+    def __move(self, file_path: str, directory: str, digest: str) -> None:
+        """Moves a file into a folder, the digest is added to its name
+        when a file of that name is already there."""
+
+        filename = path.basename(file_path)
+        destination = path.join(directory, filename)
+
+        if path.exists(destination):
+            stem, extension = path.splitext(filename)
+            destination = path.join(directory, f"{stem}.{digest[:12]}{extension}")
+
+        os.replace(file_path, destination)
+
+    def __save(self) -> None:
+        """Writes the ledger and state, replacing the state file
+        atomically."""
+
+        directory, filename = path.split(path.abspath(self.__state_path))
+        file_descriptor, temp_path = tempfile.mkstemp(prefix=f".{filename}.",
+                                                      suffix=".tmp",
+                                                      dir=directory)
+
+        try:
+            with os.fdopen(file_descriptor, "wb") as state_file:
+                pickle.dump({"version": self.STATE_VERSION,
+                             "ledger": self.__ledger,
+                             "state": self.__data_processor.export_state()},
+                            state_file, protocol=pickle.HIGHEST_PROTOCOL)
+                state_file.flush()
+                os.fsync(state_file.fileno())
+
+            os.replace(temp_path, self.__state_path)
+        except BaseException:
+            if path.exists(temp_path):
+                os.remove(temp_path)
+            raise
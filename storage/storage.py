@@ -0,0 +1,349 @@
+"""Contains a class titled SQLiteStore, an optional storage backend
+that bulk-loads validated transactions into a local SQLite database
+and keeps account summaries, transaction statistics and suspicious
+transactions up to date as tables."""
+
+import sqlite3
+from itertools import islice
+from data_processor.data_processor import DataProcessor
+from input_handler.transaction_validator import TransactionValidator
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+class SQLiteStore:
+    """Persists transactions from InputHandler in a SQLite database.
+
+    Transactions are keyed by their Transaction ID, so loading the same
+    file twice only inserts rows that are not stored yet. Aggregate
+    tables are updated from the newly inserted rows only, which lets
+    summaries and filters be answered without reparsing source files.
+    Rows are validated before their batch is inserted, so a bad row is
+    rejected with a reason code instead of failing a load half way.
+    """
+
+    BATCH_SIZE = 100000
+    """Number of rows inserted per database transaction."""
+
+    SUMMARY_FIELDS = ["account_number",
+                      "balance",
+                      "total_deposits",
+                      "total_withdrawals"]
+    """Columns of the account_summaries table, in DataProcessor order."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS transactions (
+            transaction_id TEXT PRIMARY KEY,
+            account_number TEXT NOT NULL,
+            date TEXT,
+            transaction_type TEXT NOT NULL,
+            amount REAL NOT NULL,
+            currency TEXT,
+            description TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_transactions_account
+            ON transactions (account_number);
+        CREATE INDEX IF NOT EXISTS idx_transactions_date
+            ON transactions (date);
+        CREATE INDEX IF NOT EXISTS idx_transactions_type
+            ON transactions (transaction_type);
+
+        CREATE TABLE IF NOT EXISTS account_summaries (
+            account_number TEXT PRIMARY KEY,
+            balance REAL NOT NULL DEFAULT 0,
+            total_deposits REAL NOT NULL DEFAULT 0,
+            total_withdrawals REAL NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_account_summaries_balance
+            ON account_summaries (balance);
+        CREATE INDEX IF NOT EXISTS idx_account_summaries_total_deposits
+            ON account_summaries (total_deposits);
+        CREATE INDEX IF NOT EXISTS idx_account_summaries_total_withdrawals
+            ON account_summaries (total_withdrawals);
+
+        CREATE TABLE IF NOT EXISTS transaction_statistics (
+            transaction_type TEXT PRIMARY KEY,
+            total_amount REAL NOT NULL DEFAULT 0,
+            transaction_count INTEGER NOT NULL DEFAULT 0
+        );
+
+        CREATE TABLE IF NOT EXISTS suspicious_transactions (
+            transaction_id TEXT PRIMARY KEY
+                REFERENCES transactions (transaction_id)
+        );
+
+        CREATE TEMP TABLE IF NOT EXISTS staged_transactions (
+            transaction_id TEXT PRIMARY KEY,
+            account_number TEXT NOT NULL,
+            date TEXT,
+            transaction_type TEXT NOT NULL,
+            amount REAL NOT NULL,
+            currency TEXT,
+            description TEXT
+        );
+    """
+    """Tables and indexes created when the store is opened."""
+
+    def __init__(self, database_path: str,
+                       large_transaction_threshold: float = DataProcessor.LARGE_TRANSACTION_THRESHOLD,
+                       uncommon_currencies: list = DataProcessor.UNCOMMON_CURRENCIES,
+                       rejects_sink = None):
+        """Opens (or creates) the database and its schema.
+
+        Args:
+            database_path (str): Path of the SQLite database file,
+             or ":memory:" for a temporary in-memory database.
+            large_transaction_threshold (float, optional): Amount above
+             which a transaction is suspicious. Defaults to the
+             DataProcessor threshold.
+            uncommon_currencies (list, optional): Currencies that make a
+             transaction suspicious. Defaults to the DataProcessor list.
+            rejects_sink (callable, optional): Called with each row
+             that cannot be stored and its reason code, see
+             TransactionValidator.
+        """
+
+        self.__database_path = database_path
+        self.__large_transaction_threshold = large_transaction_threshold
+        self.__uncommon_currencies = list(uncommon_currencies)
+        self.__validator = TransactionValidator(rejects_sink,
+                                                extra_required_fields=["Transaction ID"])
+
+        self.__connection = sqlite3.connect(database_path)
+        self.__connection.row_factory = sqlite3.Row
+
+        # WAL keeps readers unblocked during bulk loads and NORMAL
+        # synchronous mode avoids an fsync on every commit.
+        self.__connection.execute("PRAGMA journal_mode = WAL")
+        self.__connection.execute("PRAGMA synchronous = NORMAL")
+        self.__connection.executescript(self.SCHEMA)
+
+    @property
+    def database_path(self) -> str:
+        """Accessor for the path of the database file."""
+
+        return self.__database_path
+
+    @property
+    def reject_counts(self) -> dict:
+        """Accessor for the number of rows rejected by load_transactions
+        for each reason code."""
+
+        return self.__validator.reject_counts
+
+    def close(self) -> None:
+        """Closes the database connection."""
+
+        self.__connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def load_transactions(self, transactions, batch_size: int = BATCH_SIZE) -> int:
+        """Bulk-loads transactions and updates the aggregate tables
+        from the rows that were not stored before. Each batch is
+        validated and converted before its database transaction
+        starts, rows without a Transaction ID or with an invalid field
+        are counted in reject_counts and skipped.
+
+        Args:
+            transactions (iterable): Transaction dictionaries as
+             returned by InputHandler.read_input_data.
+            batch_size (int, optional): Rows inserted per database
+             transaction. Defaults to BATCH_SIZE.
+
+        Returns:
+            int: Number of new transactions inserted.
+        """
+
+        transactions = iter(transactions)
+        inserted = 0
+
+        while True:
+            batch = list(islice(transactions, batch_size))
+            if not batch:
+                break
+
+            rows = [self.__to_row(transaction)
+                    for transaction in self.__validator.validate(batch)]
+
+            if rows:
+                with self.__connection:
+                    inserted += self.__load_batch(rows)
+
+        return inserted
+
+    def __to_row(self, transaction: dict) -> tuple:
+        """Converts a transaction dictionary into a table row."""
+
+        return (str(transaction["Transaction ID"]),
+                str(transaction["Account number"]),
+                transaction.get("Date"),
+                transaction["Transaction type"],
+                float(transaction["Amount"]),
+                transaction.get("Currency"),
+                transaction.get("Description"))
+
+    def __load_batch(self, batch: list) -> int:
+        """Stages one batch, keeps only unseen rows and applies them
+        to the transactions and aggregate tables."""
+
+        cursor = self.__connection.cursor()
+
+        cursor.executemany("INSERT OR IGNORE INTO staged_transactions "
+                           "VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+        cursor.execute("DELETE FROM staged_transactions WHERE transaction_id "
+                       "IN (SELECT transaction_id FROM transactions)")
+
+        inserted = cursor.execute("SELECT COUNT(*) FROM staged_transactions").fetchone()[0]
+
+        if inserted:
+            cursor.execute("INSERT INTO transactions "
+                           "SELECT * FROM staged_transactions ORDER BY rowid")
+
+            # Accounts are inserted in order of first appearance so the
+            # table matches DataProcessor's dictionary ordering.
+            cursor.execute("""
+                INSERT INTO account_summaries
+                    (account_number, balance, total_deposits, total_withdrawals)
+                SELECT account_number,
+                       SUM(CASE transaction_type
+                               WHEN 'deposit' THEN amount
+                               WHEN 'withdrawal' THEN -amount
+                               ELSE 0 END),
+                       SUM(CASE WHEN transaction_type = 'deposit'
+                               THEN amount ELSE 0 END),
+                       SUM(CASE WHEN transaction_type = 'withdrawal'
+                               THEN amount ELSE 0 END)
+                FROM staged_transactions
+                GROUP BY account_number
+                ORDER BY MIN(rowid)
+                ON CONFLICT (account_number) DO UPDATE SET
+                    balance = balance + excluded.balance,
+                    total_deposits = total_deposits + excluded.total_deposits,
+                    total_withdrawals = total_withdrawals + excluded.total_withdrawals
+            """)
+
+            cursor.execute("""
+                INSERT INTO transaction_statistics
+                    (transaction_type, total_amount, transaction_count)
+                SELECT transaction_type, SUM(amount), COUNT(*)
+                FROM staged_transactions
+                GROUP BY transaction_type
+                ORDER BY MIN(rowid)
+                ON CONFLICT (transaction_type) DO UPDATE SET
+                    total_amount = total_amount + excluded.total_amount,
+                    transaction_count = transaction_count + excluded.transaction_count
+            """)
+
+            placeholders = ", ".join("?" for _ in self.__uncommon_currencies) or "NULL"
+            cursor.execute(f"""
+                INSERT INTO suspicious_transactions (transaction_id)
+                SELECT transaction_id FROM staged_transactions
+                WHERE amount > ? OR currency IN ({placeholders})
+                ORDER BY rowid
+            """, [self.__large_transaction_threshold, *self.__uncommon_currencies])
+
+        cursor.execute("DELETE FROM staged_transactions")
+
+        return inserted
+
+    def query(self, sql: str, parameters: tuple = ()) -> list:
+        """Runs an ad-hoc read query against the store.
+
+        Args:
+            sql (str): SQL statement to execute.
+            parameters (tuple, optional): Values bound to the
+             statement's placeholders.
+
+        Returns:
+            list: Result rows as dictionaries.
+        """
+
+        return [dict(row) for row in self.__connection.execute(sql, parameters)]
+
+    @property
+    def account_summaries(self) -> dict:
+        """Returns the stored account summaries keyed by account number,
+        in the same shape as DataProcessor.account_summaries."""
+
+        rows = self.query("SELECT * FROM account_summaries ORDER BY rowid")
+
+        return {row["account_number"]: row for row in rows}
+
+    @property
+    def transaction_statistics(self) -> dict:
+        """Returns the stored statistics keyed by transaction type,
+        in the same shape as DataProcessor.transaction_statistics."""
+
+        rows = self.query("SELECT * FROM transaction_statistics ORDER BY rowid")
+
+        return {row["transaction_type"]: {"total_amount": row["total_amount"],
+                                          "transaction_count": row["transaction_count"]}
+                for row in rows}
+
+    @property
+    def suspicious_transactions(self) -> list:
+        """Returns the stored suspicious transactions, in the same shape
+        as DataProcessor.suspicious_transactions."""
+
+        rows = self.__connection.execute("""
+            SELECT t.* FROM suspicious_transactions s
+            JOIN transactions t ON t.transaction_id = s.transaction_id
+            ORDER BY s.rowid
+        """)
+
+        return [{"Transaction ID": row["transaction_id"],
+                 "Account number": row["account_number"],
+                 "Date": row["date"],
+                 "Transaction type": row["transaction_type"],
+                 "Amount": row["amount"],
+                 "Currency": row["currency"],
+                 "Description": row["description"]}
+                for row in rows]
+
+    def get_account_transactions(self, account_number: str) -> list:
+        """Returns every stored transaction of one account using the
+        account index.
+
+        Args:
+            account_number (str): Account to look up.
+
+        Returns:
+            list: Transaction rows of the account, in load order.
+        """
+
+        return self.query("SELECT * FROM transactions WHERE account_number = ? "
+                          "ORDER BY rowid", (str(account_number),))
+
+    def filter_account_summaries(self, filter_field: str, filter_value: int, filter_mode: bool) -> list:
+        """
+        Filters account summaries with an indexed SQL query, matching
+        OutputHandler.filter_account_summaries.
+
+        Args:
+            filter_field (str): The field to filter by (e.g., 'balance').
+            filter_value (int): The value to compare against.
+            filter_mode (bool): If True, filter for values greater than or equal to filter_value; if False, less than or equal.
+
+        Raises:
+            KeyError: When filter_field is not an account summary field.
+
+        Returns:
+            list: Filtered account summaries.
+        """
+
+        # The field name cannot be bound as a parameter, so it is
+        # checked against the known columns before formatting.
+        if filter_field not in self.SUMMARY_FIELDS:
+            raise KeyError(filter_field)
+
+        operator = ">=" if filter_mode else "<="
+
+        return self.query(f"SELECT * FROM account_summaries "
+                          f"WHERE {filter_field} {operator} ? ORDER BY rowid",
+                          (filter_value,))
@@ -0,0 +1,115 @@
+"""Unittesting for account_index to verify that offsets recorded
+by AccountIndex lead InputHandler to an account's rows.
+"""
+
+import os
+import unittest
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from input_handler.input_handler import InputHandler
+from account_index.account_index import AccountIndex
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+class AccountIndexTests(TestCase):
+    """Defines the unit tests for the AccountIndex class."""
+
+    def setUp(self):
+        """This function is invoked before executing a unit test
+        function.
+
+        An input file is written into a temporary directory so the
+        index has real byte offsets to point at.
+        """
+
+        self.directory = TemporaryDirectory()
+
+        self.input_path = path.join(self.directory.name, "input.csv")
+        with open(self.input_path, "w", newline="") as input_file:
+            input_file.write("Transaction ID,Account number,Date,Transaction type,"
+                             + "Amount,Currency,Description\r\n"
+                             + "1,1001,2023-03-01,deposit,1000,CAD,Salary\r\n"
+                             + "2,1002,2023-03-01,deposit,1500,CAD,\"Salary,\r\nbonus\"\r\n"
+                             + "3,1001,2023-03-02,withdrawal,200,CAD,Groceries\r\n"
+                             + "4,1002,2023-03-03,withdrawal,300,CAD,Shopping\r\n")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    # read_input_data, Fills the index given to InputHandler while reading.
+    def test_index_built_during_ingestion(self):
+        # Arrange
+        account_index = AccountIndex(self.input_path)
+        input_handler = InputHandler(self.input_path, account_index)
+
+        # Act
+        transactions = input_handler.read_input_data()
+
+        # Assert
+        self.assertEqual(4, len(transactions))
+        self.assertEqual(["1001", "1002"], account_index.account_numbers)
+        self.assertEqual(2, len(account_index.get_offsets("1002")))
+        self.assertFalse(account_index.is_stale())
+
+    # read_account_history, Returns only the rows of the account.
+    def test_read_account_history_from_saved_index(self):
+        # Arrange
+        input_handler = InputHandler(self.input_path)
+        input_handler.build_account_index(include_dates=True).save()
+
+        # Act
+        account_index = AccountIndex.load(AccountIndex.sidecar_path(self.input_path))
+        history = input_handler.read_account_history("1002", account_index)
+        one_day = input_handler.read_account_history("1002", account_index, "2023-03-03")
+
+        # Assert
+        self.assertEqual(["2", "4"], [row["Transaction ID"] for row in history])
+        self.assertEqual("Salary,\r\nbonus", history[0]["Description"])
+        self.assertEqual(["4"], [row["Transaction ID"] for row in one_day])
+
+    # save, Replaces an existing index without leaving temporary files.
+    def test_save_replaces_index(self):
+        # Arrange
+        input_handler = InputHandler(self.input_path)
+        index_path = AccountIndex.sidecar_path(self.input_path)
+        input_handler.build_account_index().save()
+
+        # Act
+        input_handler.build_account_index(include_dates=True).save()
+        account_index = AccountIndex.load(index_path)
+
+        # Assert
+        self.assertEqual(sorted([path.basename(self.input_path), path.basename(index_path)]),
+                         sorted(os.listdir(path.dirname(index_path))))
+        self.assertEqual(["1001", "1002"], account_index.account_numbers)
+        self.assertEqual(1, len(account_index.get_offsets("1002", "2023-03-03")))
+        self.assertEqual([], account_index.get_offsets("9999"))
+        account_index.close()
+
+    # read_account_history, Refuses an index of a file that has changed.
+    def test_read_account_history_stale_index(self):
+        # Arrange
+        input_handler = InputHandler(self.input_path)
+        account_index = input_handler.build_account_index()
+
+        with open(self.input_path, "a") as input_file:
+            input_file.write("5,1001,2023-03-04,deposit,50,CAD,Refund\n")
+
+        # Act and Assert
+        with self.assertRaises(ValueError):
+            input_handler.read_account_history("1001", account_index)
+
+    # get_offsets, Refuses date lookups on an index without dates.
+    def test_get_offsets_without_dates(self):
+        # Arrange
+        account_index = InputHandler(self.input_path).build_account_index()
+
+        # Act and Assert
+        with self.assertRaises(ValueError):
+            account_index.get_offsets("1001", "2023-03-01")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+"""Unittesting for the benchmark suite to verify the synthetic
+transactions and the regression check.
+"""
+
+import unittest
+from unittest import TestCase
+from benchmarks.generator import generate_transactions
+from benchmarks.benchmark_suite import find_regressions
+from data_processor.data_processor import DataProcessor
+from input_handler.input_handler import InputHandler
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+class BenchmarkSuiteTests(TestCase):
+    """Defines the unit tests for the benchmark generator and suite."""
+
+    # generate_transactions, The same seed gives the same valid rows.
+    def test_generate_transactions_repeatable(self):
+        # Act
+        first = list(generate_transactions(1000, accounts=50, seed=7))
+        second = list(generate_transactions(1000, accounts=50, seed=7))
+        valid = InputHandler("input_data.csv").data_validation(first)
+
+        # Assert
+        self.assertEqual(first, second)
+        self.assertEqual(1000, len(valid))
+        self.assertLessEqual(len({row["Account number"] for row in first}), 50)
+
+    # generate_transactions, The suspicious rate controls the flags.
+    def test_generate_transactions_suspicious_rate(self):
+        # Arrange
+        transactions = list(generate_transactions(2000, suspicious_rate=0.25, seed=1))
+        clean = list(generate_transactions(2000, suspicious_rate=0, seed=1))
+
+        # Act
+        flagged = DataProcessor(transactions, logging_level="ERROR").process_data()
+        not_flagged = DataProcessor(clean, logging_level="ERROR").process_data()
+
+        # Assert
+        self.assertAlmostEqual(0.25, len(flagged["suspicious_transactions"]) / 2000, delta=0.05)
+        self.assertEqual([], not_flagged["suspicious_transactions"])
+
+    # find_regressions, Only changes beyond the threshold are reported.
+    def test_find_regressions(self):
+        # Arrange
+        baseline = {"process_data@10000": {"rows_per_second": 1000, "peak_memory_bytes": 100},
+                    "read_input_data@10000": {"rows_per_second": 1000, "peak_memory_bytes": 100}}
+        results = {"process_data@10000": {"rows_per_second": 950, "peak_memory_bytes": 105},
+                   "read_input_data@10000": {"rows_per_second": 800, "peak_memory_bytes": 150},
+                   "write_output_csv@10000": {"rows_per_second": 1, "peak_memory_bytes": 1}}
+
+        # Act
+        regressions = find_regressions(results, baseline, 0.1)
+
+        # Assert
+        self.assertEqual(2, len(regressions))
+        self.assertTrue(all(regression.startswith("read_input_data@10000")
+                            for regression in regressions))
+
+if __name__ == "__main__":
+    unittest.main()
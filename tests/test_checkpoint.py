@@ -0,0 +1,207 @@
+"""Unittesting for checkpoint to verify that runs are saved
+and resumed correctly by the CheckpointManager class.
+"""
+
+import unittest
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+from input_handler.input_handler import InputHandler
+from data_processor.data_processor import DataProcessor
+from checkpoint.checkpoint import CheckpointManager
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+class CheckpointManagerTests(TestCase):
+    """Defines the unit tests for the CheckpointManager class."""
+
+    def setUp(self):
+        """This function is invoked before executing a unit test
+        function.
+
+        An input file and the checkpoint path are placed in a
+        temporary directory.
+        """
+
+        self.directory = TemporaryDirectory()
+
+        self.input_path = path.join(self.directory.name, "input.csv")
+        with open(self.input_path, "w") as input_file:
+            input_file.write("Transaction ID,Account number,Date,Transaction type,"
+                             + "Amount,Currency,Description\n"
+                             + "1,1001,2023-03-01,deposit,1000,CAD,Salary\n"
+                             + "2,1002,2023-03-01,deposit,1500,CAD,Salary\n"
+                             + "3,1001,2023-03-02,withdrawal,200,CAD,Groceries\n"
+                             + "4,1002,2023-03-03,withdrawal,300,CAD,Shopping\n"
+                             + "5,1001,2023-03-13,deposit,12000,CAD,Car Sale\n")
+
+        self.checkpoint_path = path.join(self.directory.name, "checkpoint.pkl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    # save and load, Returns the saved position and state.
+    def test_save_and_load(self):
+        # Arrange
+        manager = CheckpointManager(self.checkpoint_path, fsync=False)
+        state = DataProcessor([]).export_state()
+
+        # Act
+        manager.save(self.input_path, 42, 3, state)
+        checkpoint = manager.load()
+
+        # Assert
+        self.assertEqual(42, checkpoint["position"])
+        self.assertEqual(3, checkpoint["rows_read"])
+        self.assertEqual(state, checkpoint["state"])
+
+    # run, Removes the checkpoint after a completed run.
+    def test_run_clears_checkpoint(self):
+        # Arrange
+        manager = CheckpointManager(self.checkpoint_path, interval=2)
+
+        # Act
+        manager.run(InputHandler(self.input_path), DataProcessor([]))
+
+        # Assert
+        self.assertIsNone(manager.load())
+
+    # run, A resumed run gives the same results as an uninterrupted one.
+    def test_run_resume_after_crash(self):
+        # Arrange
+        expected = DataProcessor(InputHandler(self.input_path).read_input_data()).process_data()
+        manager = CheckpointManager(self.checkpoint_path, interval=2, fsync=False)
+        calls = []
+
+        # crash while processing the third batch.
+        def crash(self, transactions):
+            calls.append(transactions)
+            if len(calls) == 3:
+                raise RuntimeError("crash")
+            original(self, transactions)
+
+        original = DataProcessor.process_batch
+
+        with patch.object(DataProcessor, "process_batch", crash):
+            with self.assertRaises(RuntimeError):
+                manager.run(InputHandler(self.input_path), DataProcessor([]))
+
+        # Act
+        rows_saved = manager.load()["rows_read"]
+        actual = manager.run(InputHandler(self.input_path), DataProcessor([]), resume=True)
+
+        # Assert
+        self.assertEqual(4, rows_saved)
+        self.assertEqual(expected, actual)
+
+    # run, Checkpoints after the snapshot hold only changed accounts,
+    # and a journal resumes to the results of an uninterrupted run.
+    def test_run_journal_saves_changes_only(self):
+        # Arrange
+        options = {"track_daily_balances": True, "anomaly_z_score": 3,
+                   "anomaly_min_history": 2}
+        expected = DataProcessor(InputHandler(self.input_path).read_input_data(),
+                                 **options).process_data()
+        manager = CheckpointManager(self.checkpoint_path, interval=1, fsync=False)
+        manager.save(self.input_path, 0, 0, DataProcessor([]).export_state())
+        data_processor = DataProcessor([], **options)
+        rows = list(InputHandler(self.input_path).read_input_records(0))
+
+        for position, (_, offset, transaction) in enumerate(rows[:4]):
+            data_processor.process_batch([transaction])
+            manager.append(offset, position + 1,
+                           data_processor.export_changes(data_processor.changed_accounts))
+            data_processor.clear_changed_accounts()
+
+        # Act
+        checkpoint = manager.load()
+        resumed = DataProcessor([], **options)
+        actual = manager.run(InputHandler(self.input_path), resumed, resume=True)
+
+        # Assert
+        self.assertEqual([["1001"], ["1002"], ["1001"], ["1002"]],
+                         [list(changes["account_summaries"]) for changes in checkpoint["changes"]])
+        self.assertEqual(4, checkpoint["rows_read"])
+        self.assertEqual(expected["account_summaries"], actual["account_summaries"])
+        self.assertEqual(expected["daily_balance_changes"], actual["daily_balance_changes"])
+        self.assertEqual(expected["amount_moments"], actual["amount_moments"])
+
+    # run, Journal records hold only the transfers and sketches changed
+    # by their rows, and resume to the results of an uninterrupted run.
+    def test_run_journal_saves_changed_transfers_and_sketches(self):
+        # Arrange
+        with open(self.input_path, "w") as input_file:
+            input_file.write("Transaction ID,Account number,Date,Transaction type,"
+                             + "Amount,Currency,Description\n"
+                             + "1,1001,2023-03-01,transfer,100,CAD,Transfer to Savings\n"
+                             + "2,1002,2023-03-01,transfer,250,CAD,Transfer to Savings\n"
+                             + "3,2001,2023-03-02,transfer,100,CAD,Transfer from Checking\n"
+                             + "4,1003,2023-03-02,transfer,300,USD,Transfer to Savings\n"
+                             + "5,2002,2023-03-02,transfer,250,CAD,Transfer from Checking\n"
+                             + "6,2003,2023-03-03,transfer,300,USD,Transfer from Checking\n"
+                             + "7,1001,2023-03-03,deposit,500,CAD,Salary\n")
+
+        options = {"match_transfers": True, "distinct_count_precision": 4}
+        expected = DataProcessor(InputHandler(self.input_path).read_input_data(),
+                                 **options).process_data()
+        manager = CheckpointManager(self.checkpoint_path, interval=1, fsync=False)
+        manager.save(self.input_path, 0, 0, DataProcessor([], **options).export_state())
+        data_processor = DataProcessor([], **options)
+        rows = list(InputHandler(self.input_path).read_input_records(0))
+
+        for position, (_, offset, transaction) in enumerate(rows[:5]):
+            data_processor.process_batch([transaction])
+            manager.append(offset, position + 1,
+                           data_processor.export_changes(data_processor.changed_accounts))
+            data_processor.clear_changed_accounts()
+
+        # Act
+        checkpoint = manager.load()
+        actual = manager.run(InputHandler(self.input_path), DataProcessor([], **options),
+                             resume=True)
+
+        # Assert
+        self.assertEqual([1, 1, 0, 1, 0],
+                         [len(changes["pending_transfers"]["added"])
+                          for changes in checkpoint["changes"]])
+        self.assertEqual([[], [], [1], [], [2]],
+                         [changes["pending_transfers"]["matched"]
+                          for changes in checkpoint["changes"]])
+        self.assertTrue(all(len(sketches) <= 1 for changes in checkpoint["changes"]
+                            for sketches in changes["distinct_accounts"].values()))
+        self.assertEqual(expected["account_summaries"], actual["account_summaries"])
+        self.assertEqual([], actual["pending_transfers"])
+        self.assertEqual(3, actual["matched_transfer_count"])
+        self.assertEqual({dimension: {value: sketch.to_bytes() for value, sketch in sketches.items()}
+                          for dimension, sketches in expected["distinct_accounts"].items()},
+                         {dimension: {value: sketch.to_bytes() for value, sketch in sketches.items()}
+                          for dimension, sketches in actual["distinct_accounts"].items()})
+
+    # run, Refuses to resume when the input changed since the checkpoint.
+    def test_run_resume_changed_input(self):
+        # Arrange
+        manager = CheckpointManager(self.checkpoint_path, fsync=False)
+        manager.save(self.input_path, 10, 1, DataProcessor([]).export_state())
+
+        with open(self.input_path, "a") as input_file:
+            input_file.write("6,1003,2023-03-14,deposit,50,CAD,Refund\n")
+
+        # Act and Assert
+        with self.assertRaises(ValueError):
+            manager.run(InputHandler(self.input_path), DataProcessor([]), resume=True)
+
+    # run, Refuses a checkpoint of another input file.
+    def test_run_resume_other_input(self):
+        # Arrange
+        manager = CheckpointManager(self.checkpoint_path)
+        manager.save("other.csv", 10, 1, DataProcessor([]).export_state())
+
+        # Act and Assert
+        with self.assertRaises(ValueError):
+            manager.run(InputHandler(self.input_path), DataProcessor([]), resume=True)
+
+if __name__ == "__main__":
+    unittest.main()
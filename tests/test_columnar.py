@@ -0,0 +1,151 @@
+"""Unittesting for columnar to verify that files written by
+ColumnarFile.write are read back by the ColumnarFile reader.
+"""
+
+import json
+import struct
+import unittest
+from io import BytesIO
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from columnar.columnar import ColumnarFile
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+class ColumnarFileTests(TestCase):
+    """Defines the unit tests for the ColumnarFile class."""
+
+    def setUp(self):
+        """This function is invoked before executing a unit test
+        function.
+
+        Columnar files are written into a temporary directory.
+        """
+
+        self.directory = TemporaryDirectory()
+        self.file_path = path.join(self.directory.name, "summaries.fcol")
+
+        self.header = ["Account number", "Balance", "Transaction count"]
+        self.rows = [("1001", 12800.0, 7), ("1002", -9050.5, 3), ("10é3", 0, 0)]
+        self.column_types = {"Balance": "<f8", "Transaction count": "<i8"}
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, rows) -> None:
+        with open(self.file_path, "wb") as output_file:
+            ColumnarFile.write(output_file, self.header, rows, self.column_types)
+
+    # write and column, Returns typed columns without parsing.
+    def test_write_and_read_columns(self):
+        # Arrange
+        self.write(self.rows)
+
+        # Act
+        with ColumnarFile(self.file_path) as columnar_file:
+            balances = columnar_file.column("Balance")
+            balance_values = list(balances)
+            balance_format = balances.format
+            balances.release()
+            account_numbers = columnar_file.column("Account number")
+            rows = columnar_file.rows
+
+        # Assert
+        self.assertEqual(3, rows)
+        self.assertEqual([12800.0, -9050.5, 0.0], balance_values)
+        self.assertEqual("d", balance_format)
+        self.assertEqual(["1001", "1002", "10é3"], account_numbers)
+
+    # to_records, Returns rows as dictionaries.
+    def test_to_records(self):
+        # Arrange
+        self.write(self.rows)
+
+        # Act
+        with ColumnarFile(self.file_path) as columnar_file:
+            records = columnar_file.to_records()
+
+        # Assert
+        self.assertEqual({"Account number": "1002", "Balance": -9050.5,
+                          "Transaction count": 3}, records[1])
+
+    # write, Columns start on aligned offsets.
+    def test_write_aligns_columns(self):
+        # Arrange
+        output_file = BytesIO()
+
+        # Act
+        ColumnarFile.write(output_file, self.header, self.rows, self.column_types)
+
+        # Assert
+        contents = output_file.getvalue()
+        footer_length = struct.unpack("<Q", contents[-16:-8])[0]
+        row_groups = json.loads(contents[-16 - footer_length:-16])["row_groups"]
+        offsets = [offset for column in row_groups[0]["columns"]
+                   for offset in column["offsets"]]
+
+        self.assertEqual(ColumnarFile.MAGIC, contents[:8])
+        self.assertEqual(ColumnarFile.MAGIC, contents[-8:])
+        self.assertEqual(4, len(offsets))
+        self.assertTrue(all(offset % ColumnarFile.COLUMN_ALIGNMENT == 0 for offset in offsets))
+
+    # write and iter_row_groups, Splits rows into row groups of a fixed size.
+    def test_write_row_groups(self):
+        # Arrange
+        rows = [(str(number), number / 2, number) for number in range(10)]
+
+        with open(self.file_path, "wb") as output_file:
+            ColumnarFile.write(output_file, self.header, iter(rows), self.column_types,
+                               row_group_size=4)
+
+        # Act
+        with ColumnarFile(self.file_path) as columnar_file:
+            group_counts = []
+            for columns in columnar_file.iter_row_groups():
+                group_counts.append(list(columns["Transaction count"]))
+                for values in columns.values():
+                    if isinstance(values, memoryview):
+                        values.release()
+
+            balances = list(columnar_file.column("Balance"))
+            last_group = columnar_file.column("Account number", 2)
+            records = columnar_file.to_records()
+            row_group_count = columnar_file.row_group_count
+
+        # Assert
+        self.assertEqual(3, row_group_count)
+        self.assertEqual([[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]], group_counts)
+        self.assertEqual([number / 2 for number in range(10)], balances)
+        self.assertEqual(["8", "9"], last_group)
+        self.assertEqual({"Account number": "5", "Balance": 2.5,
+                          "Transaction count": 5}, records[5])
+
+    # write, An empty result is still a readable file.
+    def test_write_no_rows(self):
+        # Arrange
+        self.write([])
+
+        # Act
+        with ColumnarFile(self.file_path) as columnar_file:
+            records = columnar_file.to_records()
+            names = columnar_file.column_names
+
+        # Assert
+        self.assertEqual([], records)
+        self.assertEqual(self.header, names)
+
+    # ColumnarFile, Refuses files in another format.
+    def test_read_not_columnar(self):
+        # Arrange
+        with open(self.file_path, "w") as output_file:
+            output_file.write("Account number,Balance\n")
+
+        # Act and Assert
+        with self.assertRaises(ValueError):
+            ColumnarFile(self.file_path)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+Contains unit tests for ConcurrentDataProcessor class, to check that batches processed by several threads give the results of one DataProcessor.
+"""
+
+import threading
+import unittest
+from unittest import TestCase
+from data_processor.data_processor import DataProcessor
+from data_processor.concurrent_data_processor import ConcurrentDataProcessor
+
+__author__ = "Khushpreet Kaur"
+__version__ = "2.49.0.windows.1"
+__credits__ = "COMP-1327 Faculty"
+
+class TestConcurrentDataProcessor(TestCase):
+    """Defines the unit tests for the ConcurrentDataProcessor class."""
+
+    def setUp(self):
+        """This function is invoked before executing a unit test
+        function.
+
+        Forty batches of transactions over five accounts are created,
+        every tenth transaction is above the large transaction threshold.
+        """
+
+        self.batches = []
+
+        for batch_number in range(40):
+            batch = []
+
+            for number in range(batch_number * 50, batch_number * 50 + 50):
+                batch.append({"Transaction ID": str(number),
+                              "Account number": str(1000 + number % 5),
+                              "Date": f"2023-03-{1 + number % 28:02d}",
+                              "Transaction type": "deposit" if number % 3 else "withdrawal",
+                              "Amount": "20000" if number % 10 == 0 else str(number % 97 + 1),
+                              "Currency": "CAD",
+                              "Description": "Test"})
+
+            self.batches.append(batch)
+
+    # process_batches
+    def test_process_batches_matches_single_processor(self):
+        """
+        Checks if batches processed on several threads merge into the results of one DataProcessor.
+        """
+        # Arrange
+        expected = DataProcessor([], track_daily_balances=True, track_result_metrics=True)
+        concurrent_processor = ConcurrentDataProcessor(track_daily_balances=True,
+                                                       track_result_metrics=True)
+
+        for batch in self.batches:
+            expected.process_batch(batch)
+
+        # Act
+        concurrent_processor.process_batches(self.batches, max_workers=4)
+        merged = concurrent_processor.merge()
+
+        # Assert
+        self.assertEqual(merged.account_summaries, expected.account_summaries)
+        self.assertEqual(merged.transaction_statistics, expected.transaction_statistics)
+        self.assertEqual(merged.suspicious_transaction_count, 200)
+        self.assertEqual(sorted(transaction["Transaction ID"]
+                                for transaction in merged.suspicious_transactions),
+                         sorted(transaction["Transaction ID"]
+                                for transaction in expected.suspicious_transactions))
+        self.assertEqual(merged.get_daily_balances(), expected.get_daily_balances())
+        self.assertEqual(merged.account_transaction_counts, expected.account_transaction_counts)
+        self.assertEqual(merged.currency_statistics, expected.currency_statistics)
+
+    # process_batch
+    def test_process_batch_from_threads_with_sink(self):
+        """
+        Checks if threads calling process_batch directly each get their own DataProcessor and the suspicious sink sees every flag.
+        """
+        # Arrange
+        flagged = []
+        concurrent_processor = ConcurrentDataProcessor(suspicious_sink=flagged.append)
+        threads = [threading.Thread(target=lambda batches: [concurrent_processor.process_batch(batch)
+                                                            for batch in batches],
+                                    args=(self.batches[start::4],))
+                   for start in range(4)]
+
+        # Act
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        merged = concurrent_processor.merge()
+
+        # Assert
+        self.assertEqual(len(concurrent_processor.processors), 4)
+        self.assertEqual(len(flagged), 200)
+        self.assertEqual(merged.suspicious_transaction_count, 200)
+        self.assertEqual(merged.transaction_statistics["deposit"]["transaction_count"], 1333)
+
+    # __init__
+    def test_init_refuses_order_dependent_options(self):
+        """
+        Checks if anomaly scoring and transfer matching, which depend on transaction order, are refused.
+        """
+        # Act and Assert
+        with self.assertRaises(ValueError):
+            ConcurrentDataProcessor(anomaly_z_score=3)
+
+        with self.assertRaises(ValueError):
+            ConcurrentDataProcessor(match_transfers=True)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -157,6 +157,22 @@ class TestDataProcessor(TestCase):
         # Assert
         self.assertEqual(data_processor.suspicious_transactions, [])
 
+    def test_check_suspicious_transactions_passed_to_sink(self):
+        """
+        Checks if suspicious transactions are passed to the sink as they are found instead of being kept in suspicious_transactions.
+        """
+        # Arrange
+        flagged = []
+        data_processor = DataProcessor(self.transactions, suspicious_sink=flagged.append)
+
+        # Act
+        data_processor.process_data()
+
+        # Assert
+        self.assertEqual(flagged, [self.transactions[3], self.transactions[4]])
+        self.assertEqual(data_processor.suspicious_transactions, [])
+        self.assertEqual(data_processor.suspicious_transaction_count, 2)
+
     # update_transaction_statistics
 
     def test_update_transaction_statistics_for_specified_transaction_type(self):
@@ -174,6 +190,190 @@ class TestDataProcessor(TestCase):
         self.assertEqual(data_processor.transaction_statistics["deposit"],{"total_amount":1000, "transaction_count": 1})
       
       
+    # process_batch
+    def test_process_batch_accumulates_across_batches(self):
+        """
+        Checks if calling process_batch twice gives the same results as processing all transactions at once.
+        """
+        # Arrange
+        data_processor = DataProcessor([])
+
+        # Act
+        data_processor.process_batch(self.transactions[:2])
+        data_processor.process_batch(self.transactions[2:])
+
+        # Assert
+        self.assertEqual(data_processor.account_summaries["1001"]["balance"], 14000)
+        self.assertEqual(data_processor.transaction_statistics["deposit"]["transaction_count"], 4)
+        self.assertEqual(len(data_processor.suspicious_transactions), 2)
+
+    # update_distinct_accounts
+    def test_process_data_counts_distinct_accounts(self):
+        """
+        Checks if distinct accounts are counted per currency, transaction type and date when distinct counting is turned on.
+        """
+        # Arrange
+        data_processor = DataProcessor(self.transactions, distinct_count_precision=8)
+
+        # Act
+        data_processor.process_data()
+
+        # Assert
+        distinct_accounts = data_processor.distinct_accounts
+        self.assertEqual(distinct_accounts["currency"]["CAD"].count(), 2)
+        self.assertEqual(distinct_accounts["transaction_type"]["withdrawal"].count(), 1)
+        self.assertEqual(distinct_accounts["date"]["2023-03-01"].count(), 2)
+
+    def test_process_data_distinct_accounts_off_by_default(self):
+        """
+        Checks if no sketches are kept when distinct counting is not turned on.
+        """
+        # Arrange
+        data_processor = DataProcessor(self.transactions)
+
+        # Act
+        data_processor.process_data()
+
+        # Assert
+        self.assertEqual(data_processor.distinct_accounts["currency"], {})
+
+    # changed_accounts
+    def test_changed_accounts_since_snapshot(self):
+        """
+        Checks if only accounts updated after clear_changed_accounts are reported as changed.
+        """
+        # Arrange
+        data_processor = DataProcessor([])
+        data_processor.process_batch(self.transactions)
+        data_processor.clear_changed_accounts()
+
+        # Act
+        data_processor.process_batch([transaction for transaction in self.transactions
+                                      if transaction["Account number"] == "1002"])
+
+        # Assert
+        self.assertEqual(data_processor.changed_accounts, {"1002"})
+        self.assertEqual(data_processor.export_state()["changed_accounts"], {"1002"})
+
+    # get_daily_balances
+    def test_get_daily_balances_sums_changes_in_date_order(self):
+        """
+        Checks if the daily balances of an account are the running sum of its daily changes in date order, ending at its balance.
+        """
+        # Arrange
+        data_processor = DataProcessor(self.transactions[::-1], track_daily_balances=True)
+
+        # Act
+        data_processor.process_data()
+        daily_balances = data_processor.get_daily_balances()
+
+        # Assert
+        self.assertEqual(daily_balances["1001"],
+                         (["2023-03-01", "2023-03-02", "2023-03-13", "2023-03-14"],
+                          [1000.0, 700.0, 13700.0, 14000.0]))
+        self.assertEqual(daily_balances["1001"][1][-1],
+                         data_processor.account_summaries["1001"]["balance"])
+
+    # get_balance_at
+    def test_get_balance_at_between_dates(self):
+        """
+        Checks if the balance at a date is that of the latest earlier date with transactions, and is updated after new transactions.
+        """
+        # Arrange
+        data_processor = DataProcessor(self.transactions[:4], track_daily_balances=True)
+        data_processor.process_data()
+
+        # Act
+        before_first = data_processor.get_balance_at("1001", "2023-02-28")
+        between = data_processor.get_balance_at("1001", "2023-03-10")
+        data_processor.process_batch(self.transactions[4:])
+        after_update = data_processor.get_balance_at("1001", "2023-03-31")
+
+        # Assert
+        self.assertEqual(before_first, 0)
+        self.assertEqual(between, 700.0)
+        self.assertEqual(after_update, 14000.0)
+        self.assertEqual(data_processor.get_balance_at("9999", "2023-03-31"), 0)
+
+    # score_transaction
+    def test_score_transaction_flags_unusual_amount(self):
+        """
+        Checks if an amount far from the account's earlier amounts is flagged as suspicious when anomaly scoring is on.
+        """
+        # Arrange
+        history = [{"Transaction ID": str(number), "Account number": "2001",
+                    "Date": "2023-03-01", "Transaction type": "withdrawal",
+                    "Amount": str(amount), "Currency": "CAD", "Description": "Groceries"}
+                   for number, amount in enumerate([40, 60, 50, 45, 55])]
+        unusual = dict(history[0], **{"Transaction ID": "9", "Amount": "3000"})
+        data_processor = DataProcessor(history + [unusual], anomaly_z_score=3)
+
+        # Act
+        data_processor.process_data()
+
+        # Assert
+        self.assertEqual(data_processor.suspicious_transactions, [unusual])
+        self.assertEqual(data_processor.anomaly_count, 1)
+
+    # get_amount_statistics
+    def test_get_amount_statistics_matches_history(self):
+        """
+        Checks if the running count, mean and standard deviation of an account's amounts match those of its transactions.
+        """
+        # Arrange
+        data_processor = DataProcessor(self.transactions, anomaly_z_score=3)
+
+        # Act
+        data_processor.process_data()
+        count, mean, standard_deviation = data_processor.get_amount_statistics("1001")
+
+        # Assert
+        self.assertEqual(count, 4)
+        self.assertAlmostEqual(mean, 3650.0)
+        self.assertAlmostEqual(standard_deviation, 6242.061625243165)
+        self.assertEqual(data_processor.anomaly_count, 0)
+
+    # get_average_transaction_amount
+    def test_get_average_transaction_amount_for_unknown_type(self):
+        """
+        Checks if the average of a transaction type without transactions is 0 instead of an error.
+        """
+        # Arrange
+        data_processor = DataProcessor(self.transactions)
+
+        # Act
+        data_processor.process_data()
+
+        # Assert
+        self.assertEqual(data_processor.get_average_transaction_amount("transfer"), 0)
+        self.assertEqual(data_processor.get_average_transaction_amount("withdrawal"), 300.0)
+
+    # match_transfer
+    def test_match_transfer_moves_balance(self):
+        """
+        Checks if a matched pair of transfers moves the amount between the two balances and their daily balances, and an unmatched transfer changes nothing.
+        """
+        # Arrange
+        outgoing = {"Transaction ID": "20", "Account number": "1001", "Date": "2023-03-03",
+                    "Transaction type": "transfer", "Amount": "500", "Currency": "CAD",
+                    "Description": "Transfer to Savings"}
+        incoming = dict(outgoing, **{"Transaction ID": "21", "Account number": "1002",
+                                     "Description": "Transfer from Checking"})
+        unmatched = dict(outgoing, **{"Transaction ID": "22", "Amount": "75"})
+        data_processor = DataProcessor(self.transactions[:3] + [outgoing, unmatched, incoming],
+                                       match_transfers=True, track_daily_balances=True)
+
+        # Act
+        data_processor.process_data()
+
+        # Assert
+        self.assertEqual(data_processor.account_summaries["1001"]["balance"], 200.0)
+        self.assertEqual(data_processor.account_summaries["1002"]["balance"], 2000.0)
+        self.assertEqual(data_processor.account_summaries["1001"]["total_withdrawals"], 300.0)
+        self.assertEqual(data_processor.get_balance_at("1002", "2023-03-03"), 2000.0)
+        self.assertEqual(data_processor.matched_transfer_count, 1)
+        self.assertEqual(data_processor.unmatched_transfers, [unmatched])
+
     # logging
     def test_process_data_added_logging(self):
         """
@@ -0,0 +1,85 @@
+"""
+Contains unit tests for HyperLogLog class, to check if it is working.
+"""
+
+import unittest
+from unittest import TestCase
+from hyperloglog.hyperloglog import HyperLogLog
+
+__author__ = "Khushpreet Kaur"
+__version__ = "2.49.0.windows.1"
+__credits__ = "COMP-1327 Faculty"
+
+class TestHyperLogLog(TestCase):
+    """Defines the unit tests for the HyperLogLog class."""
+
+    def test_count_small_cardinality_is_exact(self):
+        """
+        Checks if small counts are estimated exactly and duplicates are not counted twice.
+        """
+        # Arrange
+        sketch = HyperLogLog()
+
+        # Act
+        for account_number in ["1001", "1002", "1003", "1001", "1002"]:
+            sketch.add(account_number)
+
+        # Assert
+        self.assertEqual(sketch.count(), 3)
+
+    def test_count_large_cardinality_within_error(self):
+        """
+        Checks if the estimate of 50000 distinct values is within 5% for the default precision.
+        """
+        # Arrange
+        sketch = HyperLogLog()
+
+        # Act
+        for account_number in range(50000):
+            sketch.add(account_number)
+
+        # Assert
+        self.assertAlmostEqual(sketch.count(), 50000, delta=2500)
+
+    def test_merge_equals_single_sketch(self):
+        """
+        Checks if merging two shards gives the same sketch as adding every value to one sketch.
+        """
+        # Arrange
+        first, second, combined = HyperLogLog(10), HyperLogLog(10), HyperLogLog(10)
+
+        for account_number in range(3000):
+            (first if account_number % 2 else second).add(account_number)
+            combined.add(account_number)
+
+        # Act
+        first.merge(second)
+
+        # Assert
+        self.assertEqual(first, combined)
+
+    def test_merge_different_precision(self):
+        """
+        Checks if merging sketches with different precisions raises ValueError.
+        """
+        # Act and Assert
+        with self.assertRaises(ValueError):
+            HyperLogLog(10).merge(HyperLogLog(12))
+
+    def test_to_bytes_round_trip(self):
+        """
+        Checks if a sketch rebuilt from its registers is equal to the original.
+        """
+        # Arrange
+        sketch = HyperLogLog(8)
+        sketch.add("1001")
+
+        # Act
+        rebuilt = HyperLogLog(8, sketch.to_bytes())
+
+        # Assert
+        self.assertEqual(rebuilt, sketch)
+        self.assertEqual(len(sketch.to_bytes()), 256)
+
+if __name__ == "__main__":
+    unittest.main()
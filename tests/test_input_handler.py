@@ -9,6 +9,8 @@ from input_handler.input_handler import InputHandler
 import csv
 import json
 from io import StringIO
+from os import path
+from tempfile import TemporaryDirectory
 
 __author__ = "Owen Maxwell"
 __version__ = "1.0.0"
@@ -179,6 +181,46 @@ class InputHandlerTests(TestCase):
 
 
 
+    # read_input_batches, Returns the csv rows in batches of the requested size.
+    @patch("builtins.open", new_callable = mock_open(read_data = ""))
+    def test_read_input_batches_csv(self, mock_file):
+
+        # Arrange
+        mock_file.return_value = StringIO(self.FILE_CONTENTS)
+
+        # Act
+        with patch("os.path.isfile", return_value = True):
+            filepath = InputHandler("file.csv")
+            batches = list(filepath.read_input_batches(2))
+
+        # Assert
+        self.assertEqual([2, 1], [len(batch) for batch in batches])
+        self.assertEqual("3", batches[1][0]["Transaction ID"])
+
+
+    # read_csv_records, Returns rows with byte offsets that can be resumed from.
+    def test_read_csv_records_resume_from_offset(self):
+
+        # Arrange
+        contents = (self.FILE_CONTENTS.replace("Groceries", '"Groceries,\nand more"') + "\n").encode()
+
+        # Act
+        with TemporaryDirectory() as directory:
+            file_path = path.join(directory, "file.csv")
+            with open(file_path, "wb") as input_file:
+                input_file.write(contents)
+
+            filepath = InputHandler(file_path)
+            records = list(filepath.read_csv_records())
+            resumed = list(filepath.read_csv_records(records[0][1]))
+
+        # Assert
+        start, end, row = records[2]
+        self.assertEqual(contents[start:end].decode(), '3,1001,2023-03-02,withdrawal,200,CAD,"Groceries,\nand more"\n')
+        self.assertEqual("Groceries,\nand more", row["Description"])
+        self.assertEqual(records[1:], resumed)
+
+
     # MILESTONE 2 UNITTESTING
 
 
@@ -226,5 +268,60 @@ class InputHandlerTests(TestCase):
         # Assert
         self.assertEqual(expected, actual)
 
+    # Returns a list of transactions that keeps amounts with decimals.
+
+    def test_data_validation_decimal_amount(self):
+        # Arrange
+        self.transactions[0]["Amount"] = "100.50"
+        expected = self.transactions
+
+        # Act
+        actual = InputHandler("input_data.csv").data_validation(self.transactions)
+
+        # Assert
+        self.assertEqual(expected, actual)
+
+    # Passes each rejected transaction to the rejects sink with its
+    #  reason code and counts it under that code.
+
+    def test_validate_batch_rejects_sink(self):
+        # Arrange
+        rejects = []
+        input_handler = InputHandler("input_data.csv", rejects_sink=rejects.append)
+        self.transactions[0]["Currency"] = ""
+        self.transactions[1]["Amount"] = "nan"
+        self.transactions.append(dict(self.transactions[2], Amount="0"))
+        expected = [self.transactions[2]]
+
+        # Act
+        actual = input_handler.validate_batch(self.transactions)
+
+        # Assert
+        self.assertEqual(expected, actual)
+        self.assertEqual(["missing_field", "invalid_amount", "non_positive_amount"],
+                         [record["Reason code"] for record in rejects])
+        self.assertEqual("1001", rejects[0]["Account number"])
+        self.assertEqual({"missing_field": 1,
+                          "invalid_amount": 1,
+                          "non_positive_amount": 1,
+                          "invalid_transaction_type": 0}, input_handler.reject_counts)
+
+    # Rejects amounts float accepts that are not plain decimal
+    #  numbers, and counts each as an invalid amount.
+
+    def test_validate_batch_non_decimal_amounts(self):
+        # Arrange
+        input_handler = InputHandler("input_data.csv")
+        amounts = ["1_000", "1e3", "nan", "inf", "-inf", "0x10", " 12.5 ", ".5"]
+        transactions = [dict(self.transactions[0], Amount=amount) for amount in amounts]
+        expected = transactions[-2:]
+
+        # Act
+        actual = input_handler.validate_batch(transactions)
+
+        # Assert
+        self.assertEqual(expected, actual)
+        self.assertEqual(6, input_handler.reject_counts["invalid_amount"])
+
 if __name__ == "__main__":
     unittest.main()
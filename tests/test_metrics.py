@@ -0,0 +1,110 @@
+"""Unittesting for metrics to verify that the handlers report their
+counters to a MetricsRegistry and that the registry exports them.
+"""
+
+import json
+import unittest
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from metrics.metrics import MetricsRegistry
+from input_handler.input_handler import InputHandler
+from data_processor.data_processor import DataProcessor
+from output_handler.output_handler import OutputHandler
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+class MetricsRegistryTests(TestCase):
+    """Defines the unit tests for the MetricsRegistry class."""
+
+    def setUp(self):
+        """This function is invoked before executing a unit test
+        function.
+
+        An input file with one invalid row is written into a temporary
+        directory.
+        """
+
+        self.directory = TemporaryDirectory()
+
+        self.input_path = path.join(self.directory.name, "input.csv")
+        with open(self.input_path, "w", newline="") as input_file:
+            input_file.write("Transaction ID,Account number,Date,Transaction type,"
+                             "Amount,Currency,Description\n"
+                             "1,1001,2023-03-01,deposit,1000,CAD,Salary\n"
+                             "2,1002,2023-03-01,deposit,-5,CAD,Refund\n"
+                             "3,1001,2023-03-02,deposit,12000,CAD,Car Sale\n")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    # increment and stage, The handlers report rows, rejects and bytes.
+    def test_handlers_report_counters(self):
+        # Arrange
+        metrics = MetricsRegistry()
+        output_path = path.join(self.directory.name, "account_summaries.csv")
+
+        # Act
+        transactions = InputHandler(self.input_path, metrics=metrics).read_input_data()
+        processed_data = DataProcessor(transactions, metrics=metrics).process_data()
+        OutputHandler(processed_data["account_summaries"],
+                      processed_data["suspicious_transactions"],
+                      processed_data["transaction_statistics"],
+                      metrics=metrics).write_output("account_summaries", output_path)
+
+        # Assert
+        counters = metrics.counters
+        self.assertEqual(3, counters["rows_read"])
+        self.assertEqual(1, counters["rows_rejected"])
+        self.assertEqual(2, counters["rows_processed"])
+        self.assertEqual(1, counters["transactions_flagged"])
+        self.assertEqual(1, counters["rows_written"])
+        self.assertEqual(path.getsize(self.input_path), counters["bytes_read"])
+        self.assertEqual(path.getsize(output_path), counters["bytes_written"])
+        self.assertEqual(1, metrics.stages["process"]["calls"])
+
+    # MetricsRegistry, A disabled registry records nothing.
+    def test_disabled_registry(self):
+        # Arrange
+        metrics = MetricsRegistry(enabled=False)
+
+        # Act
+        metrics.increment("rows_read", 10)
+        with metrics.stage("read"):
+            pass
+
+        # Assert
+        self.assertEqual({}, metrics.counters)
+        self.assertEqual({}, metrics.stages)
+
+    # write, Exports json and the Prometheus text format.
+    def test_write_json_and_prometheus(self):
+        # Arrange
+        metrics = MetricsRegistry()
+        metrics.increment("rows_read", 3)
+        with metrics.stage("read"):
+            pass
+
+        json_path = path.join(self.directory.name, "metrics.json")
+        prometheus_path = path.join(self.directory.name, "metrics.prom")
+
+        # Act
+        metrics.write(json_path)
+        metrics.write(prometheus_path)
+
+        with open(json_path) as json_file:
+            exported = json.load(json_file)
+
+        with open(prometheus_path) as prometheus_file:
+            lines = prometheus_file.read().splitlines()
+
+        # Assert
+        self.assertEqual({"rows_read": 3}, exported["counters"])
+        self.assertEqual(1, exported["stages"]["read"]["calls"])
+        self.assertIn("fdp_rows_read_total 3", lines)
+        self.assertIn('fdp_stage_calls_total{stage="read"} 1', lines)
+
+if __name__ == "__main__":
+    unittest.main()
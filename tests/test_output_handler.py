@@ -2,7 +2,18 @@
 
 from unittest import TestCase, main
 from output_handler.output_handler import OutputHandler
+from data_processor.data_processor import DataProcessor
+from run_cache.run_cache import RunCache
+from hyperloglog.hyperloglog import HyperLogLog
+from columnar.columnar import ColumnarFile
 from unittest.mock import patch, mock_open
+from os import path
+import json
+import gzip
+import zlib
+import os
+from glob import glob
+from tempfile import TemporaryDirectory
 
 __author__ = "Owen Maxwell"
 __version__ = "1.0.0"
@@ -136,7 +147,7 @@ class TestOutputHandler(TestCase):
         filepath = "account_summaries.csv"
 
         # Act
-        with patch("builtins.open", mock_open()) as mocked_open:
+        with patch("builtins.open", mock_open()) as mocked_open, patch("os.replace"):
             output.write_account_summaries_to_csv(filepath)
 
         #mocked_open.assert_called_once_with(filename, 'w')
@@ -163,7 +174,7 @@ class TestOutputHandler(TestCase):
         filepath = "suspicious_transactions.csv"
 
         # Act
-        with patch("builtins.open", mock_open()) as mocked_open:
+        with patch("builtins.open", mock_open()) as mocked_open, patch("os.replace"):
             output.write_suspicious_transactions_to_csv(filepath)
 
         #mocked_open.assert_called_once_with(filename, 'w')
@@ -189,7 +200,7 @@ class TestOutputHandler(TestCase):
         filepath = "transaction_statistics.csv"
 
         # Act
-        with patch("builtins.open", mock_open()) as mocked_open:
+        with patch("builtins.open", mock_open()) as mocked_open, patch("os.replace"):
             output.write_transaction_statistics_to_csv(filepath)
 
         #mocked_open.assert_called_once_with(filename, 'w')
@@ -206,6 +217,461 @@ class TestOutputHandler(TestCase):
         # verify there are 3 lines total
         self.assertEqual(mock_file.write.call_count, 3)
 
+    # write_distinct_accounts_to_csv
+    def test_write_distinct_accounts(self):
+        # Arrange
+        sketch = HyperLogLog(4)
+        sketch.add("1001")
+        output = OutputHandler(self.account_summaries,
+        self.suspicious_transactions, self.transaction_statistics,
+        {"currency": {"CAD": sketch, "XRP": sketch}})
+        filepath = "distinct_accounts.csv"
+
+        # Act
+        with patch("builtins.open", mock_open()) as mocked_open, patch("os.replace"):
+            output.write_distinct_accounts_to_csv(filepath)
+
+        # Assert
+        mock_file = mocked_open()
+
+        # verify there are 3 lines total
+        self.assertEqual(mock_file.write.call_count, 3)
+        mock_file.write.assert_called_with("currency,XRP,1\r\n")
+
+    # write_all_to_csv
+    def test_write_all_to_csv(self):
+        # Arrange
+        output = OutputHandler(self.account_summaries,
+        self.suspicious_transactions, self.transaction_statistics,
+        buffer_size=16)
+
+        # Act
+        with TemporaryDirectory() as directory:
+            file_paths = {name: path.join(directory, f"{name}.csv")
+                          for name in ["account_summaries",
+                                       "suspicious_transactions",
+                                       "transaction_statistics"]}
+            output.write_all_to_csv(file_paths)
+
+            line_counts = {}
+            for name, file_path in file_paths.items():
+                with open(file_path) as output_file:
+                    line_counts[name] = len(output_file.readlines())
+
+        # Assert
+        self.assertEqual({"account_summaries": 5,
+                          "suspicious_transactions": 2,
+                          "transaction_statistics": 3}, line_counts)
+
+    # write_all_to_csv, unknown results are rejected.
+    def test_write_all_to_csv_unknown_result(self):
+        # Act and Assert
+        with self.assertRaises(KeyError):
+            self.handler.write_all_to_csv({"balances": "balances.csv"})
+
+    # write_output, json is selected by the file extension.
+    def test_write_output_json(self):
+        # Arrange
+        output = OutputHandler(self.account_summaries,
+        self.suspicious_transactions, self.transaction_statistics,)
+
+        # Act
+        with TemporaryDirectory() as directory:
+            filepath = path.join(directory, "account_summaries.json")
+            output.write_output("account_summaries", filepath)
+
+            with open(filepath) as output_file:
+                records = json.load(output_file)
+
+        # Assert
+        self.assertEqual(4, len(records))
+        self.assertEqual({"Account number": "1001", "Balance": 50,
+                          "Total Deposits": 100, "Total Withdrawals": 50}, records[0])
+
+    # write_output, ndjson writes one object per line.
+    def test_write_output_ndjson(self):
+        # Arrange
+        output = OutputHandler(self.account_summaries,
+        self.suspicious_transactions, self.transaction_statistics,)
+        filepath = "transaction_statistics.ndjson"
+
+        # Act
+        with patch("builtins.open", mock_open()) as mocked_open, patch("os.replace"):
+            output.write_output("transaction_statistics", filepath)
+
+        # Assert
+        mock_file = mocked_open()
+
+        # verify there are 2 lines total
+        self.assertEqual(mock_file.write.call_count, 2)
+        mock_file.write.assert_called_with('{"Transaction type": "withdrawal", '
+                                           '"Total amount": 50, "Transaction count": 1}\n')
+
+    # write_output, unsupported extensions are rejected.
+    def test_write_output_unsupported_format(self):
+        # Act and Assert
+        with self.assertRaises(ValueError):
+            self.handler.write_output("account_summaries", "account_summaries.xml")
+
+    # AVAILABLE_COMPRESSION_FORMATS, zst is only offered when zstandard
+    # can be imported.
+    def test_available_compression_formats(self):
+        # Arrange
+        try:
+            import zstandard
+        except ImportError:
+            zstandard = None
+
+        # Act
+        formats = OutputHandler.AVAILABLE_COMPRESSION_FORMATS
+
+        # Assert
+        self.assertEqual(["gz", "bz2", "xz"], formats[:3])
+        self.assertEqual(zstandard is not None, "zst" in formats)
+
+    # write_output, compression is selected by the last file extension.
+    def test_write_output_compressed(self):
+        # Arrange
+        output = OutputHandler(self.account_summaries,
+        self.suspicious_transactions, self.transaction_statistics,
+        background_compression=True)
+
+        # Act
+        with TemporaryDirectory() as directory:
+            filepath = path.join(directory, "transaction_statistics.csv.gz")
+            output.write_output("transaction_statistics", filepath)
+
+            with gzip.open(filepath, "rt", newline="") as output_file:
+                contents = output_file.read()
+
+        # Assert
+        self.assertEqual("Transaction type,Total amount,Transaction count\r\n"
+                         "deposit,300,2\r\nwithdrawal,50,1\r\n", contents)
+
+    # write_output, a failed write leaves the previous file in place.
+    def test_write_output_atomic_on_failure(self):
+        # Arrange
+        self.suspicious_transactions.append({"Transaction ID": "2"})
+        output = OutputHandler(self.account_summaries,
+        self.suspicious_transactions, self.transaction_statistics,)
+
+        with TemporaryDirectory() as directory:
+            filepath = path.join(directory, "suspicious_transactions.csv")
+            with open(filepath, "w") as output_file:
+                output_file.write("previous run\n")
+
+            # Act
+            with self.assertRaises(KeyError):
+                output.write_output("suspicious_transactions", filepath)
+
+            with open(filepath) as output_file:
+                contents = output_file.read()
+            leftover_files = os.listdir(directory)
+
+        # Assert
+        self.assertEqual("previous run\n", contents)
+        self.assertEqual(["suspicious_transactions.csv"], leftover_files)
+
+    # write_output, columnar files keep numeric columns typed.
+    def test_write_output_columnar(self):
+        # Arrange
+        output = OutputHandler(self.account_summaries,
+        self.suspicious_transactions, self.transaction_statistics,)
+
+        # Act
+        with TemporaryDirectory() as directory:
+            filepath = path.join(directory, "suspicious_transactions.fcol")
+            output.write_output("suspicious_transactions", filepath)
+
+            with ColumnarFile(filepath) as columnar_file:
+                amount_type = columnar_file.column_type("Amount")
+                records = columnar_file.to_records()
+
+        # Assert
+        self.assertEqual("<f8", amount_type)
+        self.assertEqual(250.0, records[0]["Amount"])
+        self.assertEqual("XRP", records[0]["Currency"])
+
+    # write_output, columnar files cannot be compressed.
+    def test_write_output_columnar_compressed(self):
+        # Act and Assert
+        with self.assertRaises(ValueError):
+            self.handler.write_output("account_summaries", "account_summaries.fcol.gz")
+
+    # write_partitioned, range partitions hold contiguous accounts.
+    def test_write_partitioned_range(self):
+        # Act
+        with TemporaryDirectory() as directory:
+            manifest = self.handler.write_partitioned(directory, 2, "range")
+
+            with open(path.join(directory, "account_summaries", "part-00001.csv")) as part_file:
+                second_part = part_file.read().splitlines()
+
+            with open(path.join(directory, "manifest.json")) as manifest_file:
+                saved_manifest = json.load(manifest_file)
+
+            suspicious_exists = path.exists(path.join(directory, "suspicious_transactions",
+                                                      "month=2023-03", "part-00000.csv"))
+
+        # Assert
+        self.assertEqual([["1001", "1002"], ["1004", "1005"]], manifest["ranges"])
+        self.assertEqual(["1004,11500,11500,0", "1005,-2200,222,2422"], second_part[1:])
+        self.assertEqual(manifest, saved_manifest)
+        self.assertTrue(suspicious_exists)
+
+    # write_partitioned, hash partitions cover every account once.
+    def test_write_partitioned_hash(self):
+        # Act
+        with TemporaryDirectory() as directory:
+            manifest = self.handler.write_partitioned(directory, 3, split_by_month=False)
+
+        # Assert
+        summary_rows = sum(entry["rows"] for entry in manifest["files"]
+                           if entry["result"] == "account_summaries")
+
+        self.assertEqual(len(self.account_summaries), summary_rows)
+        partition = zlib.crc32(b"1001") % 3
+
+        self.assertEqual(len(self.account_summaries), summary_rows)
+        self.assertIn(f"suspicious_transactions/part-{partition:05d}.csv",
+                      [entry["path"] for entry in manifest["files"]])
+
+    # write_partitioned, partitions of an earlier run are removed.
+    def test_write_partitioned_replaces_stale_partitions(self):
+        # Arrange
+        with TemporaryDirectory() as directory:
+            self.handler.write_partitioned(directory, 4, "range")
+
+            # Act
+            manifest = self.handler.write_partitioned(directory, 2, "range", split_by_month=False)
+            written = sorted(path.relpath(path.join(folder, filename), directory).replace(os.sep, "/")
+                             for folder, _, filenames in os.walk(directory)
+                             for filename in filenames)
+            leftovers = [name for name in os.listdir(path.dirname(directory))
+                         if name.startswith(f".{path.basename(directory)}.")]
+
+        # Assert
+        self.assertEqual(sorted([entry["path"] for entry in manifest["files"]] + ["manifest.json"]),
+                         written)
+        self.assertEqual([], leftovers)
+
+    # write_partitioned, more partition files than may be open at once
+    # are written in several passes with the same contents.
+    def test_write_partitioned_more_files_than_open_limit(self):
+        # Arrange
+        write_file = OutputHandler._OutputHandler__write_file
+        open_files = []
+        most_open = []
+
+        def counted_write_file(handler, *args, **kwargs):
+            open_files.append(args[0])
+            most_open.append(len(open_files))
+            try:
+                return write_file(handler, *args, **kwargs)
+            finally:
+                open_files.remove(args[0])
+
+        with TemporaryDirectory() as directory:
+            expected = self.handler.write_partitioned(path.join(directory, "expected"), 4, "range")
+
+            # Act
+            with patch.object(OutputHandler, "_OutputHandler__write_file", counted_write_file):
+                manifest = self.handler.write_partitioned(path.join(directory, "limited"), 4,
+                                                          "range", max_open_files=2)
+
+            contents = {}
+
+            for run in ("expected", "limited"):
+                for entry in manifest["files"]:
+                    with open(path.join(directory, run, entry["path"])) as part_file:
+                        contents.setdefault(run, []).append(part_file.read())
+
+        # Assert
+        self.assertEqual(2, max(most_open))
+        self.assertEqual(sorted(expected["files"], key=lambda entry: entry["path"]),
+                         sorted(manifest["files"], key=lambda entry: entry["path"]))
+        self.assertEqual(contents["expected"], contents["limited"])
+
+    # write_partitioned, the partition count must be positive.
+    def test_write_partitioned_invalid(self):
+        # Act and Assert
+        with self.assertRaises(ValueError):
+            self.handler.write_partitioned("partitioned", 0)
+
+    # write_account_summary_delta, only changed accounts are written.
+    def test_write_account_summary_delta(self):
+        # Act
+        with TemporaryDirectory() as directory:
+            delta_path = path.join(directory, "summaries.delta-00001.csv")
+            written = self.handler.write_account_summary_delta(delta_path, {"1002"})
+
+            with open(delta_path) as delta_file:
+                lines = delta_file.read().splitlines()
+
+        # Assert
+        self.assertEqual(1, written)
+        self.assertEqual(["Account number,Balance,Total Deposits,Total Withdrawals",
+                          "1002,200,200,0"], lines)
+
+    # read_account_summaries, whole numbers read from json stay int and
+    # amounts stay float, as DataProcessor built them.
+    def test_read_account_summaries_keeps_number_types(self):
+        # Arrange
+        with TemporaryDirectory() as directory:
+            file_path = path.join(directory, "summaries.json")
+            OutputHandler({"1001": {"account_number": "1001", "balance": 12.5,
+                                    "total_deposits": 12.5, "total_withdrawals": 0}},
+                          [], {}).write_output("account_summaries", file_path)
+
+            # Act
+            summary = OutputHandler.read_account_summaries(file_path)["1001"]
+
+        # Assert
+        self.assertIsInstance(summary["total_withdrawals"], int)
+        self.assertIsInstance(summary["balance"], float)
+
+    # compact_account_summaries, later deltas replace earlier summaries.
+    def test_compact_account_summaries(self):
+        # Arrange
+        changed = OutputHandler({"1002": {"account_number": "1002", "balance": 150,
+                                          "total_deposits": 200, "total_withdrawals": 50},
+                                 "1009": {"account_number": "1009", "balance": 5,
+                                          "total_deposits": 5, "total_withdrawals": 0}}, [], {})
+
+        with TemporaryDirectory() as directory:
+            base_path = path.join(directory, "summaries.csv")
+            delta_paths = [path.join(directory, "summaries.delta-00001.ndjson"),
+                           path.join(directory, "summaries.delta-00002.csv.gz")]
+
+            self.handler.write_output("account_summaries", base_path)
+            changed.write_account_summary_delta(delta_paths[0], {"1002"})
+            changed.write_account_summary_delta(delta_paths[1], {"1009"})
+
+            # Act
+            accounts = OutputHandler.compact_account_summaries(base_path, delta_paths)
+            summaries = OutputHandler.read_account_summaries(base_path)
+            deltas_removed = not any(path.exists(delta_path) for delta_path in delta_paths)
+
+        # Assert
+        self.assertEqual(5, accounts)
+        self.assertEqual(150.0, summaries["1002"]["balance"])
+        self.assertEqual(5.0, summaries["1009"]["total_deposits"])
+        self.assertEqual(-2200.0, summaries["1005"]["balance"])
+        self.assertTrue(deltas_removed)
+
+    # check_delta_input, an input applied twice through deltas counts once.
+    def test_delta_same_input_twice_matches_full_run(self):
+        # Arrange
+        transactions = [
+            {"Transaction ID": "1", "Account number": "1001", "Date": "2023-03-01",
+             "Transaction type": "deposit", "Amount": "1000", "Currency": "CAD",
+             "Description": "Salary"},
+            {"Transaction ID": "2", "Account number": "1001", "Date": "2023-03-02",
+             "Transaction type": "withdrawal", "Amount": "250", "Currency": "CAD",
+             "Description": "Rent"},
+            {"Transaction ID": "3", "Account number": "1002", "Date": "2023-03-02",
+             "Transaction type": "deposit", "Amount": "75", "Currency": "CAD",
+             "Description": "Refund"}]
+
+        with TemporaryDirectory() as directory:
+            input_path = path.join(directory, "input.csv")
+            full_path = path.join(directory, "full.csv")
+            base_path = path.join(directory, "summaries.csv")
+            ledger_path = path.join(directory, "summaries.ledger.json")
+            delta_pattern = path.join(directory, "summaries.delta-*.csv")
+
+            with open(input_path, "w") as input_file:
+                input_file.write(json.dumps(transactions))
+
+            full_run = DataProcessor([dict(row) for row in transactions]).process_data()
+            OutputHandler(full_run["account_summaries"], [], {}).write_output(
+                "account_summaries", full_path)
+
+            # The steps of a main.py run with --delta.
+            def delta_run() -> None:
+                input_digest = RunCache.content_digest(input_path)
+                delta_paths = sorted(glob(delta_pattern))
+                OutputHandler.check_delta_input(input_digest, delta_paths, ledger_path)
+
+                data_processor = DataProcessor([dict(row) for row in transactions])
+                data_processor.restore_state({
+                    "account_summaries": OutputHandler.read_account_summaries(
+                        base_path, delta_paths),
+                    "suspicious_transactions": [],
+                    "transaction_statistics": {}})
+                processed_data = data_processor.process_data()
+
+                OutputHandler(processed_data["account_summaries"], [], {}).write_account_summary_delta(
+                    OutputHandler.delta_file_path(delta_pattern, len(delta_paths) + 1, input_digest),
+                    processed_data["changed_accounts"])
+
+            # Act
+            delta_run()
+
+            with self.assertRaises(ValueError):
+                delta_run()
+
+            OutputHandler.compact_account_summaries(base_path, sorted(glob(delta_pattern)),
+                                                    ledger_path=ledger_path)
+
+            with self.assertRaises(ValueError):
+                delta_run()
+
+            compacted = OutputHandler.read_account_summaries(base_path)
+            expected = OutputHandler.read_account_summaries(full_path)
+            remaining_deltas = glob(delta_pattern)
+
+        # Assert
+        self.assertEqual(expected, compacted)
+        self.assertEqual(750, compacted["1001"]["balance"])
+        self.assertEqual([], remaining_deltas)
+
+    # reset_delta_ledger, a full run's input is not applied again by a
+    # delta and the deltas written before the full run are removed.
+    def test_reset_delta_ledger_after_full_run(self):
+        # Arrange
+        with TemporaryDirectory() as directory:
+            ledger_path = path.join(directory, "deltas", "summaries.ledger.json")
+            delta_pattern = path.join(directory, "deltas", "summaries.delta-*.csv")
+            input_digest = "a" * 64
+            other_digest = "b" * 64
+            stale_path = OutputHandler.delta_file_path(delta_pattern, 1, other_digest)
+            os.makedirs(path.dirname(stale_path))
+            self.handler.write_account_summary_delta(stale_path, ["1001"])
+
+            # Act
+            OutputHandler.reset_delta_ledger(ledger_path, [input_digest], [stale_path])
+
+            with self.assertRaises(ValueError):
+                OutputHandler.check_delta_input(input_digest, [], ledger_path)
+
+            OutputHandler.check_delta_input(other_digest, [], ledger_path)
+            remaining_deltas = glob(delta_pattern)
+
+        # Assert
+        self.assertEqual([], remaining_deltas)
+
+    # write_output, daily balances are written one row per account and date.
+    def test_write_daily_balances(self):
+        # Arrange
+        output = OutputHandler({}, [], {}, daily_balances={
+            "1001": (["2023-03-01", "2023-03-04"], [1000.0, 700.0]),
+            "1002": (["2023-03-02"], [200.0])})
+
+        # Act
+        with TemporaryDirectory() as directory:
+            file_path = path.join(directory, "daily_balances.csv")
+            output.write_output("daily_balances", file_path)
+
+            with open(file_path) as daily_file:
+                lines = daily_file.read().splitlines()
+
+        # Assert
+        self.assertEqual(["Account number,Date,Balance",
+                          "1001,2023-03-01,1000.0",
+                          "1001,2023-03-04,700.0",
+                          "1002,2023-03-02,200.0"], lines)
+
     # filtered_account_summaries
     def test_filtered_account_summaries_returns_list_using_mode_true(self):
         """
@@ -250,7 +716,7 @@ class TestOutputHandler(TestCase):
     
         filtered_data = output.filter_account_summaries("balance", 5000, False)
         # Act
-        with patch("builtins.open", mock_open()) as mocked_open:
+        with patch("builtins.open", mock_open()) as mocked_open, patch("os.replace"):
        
             output.write_filtered_summaries_to_csv(filtered_data, filepath)
             mock_file = mocked_open()
@@ -0,0 +1,147 @@
+"""Unittesting for partial_result to verify that merging partial
+results gives the results of processing all transactions at once.
+"""
+
+import os
+import unittest
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+from data_processor.data_processor import DataProcessor
+from partial_result.partial_result import PartialResult
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+class PartialResultTests(TestCase):
+    """Defines the unit tests for the PartialResult class."""
+
+    def setUp(self):
+        """This function is invoked before executing a unit test
+        function.
+
+        The transactions are split into three parts, each processed by
+        its own DataProcessor.
+        """
+
+        self.transactions = [
+            {"Transaction ID": "1", "Account number": "1001", "Date": "2023-03-01",
+             "Transaction type": "deposit", "Amount": "1000", "Currency": "CAD",
+             "Description": "Salary"},
+            {"Transaction ID": "2", "Account number": "1002", "Date": "2023-03-01",
+             "Transaction type": "deposit", "Amount": "12000", "Currency": "CAD",
+             "Description": "Car Sale"},
+            {"Transaction ID": "3", "Account number": "1001", "Date": "2023-03-02",
+             "Transaction type": "withdrawal", "Amount": "200", "Currency": "CAD",
+             "Description": "Groceries"},
+            {"Transaction ID": "4", "Account number": "1003", "Date": "2023-03-02",
+             "Transaction type": "deposit", "Amount": "250", "Currency": "XRP",
+             "Description": "Crypto Investment"},
+            {"Transaction ID": "5", "Account number": "1002", "Date": "2023-03-03",
+             "Transaction type": "transfer", "Amount": "300", "Currency": "CAD",
+             "Description": "Transfer to Savings"}]
+
+        self.partials = [self.partial(self.transactions[:2], "a.csv"),
+                         self.partial(self.transactions[2:4], "b.csv"),
+                         self.partial(self.transactions[4:], "c.csv")]
+
+    def partial(self, transactions: list, source: str) -> PartialResult:
+        data_processor = DataProcessor(transactions, distinct_count_precision=6)
+        return PartialResult.from_state(data_processor.process_data(), [source])
+
+    # merge_all, Gives the same aggregates as one DataProcessor.
+    def test_merge_all_matches_single_run(self):
+        # Arrange
+        expected = DataProcessor(self.transactions, distinct_count_precision=6).process_data()
+
+        # Act
+        merged = PartialResult.merge_all(self.partials).to_state()
+
+        # Assert
+        self.assertEqual(expected["account_summaries"], merged["account_summaries"])
+        self.assertEqual(expected["transaction_statistics"], merged["transaction_statistics"])
+        self.assertEqual(["2", "4"], [transaction["Transaction ID"] for transaction
+                                      in merged["suspicious_transactions"]])
+        self.assertEqual(expected["distinct_accounts"]["currency"],
+                         merged["distinct_accounts"]["currency"])
+
+    # merge, Grouping and order do not change the result.
+    def test_merge_associative_and_commutative(self):
+        # Arrange
+        first, second, third = self.partials
+
+        # Act
+        left = first.merge(second).merge(third).to_state()
+        right = third.merge(second.merge(first)).to_state()
+
+        # Assert
+        self.assertEqual(left, right)
+        self.assertEqual(list(left["account_summaries"]), list(right["account_summaries"]))
+
+    # save and load, A saved partial result loads unchanged.
+    def test_save_and_load(self):
+        # Arrange
+        merged = PartialResult.merge_all(self.partials)
+
+        # Act
+        with TemporaryDirectory() as directory:
+            file_path = path.join(directory, "day" + PartialResult.FILE_SUFFIX)
+            merged.save(file_path)
+            loaded = PartialResult.load(file_path)
+
+        # Assert
+        self.assertEqual(merged.to_state(), loaded.to_state())
+        self.assertEqual(["a.csv", "b.csv", "c.csv"], loaded.sources)
+
+    # save, A failed save leaves the earlier file and no temporary file.
+    def test_save_failure_keeps_earlier_file(self):
+        # Arrange
+        with TemporaryDirectory() as directory:
+            file_path = path.join(directory, "day" + PartialResult.FILE_SUFFIX)
+            self.partials[0].save(file_path)
+
+            # Act
+            with patch("partial_result.partial_result.json.dump", side_effect=RuntimeError):
+                with self.assertRaises(RuntimeError):
+                    PartialResult.merge_all(self.partials).save(file_path)
+
+            loaded = PartialResult.load(file_path)
+            files = os.listdir(directory)
+
+        # Assert
+        self.assertEqual(["a.csv"], loaded.sources)
+        self.assertEqual(["day" + PartialResult.FILE_SUFFIX], files)
+
+    # source_of, Copies of an input file have the same source ID.
+    def test_merge_copied_source(self):
+        # Arrange
+        with TemporaryDirectory() as directory:
+            original_path = path.join(directory, "input.csv")
+            copy_path = path.join(directory, "copy.csv")
+
+            for file_path in (original_path, copy_path):
+                with open(file_path, "w") as input_file:
+                    input_file.write("Transaction ID,Account number\n1,1001\n")
+
+            original = PartialResult.from_state(DataProcessor([]).process_data(),
+                                                PartialResult.source_of(original_path))
+            copy = PartialResult.from_state(DataProcessor([]).process_data(),
+                                            PartialResult.source_of(copy_path))
+
+        # Act and Assert
+        self.assertEqual(original.sources, copy.sources)
+        self.assertEqual([original_path], list(original.source_labels.values()))
+
+        with self.assertRaises(ValueError):
+            original.merge(copy)
+
+    # merge, Partial results of the same input file are not merged.
+    def test_merge_shared_source(self):
+        # Act and Assert
+        with self.assertRaises(ValueError):
+            self.partials[0].merge(self.partial(self.transactions[:1], "a.csv"))
+
+if __name__ == "__main__":
+    unittest.main()
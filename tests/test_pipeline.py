@@ -0,0 +1,93 @@
+"""Unittesting for pipeline to verify the AsyncPipeline stages
+produce the same results as the sequential run.
+"""
+
+import csv
+import unittest
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from input_handler.input_handler import InputHandler
+from data_processor.data_processor import DataProcessor
+from pipeline.pipeline import AsyncPipeline
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+class AsyncPipelineTests(TestCase):
+    """Defines the unit tests for the AsyncPipeline class."""
+
+    def setUp(self):
+        """This function is invoked before executing a unit test
+        function.
+
+        An input file is written into a temporary directory along with
+        the paths the pipeline writes its output files to.
+        """
+
+        self.directory = TemporaryDirectory()
+
+        self.input_path = path.join(self.directory.name, "input.csv")
+        with open(self.input_path, "w") as input_file:
+            input_file.write("Transaction ID,Account number,Date,Transaction type,"
+                             + "Amount,Currency,Description\n"
+                             + "1,1001,2023-03-01,deposit,1000,CAD,Salary\n"
+                             + "2,1002,2023-03-01,deposit,1500,CAD,Salary\n"
+                             + "3,1001,2023-03-02,withdrawal,200,CAD,Groceries\n"
+                             + "4,1002,2023-03-03,withdrawal,Money,CAD,Invalid\n"
+                             + "5,1001,2023-03-13,deposit,12000,CAD,Car Sale\n"
+                             + "6,1002,2023-03-14,deposit,450,LTC,Crypto Investment\n")
+
+        self.file_paths = {name: path.join(self.directory.name, f"{name}.csv")
+                           for name in ["account_summaries",
+                                        "suspicious_transactions",
+                                        "transaction_statistics"]}
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    # run, Returns the same results as DataProcessor.process_data.
+    def test_run_matches_sequential_processing(self):
+        # Arrange
+        transactions = InputHandler(self.input_path).read_input_data()
+        expected = DataProcessor(transactions).process_data()
+        pipeline = AsyncPipeline(InputHandler(self.input_path), DataProcessor([]),
+                                 self.file_paths, batch_size=2, queue_size=1)
+
+        # Act
+        actual = pipeline.run()
+
+        # Assert
+        self.assertEqual(expected, actual)
+
+    # run, Writes every output file including streamed suspicious rows.
+    def test_run_writes_output_files(self):
+        # Arrange
+        pipeline = AsyncPipeline(InputHandler(self.input_path), DataProcessor([]),
+                                 self.file_paths, batch_size=2)
+
+        # Act
+        pipeline.run()
+
+        # Assert
+        with open(self.file_paths["suspicious_transactions"], newline="") as output_file:
+            rows = list(csv.reader(output_file))
+        with open(self.file_paths["account_summaries"], newline="") as output_file:
+            summaries = list(csv.reader(output_file))
+
+        self.assertEqual(["5", "6"], [row[0] for row in rows[1:]])
+        self.assertEqual(3, len(summaries))
+
+    # run, Raises the error of a failing stage.
+    def test_run_missing_input_file(self):
+        # Arrange
+        pipeline = AsyncPipeline(InputHandler(path.join(self.directory.name, "missing.csv")),
+                                 DataProcessor([]), self.file_paths)
+
+        # Act and Assert
+        with self.assertRaises(FileNotFoundError):
+            pipeline.run()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Contains unit tests for ResultQuery class, to check that derived metrics are materialized once and rebuilt after new data.
+"""
+
+import unittest
+from unittest import TestCase
+from data_processor.data_processor import DataProcessor
+from data_processor.result_query import ResultQuery
+
+__author__ = "Khushpreet Kaur"
+__version__ = "2.49.0.windows.1"
+__credits__ = "COMP-1327 Faculty"
+
+class TestResultQuery(TestCase):
+    """Defines the unit tests for the ResultQuery class."""
+
+    def setUp(self):
+        """This function is invoked before executing a unit test
+        function.
+
+        A DataProcessor is given two accounts, one of them without withdrawals, and transactions in two currencies.
+        """
+
+        self.transactions = [
+            {"Transaction ID": "1", "Account number": "1001", "Date": "2023-03-01",
+             "Transaction type": "deposit", "Amount": "1000", "Currency": "CAD",
+             "Description": "Salary"},
+            {"Transaction ID": "2", "Account number": "1001", "Date": "2023-03-02",
+             "Transaction type": "deposit", "Amount": "3000", "Currency": "USD",
+             "Description": "Bonus"},
+            {"Transaction ID": "3", "Account number": "1001", "Date": "2023-03-03",
+             "Transaction type": "withdrawal", "Amount": "500", "Currency": "CAD",
+             "Description": "Rent"},
+            {"Transaction ID": "4", "Account number": "1002", "Date": "2023-03-03",
+             "Transaction type": "deposit", "Amount": "200", "Currency": "CAD",
+             "Description": "Refund"}]
+        self.data_processor = DataProcessor([], track_result_metrics=True)
+        self.data_processor.process_batch(self.transactions)
+
+    # account_metrics
+    def test_account_metrics_derived_from_summaries(self):
+        """
+        Checks if the average deposit, average withdrawal and ratio of each account are derived from its totals and transaction counts.
+        """
+        # Arrange
+        query = ResultQuery(self.data_processor)
+
+        # Act
+        metrics = query.get_account_metrics("1001")
+
+        # Assert
+        self.assertEqual(metrics, {"average_deposit": 2000.0,
+                                   "average_withdrawal": 500.0,
+                                   "deposit_withdrawal_ratio": 8.0})
+        self.assertIsNone(query.get_account_metrics("1002")["deposit_withdrawal_ratio"])
+        self.assertIsNone(query.get_account_metrics("9999"))
+
+    # currency_totals and get_average_transaction_amount
+    def test_currency_totals_and_averages(self):
+        """
+        Checks if totals are kept per currency and unknown transaction types average to 0.
+        """
+        # Arrange
+        query = ResultQuery(self.data_processor)
+
+        # Act
+        currency_totals = query.currency_totals
+
+        # Assert
+        self.assertEqual(currency_totals["CAD"], {"total_amount": 1700.0,
+                                                  "transaction_count": 3,
+                                                  "average_amount": 1700.0 / 3})
+        self.assertEqual(currency_totals["USD"]["transaction_count"], 1)
+        self.assertEqual(query.get_average_transaction_amount("deposit"), 1400.0)
+        self.assertEqual(query.get_average_transaction_amount("transfer"), 0)
+
+    # ResultQuery
+    def test_requires_tracked_result_metrics(self):
+        """
+        Checks if a DataProcessor that does not track result metrics leaves their tables empty and is refused by the query layer.
+        """
+        # Arrange
+        data_processor = DataProcessor([])
+
+        # Act
+        data_processor.process_batch(self.transactions)
+
+        # Assert
+        self.assertEqual(data_processor.account_transaction_counts, {})
+        self.assertEqual(data_processor.currency_statistics, {})
+
+        with self.assertRaises(ValueError):
+            ResultQuery(data_processor)
+
+    # __table
+    def test_tables_cached_until_new_batch(self):
+        """
+        Checks if repeated queries reuse the materialized tables and a new batch makes them rebuilt with the new data.
+        """
+        # Arrange
+        query = ResultQuery(self.data_processor)
+        query.get_account_metrics("1001")
+
+        # Act
+        for _ in range(10):
+            query.get_account_metrics("1001")
+
+        refreshes_before_batch = query.refresh_count
+        self.data_processor.process_batch([dict(self.transactions[2], **{"Transaction ID": "5",
+                                                                        "Amount": "1500"})])
+        metrics = query.get_account_metrics("1001")
+
+        # Assert
+        self.assertEqual(refreshes_before_batch, 1)
+        self.assertEqual(query.refresh_count, 2)
+        self.assertEqual(metrics["average_withdrawal"], 1000.0)
+        self.assertEqual(metrics["deposit_withdrawal_ratio"], 2.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+"""Unittesting for run_cache to verify that a stage is only reused
+while its inputs, configuration and outputs are unchanged.
+"""
+
+import os
+import unittest
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from run_cache.run_cache import RunCache
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+class RunCacheTests(TestCase):
+    """Defines the unit tests for the RunCache class."""
+
+    def setUp(self):
+        """This function is invoked before executing a unit test
+        function.
+
+        An input and an output file are written into a temporary
+        directory, along with the cache file.
+        """
+
+        self.directory = TemporaryDirectory()
+
+        self.cache_path = path.join(self.directory.name, "run_cache.json")
+        self.input_path = path.join(self.directory.name, "input.csv")
+        self.output_path = path.join(self.directory.name, "output.csv")
+
+        self.write(self.input_path, "1,1001,2023-03-01,deposit,1000,CAD,Salary\n")
+        self.write(self.output_path, "1001,1000\n")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, file_path: str, contents: str) -> None:
+        with open(file_path, "w") as output_file:
+            output_file.write(contents)
+
+    # is_current, A recorded stage is current in a new cache instance.
+    def test_is_current_after_record(self):
+        # Arrange
+        cache = RunCache(self.cache_path)
+        fingerprint = cache.fingerprint([self.input_path], {"threshold": 10000})
+        cache.record("processing", fingerprint, [self.output_path])
+
+        # Act
+        reloaded = RunCache(self.cache_path)
+        current = reloaded.is_current("processing", 
+                                      reloaded.fingerprint([self.input_path], {"threshold": 10000}),
+                                      [self.output_path])
+
+        # Assert
+        self.assertTrue(current)
+
+    # fingerprint, Depends on contents and configuration, not mtime.
+    def test_fingerprint_follows_contents(self):
+        # Arrange
+        cache = RunCache(self.cache_path)
+        original = cache.fingerprint([self.input_path], {"threshold": 10000})
+
+        # Act
+        os.utime(self.input_path, ns=(0, 0))
+        touched = cache.fingerprint([self.input_path], {"threshold": 10000})
+        configured = cache.fingerprint([self.input_path], {"threshold": 5000})
+        self.write(self.input_path, "2,1002,2023-03-01,deposit,1000,CAD,Salary\n")
+        edited = cache.fingerprint([self.input_path], {"threshold": 10000})
+
+        # Assert
+        self.assertEqual(original, touched)
+        self.assertNotEqual(original, configured)
+        self.assertNotEqual(original, edited)
+
+    # is_current, A stage whose output was changed or removed is run again.
+    def test_is_current_output_changed(self):
+        # Arrange
+        cache = RunCache(self.cache_path)
+        fingerprint = cache.fingerprint([self.input_path], {})
+        cache.record("processing", fingerprint, [self.output_path])
+
+        # Act
+        self.write(self.output_path, "1001,1000,edited\n")
+        edited = cache.is_current("processing", fingerprint, [self.output_path])
+        os.remove(self.output_path)
+        removed = cache.is_current("processing", fingerprint, [self.output_path])
+
+        # Assert
+        self.assertFalse(edited)
+        self.assertFalse(removed)
+
+    # is_current, Stages that were never recorded are not current.
+    def test_is_current_unknown_stage(self):
+        # Act
+        current = RunCache(self.cache_path).is_current("filter", "0" * 64, [])
+
+        # Assert
+        self.assertFalse(current)
+
+if __name__ == "__main__":
+    unittest.main()
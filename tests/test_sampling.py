@@ -0,0 +1,124 @@
+"""Unittesting for sampling to verify that samples have the requested
+size and that their statistics are scaled up to the whole input.
+"""
+
+import unittest
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from sampling.sampling import Reservoir, TransactionSampler
+from input_handler.input_handler import InputHandler
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+class TransactionSamplerTests(TestCase):
+    """Defines the unit tests for the TransactionSampler class."""
+
+    def setUp(self):
+        """This function is invoked before executing a unit test
+        function.
+
+        An input file of 200 rows, one of them invalid and one holding
+        a quoted line break, is written into a temporary directory.
+        """
+
+        self.directory = TemporaryDirectory()
+        self.input_path = path.join(self.directory.name, "input.csv")
+
+        lines = ["Transaction ID,Account number,Date,Transaction type,"
+                 "Amount,Currency,Description"]
+
+        for number in range(1, 200):
+            transaction_type = "deposit" if number % 4 else "withdrawal"
+            lines.append(f"{number},{1000 + number % 5},2023-03-01,"
+                         f"{transaction_type},{number},CAD,Salary")
+
+        lines[7] = '7,1002,2023-03-01,deposit,7,CAD,"Split\nline"'
+        lines.append("200,1000,2023-03-01,deposit,-5,CAD,Refund")
+
+        with open(self.input_path, "w", newline="") as input_file:
+            input_file.write("\n".join(lines) + "\n")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    # add, The reservoir keeps size items of the stream.
+    def test_reservoir_keeps_size_items(self):
+        # Arrange
+        reservoir = Reservoir(10)
+
+        # Act
+        for item in range(1000):
+            reservoir.add(item)
+
+        # Assert
+        self.assertEqual(1000, reservoir.seen)
+        self.assertEqual(10, len(set(reservoir.items)))
+        self.assertTrue(all(0 <= item < 1000 for item in reservoir.items))
+
+    # estimate_statistics, Sampling every row gives the exact statistics.
+    def test_estimate_statistics_full_sample_is_exact(self):
+        # Arrange
+        sampler = TransactionSampler("bernoulli", rate=1)
+
+        # Act
+        transactions = InputHandler(self.input_path).read_sampled_data(sampler)
+        estimates = sampler.estimate_statistics(transactions)
+
+        # Assert
+        self.assertEqual(200, sampler.population_size)
+        self.assertEqual(199, len(transactions))
+        self.assertEqual("Split\nline", transactions[6]["Description"])
+        self.assertEqual({"estimate": 150.0, "lower": 150.0, "upper": 150.0},
+                         estimates["deposit"]["transaction_count"])
+        self.assertEqual(sum(range(4, 200, 4)),
+                         estimates["withdrawal"]["total_amount"]["estimate"])
+
+    # estimate_statistics, A reservoir stratified by type counts each
+    #  type exactly and scales its amounts by the rows of the type.
+    def test_estimate_statistics_stratified_reservoir(self):
+        # Arrange
+        sampler = TransactionSampler("reservoir", size=20,
+                                     stratify_by="transaction_type", seed=1)
+
+        # Act
+        transactions = InputHandler(self.input_path).read_sampled_data(sampler)
+        estimates = sampler.estimate_statistics(transactions)
+        statistics = TransactionSampler.to_transaction_statistics(estimates)
+
+        # Assert
+        self.assertEqual(40, sampler.sample_size)
+        self.assertEqual(49, statistics["withdrawal"]["transaction_count"])
+        withdrawals = [transaction for transaction in transactions
+                       if transaction["Transaction type"] == "withdrawal"]
+        self.assertAlmostEqual(49 / 20 * sum(float(transaction["Amount"])
+                                             for transaction in withdrawals),
+                               statistics["withdrawal"]["total_amount"])
+        total_amount = estimates["deposit"]["total_amount"]
+        self.assertLess(total_amount["lower"], total_amount["estimate"])
+        self.assertLess(total_amount["estimate"], total_amount["upper"])
+
+    # sample, A seeded bernoulli sample is repeatable.
+    def test_sample_bernoulli_seed(self):
+        # Arrange
+        first = TransactionSampler("bernoulli", rate=0.2, seed=7)
+        second = TransactionSampler("bernoulli", rate=0.2, seed=7)
+
+        # Act
+        first_sample = first.sample(range(1000))
+        second_sample = second.sample(range(1000))
+
+        # Assert
+        self.assertEqual(first_sample, second_sample)
+        self.assertTrue(100 < len(first_sample) < 300)
+
+    # __init__, Only reservoir samples can be stratified.
+    def test_init_stratified_bernoulli(self):
+        # Act and Assert
+        with self.assertRaises(ValueError):
+            TransactionSampler("bernoulli", stratify_by="account")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+"""Unittesting for service to verify that batches sent to a
+TransactionService are answered by its queries.
+"""
+
+import json
+import threading
+import unittest
+from unittest import TestCase
+from unittest.mock import patch
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+from data_processor.data_processor import DataProcessor
+from input_handler.input_handler import InputHandler
+from service.service import TransactionService
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+class TransactionServiceTests(TestCase):
+    """Defines the unit tests for the TransactionService class."""
+
+    def setUp(self):
+        """This function is invoked before executing a unit test
+        function.
+
+        A service with an empty DataProcessor is served on a free
+        local port from a background thread.
+        """
+
+        self.service = TransactionService(DataProcessor([], track_result_metrics=True),
+                                          InputHandler("service.csv"))
+        self.server = self.service.create_server(port=0)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,))
+        self.thread.start()
+
+        self.transactions = [
+            {"Transaction ID": "1", "Account number": "1001", "Date": "2023-03-01",
+             "Transaction type": "deposit", "Amount": "1000", "Currency": "CAD",
+             "Description": "Salary"},
+            {"Transaction ID": "2", "Account number": "1002", "Date": "2023-03-01",
+             "Transaction type": "deposit", "Amount": "12000", "Currency": "CAD",
+             "Description": "Car Sale"},
+            {"Transaction ID": "3", "Account number": "1001", "Date": "2023-03-02",
+             "Transaction type": "withdrawal", "Amount": "-5", "Currency": "CAD",
+             "Description": "Invalid"}]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def request(self, path: str, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        with urlopen(Request(self.url + path, data=data)) as response:
+            return json.loads(response.read())
+
+    # POST /transactions and GET /accounts, Batches are queryable at once.
+    def test_ingest_and_query(self):
+        # Act
+        result = self.request("/transactions", self.transactions)
+        account = self.request("/accounts/1001")
+        filtered = self.request("/accounts?field=balance&value=5000&above=true")
+        statistics = self.request("/statistics")
+
+        # Assert
+        self.assertEqual({"accepted": 2, "rejected": 1, "flagged": 1}, result)
+        self.assertEqual(1000, account["balance"])
+        self.assertEqual(["1002"], [summary["account_number"] for summary in filtered])
+        self.assertEqual(2, statistics["deposit"]["transaction_count"])
+
+    # GET /accounts/<number>/metrics and GET /currencies, Derived
+    # metrics follow new batches.
+    def test_derived_metrics(self):
+        # Arrange
+        self.request("/transactions", self.transactions)
+        withdrawal = dict(self.transactions[2], **{"Amount": "250"})
+
+        # Act
+        before = self.request("/accounts/1001/metrics")
+        self.request("/transactions", [withdrawal])
+        after = self.request("/accounts/1001/metrics")
+        currencies = self.request("/currencies")
+
+        # Assert
+        self.assertIsNone(before["deposit_withdrawal_ratio"])
+        self.assertEqual(4.0, after["deposit_withdrawal_ratio"])
+        self.assertEqual(3, currencies["CAD"]["transaction_count"])
+
+    # GET /accounts/<number>, Unknown accounts and bad filters are errors.
+    def test_query_errors(self):
+        # Act
+        with self.assertRaises(HTTPError) as not_found:
+            self.request("/accounts/9999")
+
+        with self.assertRaises(HTTPError) as bad_filter:
+            self.request("/accounts?field=currency")
+
+        # Assert
+        self.assertEqual(404, not_found.exception.code)
+        self.assertEqual(400, bad_filter.exception.code)
+
+    # POST /transactions, Numeric fields are stored as strings.
+    def test_ingest_numeric_fields(self):
+        # Arrange
+        transaction = dict(self.transactions[0], **{"Account number": 1003, "Amount": 250})
+
+        # Act
+        result = self.request("/transactions", [transaction])
+        account = self.request("/accounts/1003")
+
+        # Assert
+        self.assertEqual(1, result["accepted"])
+        self.assertEqual("1003", account["account_number"])
+        self.assertEqual(250, account["balance"])
+
+    # POST /transactions, A failed batch is answered with a json error.
+    def test_ingest_error(self):
+        # Arrange
+        error = ValueError("I/O operation on closed file.")
+
+        # Act
+        with patch.object(self.service, "ingest", side_effect=error), \
+             self.assertRaises(HTTPError) as failed:
+            self.request("/transactions", self.transactions)
+
+        body = json.loads(failed.exception.read())
+        failed.exception.close()
+
+        # Assert
+        self.assertEqual(500, failed.exception.code)
+        self.assertIn("closed file", body["error"])
+
+    # ingest, Concurrent batches are all applied.
+    def test_concurrent_ingest(self):
+        # Arrange
+        batch = [dict(self.transactions[0], **{"Transaction ID": str(number)})
+                 for number in range(500)]
+        threads = [threading.Thread(target=self.service.ingest, args=(batch,))
+                   for _ in range(4)]
+
+        # Act
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        self.assertEqual(2000000, self.service.get_account("1001")["balance"])
+
+    # ingest, Rows rejected by concurrent batches are all counted.
+    def test_concurrent_ingest_rejects(self):
+        # Arrange
+        rejected_rows = []
+        input_handler = InputHandler("service.csv", rejects_sink=rejected_rows.append)
+        service = TransactionService(DataProcessor([], track_result_metrics=True), input_handler)
+        batch = [dict(self.transactions[2], **{"Transaction ID": str(number)})
+                 for number in range(500)]
+        threads = [threading.Thread(target=service.ingest, args=(batch,))
+                   for _ in range(4)]
+
+        # Act
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        self.assertEqual(2000, sum(input_handler.reject_counts.values()))
+        self.assertEqual(2000, len(rejected_rows))
+
+if __name__ == "__main__":
+    unittest.main()
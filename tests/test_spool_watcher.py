@@ -0,0 +1,107 @@
+"""Unittesting for spool_watcher to verify that each file dropped into
+the spool directory is processed exactly once, also across restarts.
+"""
+
+import os
+import unittest
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from spool_watcher.spool_watcher import SpoolWatcher
+from data_processor.data_processor import DataProcessor
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+class SpoolWatcherTests(TestCase):
+    """Defines the unit tests for the SpoolWatcher class."""
+
+    def setUp(self):
+        """This function is invoked before executing a unit test
+        function.
+
+        A spool directory and a state file path are created in a
+        temporary directory.
+        """
+
+        self.directory = TemporaryDirectory()
+        self.spool_directory = path.join(self.directory.name, "spool")
+        self.state_path = path.join(self.directory.name, "spool_state.pkl")
+        os.makedirs(self.spool_directory)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def drop(self, filename: str, rows: list) -> None:
+        """Writes a csv file with the given data rows into the spool."""
+
+        with open(path.join(self.spool_directory, filename), "w", newline="") as spool_file:
+            spool_file.write("Transaction ID,Account number,Date,Transaction type,"
+                             "Amount,Currency,Description\n")
+            spool_file.write("".join(row + "\n" for row in rows))
+
+    def create_watcher(self, entries: list = None) -> SpoolWatcher:
+        """Creates a watcher over the spool with a new DataProcessor."""
+
+        on_processed = entries.extend if entries is not None else None
+
+        return SpoolWatcher(self.spool_directory, DataProcessor([]), self.state_path,
+                            settle_seconds=0, on_processed=on_processed)
+
+    # poll, Files are processed and moved, duplicates are not counted.
+    def test_poll_processes_each_file_once(self):
+        # Arrange
+        entries = []
+        watcher = self.create_watcher(entries)
+        self.drop("a.csv", ["1,1001,2023-03-01,deposit,1000,CAD,Salary"])
+        self.drop("b.csv", ["2,1001,2023-03-02,withdrawal,200,CAD,Rent"])
+        self.drop("a_copy.csv", ["1,1001,2023-03-01,deposit,1000,CAD,Salary"])
+
+        # Act
+        watcher.poll()
+        second_poll = watcher.poll()
+
+        # Assert
+        self.assertEqual(800.0, watcher.data_processor.account_summaries["1001"]["balance"])
+        self.assertEqual(2, len(entries))
+        self.assertEqual([], second_poll)
+        self.assertEqual(["a.csv", "a_copy.csv", "b.csv"],
+                         sorted(os.listdir(path.join(self.spool_directory, "done"))))
+
+    # poll, Files that cannot be read are moved to the failed folder.
+    def test_poll_moves_unreadable_file_to_failed(self):
+        # Arrange
+        watcher = self.create_watcher()
+
+        with open(path.join(self.spool_directory, "broken.json"), "w") as broken_file:
+            broken_file.write("{not json")
+
+        # Act
+        entries = watcher.poll()
+
+        # Assert
+        self.assertEqual("failed", entries[0]["status"])
+        self.assertEqual(["broken.json"],
+                         os.listdir(path.join(self.spool_directory, "failed")))
+        self.assertEqual({}, watcher.data_processor.account_summaries)
+
+    # __init__, A restarted watcher restores the state and the ledger.
+    def test_restart_restores_state_and_ledger(self):
+        # Arrange
+        self.drop("a.csv", ["1,1001,2023-03-01,deposit,1000,CAD,Salary"])
+        self.create_watcher().poll()
+        self.drop("a_again.csv", ["1,1001,2023-03-01,deposit,1000,CAD,Salary"])
+        self.drop("c.csv", ["3,1001,2023-03-03,deposit,50,CAD,Refund"])
+
+        # Act
+        watcher = self.create_watcher()
+        entries = watcher.poll()
+
+        # Assert
+        self.assertEqual(["c.csv"], [entry["file"] for entry in entries])
+        self.assertEqual(2, len(watcher.ledger))
+        self.assertEqual(1050.0, watcher.data_processor.account_summaries["1001"]["balance"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+"""Unittesting for storage to verify the functionality
+of the SQLiteStore class methods.
+"""
+
+import unittest
+from unittest import TestCase
+from storage.storage import SQLiteStore
+from data_processor.data_processor import DataProcessor
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+class SQLiteStoreTests(TestCase):
+    """Defines the unit tests for the SQLiteStore class."""
+
+    def setUp(self):
+        """This function is invoked before executing a unit test
+        function.
+
+        An in-memory store is opened for every test so that no
+        database file is left behind.
+        """
+
+        self.transactions = [
+            {"Transaction ID": "1", "Account number": "1001",
+             "Date": "2023-03-01", "Transaction type": "deposit",
+             "Amount": "1000", "Currency": "CAD", "Description": "Salary"},
+            {"Transaction ID": "2", "Account number": "1002",
+             "Date": "2023-03-01", "Transaction type": "deposit",
+             "Amount": "1500", "Currency": "CAD", "Description": "Salary"},
+            {"Transaction ID": "3", "Account number": "1001",
+             "Date": "2023-03-02", "Transaction type": "withdrawal",
+             "Amount": "200", "Currency": "CAD", "Description": "Groceries"},
+            {"Transaction ID": "4", "Account number": "1002",
+             "Date": "2023-03-13", "Transaction type": "deposit",
+             "Amount": "12000", "Currency": "CAD", "Description": "Car Sale"},
+            {"Transaction ID": "5", "Account number": "1003",
+             "Date": "2023-03-14", "Transaction type": "transfer",
+             "Amount": "250", "Currency": "XRP", "Description": "Crypto"}]
+
+        self.store = SQLiteStore(":memory:")
+
+    def tearDown(self):
+        self.store.close()
+
+    # load_transactions, summaries match DataProcessor results.
+    def test_load_transactions_matches_data_processor(self):
+        # Arrange
+        processor = DataProcessor(self.transactions)
+        expected = processor.process_data()
+
+        # Act
+        self.store.load_transactions(self.transactions)
+
+        # Assert
+        self.assertEqual(expected["account_summaries"], self.store.account_summaries)
+        self.assertEqual(expected["transaction_statistics"], self.store.transaction_statistics)
+        self.assertEqual(["4", "5"], [transaction["Transaction ID"] for transaction
+                                      in self.store.suspicious_transactions])
+
+    # load_transactions, re-loading only inserts new rows.
+    def test_load_transactions_rerun_inserts_only_new_rows(self):
+        # Arrange
+        self.store.load_transactions(self.transactions[:3])
+
+        # Act
+        inserted = self.store.load_transactions(self.transactions, batch_size=2)
+
+        # Assert
+        self.assertEqual(2, inserted)
+        self.assertEqual(800, self.store.account_summaries["1001"]["balance"])
+        self.assertEqual(3, self.store.transaction_statistics["deposit"]["transaction_count"])
+
+    # load_transactions, invalid rows are rejected before a batch is
+    # inserted.
+    def test_load_transactions_rejects_invalid_rows(self):
+        # Arrange
+        rejected = []
+        store = SQLiteStore(":memory:", rejects_sink=rejected.append)
+        missing_id = dict(self.transactions[2])
+        del missing_id["Transaction ID"]
+        invalid_amount = dict(self.transactions[3], Amount="twelve")
+
+        # Act
+        inserted = store.load_transactions([self.transactions[0], missing_id,
+                                            invalid_amount, self.transactions[1]],
+                                           batch_size=2)
+
+        # Assert
+        self.assertEqual(2, inserted)
+        self.assertEqual(1, store.reject_counts["missing_field"])
+        self.assertEqual(1, store.reject_counts["invalid_amount"])
+        self.assertEqual(["missing_field", "invalid_amount"],
+                         [record["Reason code"] for record in rejected])
+        store.close()
+
+    # filter_account_summaries, matches OutputHandler filtering.
+    def test_filter_account_summaries(self):
+        # Arrange
+        self.store.load_transactions(self.transactions)
+
+        # Act
+        actual = self.store.filter_account_summaries("balance", 5000, False)
+
+        # Assert
+        self.assertEqual(["1001", "1003"], [summary["account_number"] for summary in actual])
+
+    # filter_account_summaries, rejects unknown fields.
+    def test_filter_account_summaries_unknown_field(self):
+        # Act and Assert
+        with self.assertRaises(KeyError):
+            self.store.filter_account_summaries("balance; DROP TABLE transactions", 0, True)
+
+    # get_account_transactions, returns the rows of one account.
+    def test_get_account_transactions(self):
+        # Arrange
+        self.store.load_transactions(self.transactions)
+
+        # Act
+        rows = self.store.get_account_transactions("1001")
+
+        # Assert
+        self.assertEqual(["1", "3"], [row["transaction_id"] for row in rows])
+
+if __name__ == "__main__":
+    unittest.main()
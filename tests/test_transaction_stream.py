@@ -0,0 +1,100 @@
+"""Testing for transaction_stream.py to verify that transactions
+are visible in the file as soon as they are written."""
+
+import json
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+from output_handler.output_handler import OutputHandler
+from output_handler.transaction_stream import TransactionStream
+
+__author__ = "Owen Maxwell"
+__version__ = "1.0.0"
+__credits__ = "COMP-1327 Faculty"
+
+class TestTransactionStream(TestCase):
+    """Defines the unit tests for the TransactionStream class."""
+
+    def setUp(self):
+        """This function is invoked before executing a unit test
+        function.
+
+        Streams are written into a temporary directory.
+        """
+
+        self.directory = TemporaryDirectory()
+
+        self.transaction = {
+            "Transaction ID": "1",
+            "Account number": "1001",
+            "Date": "2023-03-14",
+            "Transaction type": "deposit",
+            "Amount": "250",
+            "Currency": "XRP",
+            "Description": "crypto investment"
+        }
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read(self, file_path: str) -> str:
+        with open(file_path, newline="") as stream_file:
+            return stream_file.read()
+
+    # write, the transaction can be read before the stream is closed.
+    def test_write_visible_before_close(self):
+        # Arrange
+        file_path = path.join(self.directory.name, "suspicious.csv")
+
+        # Act
+        with OutputHandler.open_suspicious_transactions_stream(file_path) as stream:
+            stream(self.transaction)
+            contents = self.read(file_path)
+
+        # Assert
+        self.assertEqual("Transaction ID,Account number,Date,Transaction type,"
+                         "Amount,Currency,Description\r\n"
+                         "1,1001,2023-03-14,deposit,250,XRP,crypto investment\r\n", contents)
+
+    # write_batch, ndjson writes one object per line.
+    def test_write_batch_ndjson(self):
+        # Arrange
+        file_path = path.join(self.directory.name, "suspicious.ndjson")
+
+        # Act
+        with TransactionStream(file_path, ["Transaction ID", "Amount"], flush_every=100) as stream:
+            stream.write_batch([self.transaction, self.transaction])
+            lines = self.read(file_path).splitlines()
+            count = stream.count
+
+        # Assert
+        self.assertEqual(2, count)
+        self.assertEqual({"Transaction ID": "1", "Amount": "250"}, json.loads(lines[1]))
+
+    # TransactionStream, formats that cannot be appended to are rejected.
+    def test_unsupported_format(self):
+        # Act and Assert
+        with self.assertRaises(ValueError):
+            TransactionStream(path.join(self.directory.name, "suspicious.json"), ["Amount"])
+
+    # truncate, an appended stream continues after the kept rows.
+    def test_append_after_truncate(self):
+        # Arrange
+        file_path = path.join(self.directory.name, "rejects.csv")
+        fields = ["Transaction ID", "Amount"]
+
+        with TransactionStream(file_path, fields) as stream:
+            stream(self.transaction)
+            position = stream.position
+            stream(dict(self.transaction, **{"Transaction ID": "2"}))
+
+        # Act
+        with TransactionStream(file_path, fields, append=True) as stream:
+            stream.truncate(position)
+            stream(dict(self.transaction, **{"Transaction ID": "3"}))
+
+        # Assert
+        self.assertEqual("Transaction ID,Amount\r\n1,250\r\n3,250\r\n", self.read(file_path))
+
+if __name__ == "__main__":
+    main()
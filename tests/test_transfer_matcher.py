@@ -0,0 +1,79 @@
+"""
+Contains unit tests for TransferMatcher class, to check that transfers are paired by amount, currency and date window.
+"""
+
+import unittest
+from unittest import TestCase
+from data_processor.transfer_matcher import TransferMatcher
+
+__author__ = "Khushpreet Kaur"
+__version__ = "2.49.0.windows.1"
+__credits__ = "COMP-1327 Faculty"
+
+class TestTransferMatcher(TestCase):
+    """Defines the unit tests for the TransferMatcher class."""
+
+    def transfer(self, account_number: str, date: str, amount: str,
+                 description: str = "Transfer to Savings", currency: str = "CAD") -> dict:
+        """Returns a transfer transaction with the given details."""
+
+        return {"Transaction ID": f"{account_number}-{date}", "Account number": account_number,
+                "Date": date, "Transaction type": "transfer", "Amount": amount,
+                "Currency": currency, "Description": description}
+
+    # match
+    def test_match_pairs_within_window(self):
+        """
+        Checks if an incoming transfer a day after an outgoing one of the same amount and currency is matched, in either arrival order.
+        """
+        # Arrange
+        matcher = TransferMatcher(window_days=1)
+        incoming = self.transfer("2001", "2023-03-04", "500.00", "Transfer from Checking")
+        outgoing = self.transfer("1001", "2023-03-03", "500")
+
+        # Act
+        waiting = matcher.match(incoming)
+        counterpart = matcher.match(outgoing)
+
+        # Assert
+        self.assertIsNone(waiting)
+        self.assertIs(counterpart, incoming)
+        self.assertEqual(matcher.matched_count, 1)
+        self.assertEqual(matcher.pending_transfers, [])
+
+    def test_match_leaves_unmatched_transfers_pending(self):
+        """
+        Checks if transfers outside the window, in another currency or of the same account are left waiting.
+        """
+        # Arrange
+        matcher = TransferMatcher(window_days=1)
+        transfers = [self.transfer("1001", "2023-03-01", "250"),
+                     self.transfer("2001", "2023-03-05", "250", "Transfer from Checking"),
+                     self.transfer("2002", "2023-03-01", "250", "Transfer from Checking", "USD"),
+                     self.transfer("1001", "2023-03-01", "250", "Transfer from Savings")]
+
+        # Act
+        counterparts = [matcher.match(transfer) for transfer in transfers]
+
+        # Assert
+        self.assertEqual(counterparts, [None] * 4)
+        self.assertEqual(matcher.pending_transfers, transfers)
+
+    # get_direction
+    def test_get_direction_field_before_description(self):
+        """
+        Checks if the Direction field decides the direction of a transfer, and the description does when it is missing.
+        """
+        # Arrange
+        transfer = self.transfer("1001", "2023-03-01", "100", "Transfer from Savings")
+
+        # Act
+        from_description = TransferMatcher.get_direction(transfer)
+        from_field = TransferMatcher.get_direction(dict(transfer, Direction="OUT"))
+
+        # Assert
+        self.assertEqual(from_description, "in")
+        self.assertEqual(from_field, "out")
+
+if __name__ == "__main__":
+    unittest.main()